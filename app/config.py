@@ -29,6 +29,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 class Settings(BaseSettings):
     APP_NAME: str = "Telegram Salla Subs"
     DATABASE_URL: str
+    # asyncpg pool of the app; the Webull bot's command repository shares it when
+    # started from the app (webull_bot/src/config.py PG_POOL_MAX = its own share)
+    DB_POOL_MIN: int = 1
+    DB_POOL_MAX: int = 15
     TELEGRAM_TOKEN: str
     SALLA_SECRET: str
     APP_BASE_URL: str
@@ -13,10 +13,21 @@ class Database:
             print(f"Connecting to DB with URL length: {len(settings.DATABASE_URL) if settings.DATABASE_URL else 0}")
             self.pool = await asyncpg.create_pool(
                 dsn=settings.DATABASE_URL,
-                min_size=1,
-                max_size=5
+                min_size=settings.DB_POOL_MIN,
+                max_size=settings.DB_POOL_MAX
             )
             print("DB Pool created")
+            await self.ensure_schema()
+
+    async def ensure_schema(self):
+        """Apply additive migrations the app depends on, so an older database keeps working."""
+        try:
+            async with self.pool.acquire() as conn:
+                # migrations/006_webhook_logs_ref_id.sql
+                await conn.execute("ALTER TABLE webhook_logs ADD COLUMN IF NOT EXISTS ref_id TEXT")
+                await conn.execute("CREATE INDEX IF NOT EXISTS idx_webhook_logs_ref_id ON webhook_logs(ref_id)")
+        except Exception as e:
+            print(f"Schema update failed: {e}")
 
     async def disconnect(self):
         if self.pool:
@@ -1,12 +1,13 @@
 import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 from app.config import get_settings
 from app.db import db
 from app.routes import webhooks, admin
 from app.bot import start_bot, bot
-from app.webull_wrapper import start_webull_bot
+from app.webull_wrapper import start_webull_bot, render_metrics
 from app.services.subscription_tasks import subscription_checker_loop
 
 settings = get_settings()
@@ -43,3 +44,8 @@ app.include_router(admin.router, prefix="/admin")
 @app.get("/")
 async def root():
     return {"message": "Telegram Salla App is Running"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus scrape endpoint for the Webull monitor
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
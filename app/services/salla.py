@@ -23,17 +23,31 @@ class SallaWebhookHandler:
         event = payload.get('event') 
         data = payload.get('data', {})
         
-        # Log the webhook
-        await db.execute(
-            "INSERT INTO webhook_logs (payload, event_type, status) VALUES ($1, $2, 'pending')",
-            json.dumps(payload), event
-        )
+        # Log the webhook; ref_id (the order/subscription id) is indexed for status updates
+        ref_id = data.get('id') if isinstance(data, dict) else None
+        try:
+            log = await db.fetchrow(
+                "INSERT INTO webhook_logs (payload, event_type, status, ref_id) VALUES ($1, $2, 'pending', $3) RETURNING id",
+                json.dumps(payload), event, str(ref_id) if ref_id is not None else None
+            )
+        except Exception as e:
+            # e.g. webhook_logs without ref_id (migration 006 not applied): log without it
+            logger.error(f"Error logging webhook {event} with ref_id: {e}")
+            try:
+                log = await db.fetchrow(
+                    "INSERT INTO webhook_logs (payload, event_type, status) VALUES ($1, $2, 'pending') RETURNING id",
+                    json.dumps(payload), event
+                )
+            except Exception as e:
+                logger.error(f"Error logging webhook {event}: {e}")
+                log = None
+        log_id = log['id'] if log else None
 
         try:
             if event == 'order.paid':
-                await SallaWebhookHandler.process_paid_order(data)
+                await SallaWebhookHandler.process_paid_order(data, log_id)
             elif event == 'subscription.created':
-                await SallaWebhookHandler.process_subscription_created(data)
+                await SallaWebhookHandler.process_subscription_created(data, log_id)
             elif event == 'subscription.updated':
                 await SallaWebhookHandler.process_subscription_updated(data)
             elif event == 'subscription.charge.succeeded':
@@ -71,7 +85,7 @@ class SallaWebhookHandler:
         return await db.fetchrow("SELECT telegram_user_id FROM users WHERE phone_number = $1", phone)
 
     @staticmethod
-    async def process_paid_order(order_data: dict):
+    async def process_paid_order(order_data: dict, log_id: int = None):
         salla_order_id = str(order_data.get('id'))
         
         existing = await db.fetchrow("SELECT id FROM subscriptions WHERE salla_order_id = $1", salla_order_id)
@@ -98,7 +112,7 @@ class SallaWebhookHandler:
                  msg += "يرجى التواصل مع الدعم الفني للحصول على رابط القناة."
                 
             await send_notification(user_id, msg)
-            await SallaWebhookHandler.update_log_status(salla_order_id, 'success')
+            await SallaWebhookHandler.update_log_status(salla_order_id, 'success', log_id)
         else:
             logger.warning(f"No user found for order {salla_order_id}. Saving to pending.")
             # Store in pending_subscriptions
@@ -116,12 +130,12 @@ class SallaWebhookHandler:
                     VALUES ($1, $2, 30, 'pending')
                     ON CONFLICT (salla_order_id) DO NOTHING
                 """, phone, salla_order_id)
-                await SallaWebhookHandler.update_log_status(salla_order_id, 'pending_user_registration')
+                await SallaWebhookHandler.update_log_status(salla_order_id, 'pending_user_registration', log_id)
             else:
-                await SallaWebhookHandler.update_log_status(salla_order_id, 'failed_no_phone')
+                await SallaWebhookHandler.update_log_status(salla_order_id, 'failed_no_phone', log_id)
 
     @staticmethod
-    async def process_subscription_created(data: dict):
+    async def process_subscription_created(data: dict, log_id: int = None):
         sub_id = str(data.get('id'))
         existing = await db.fetchrow("SELECT id FROM subscriptions WHERE salla_order_id = $1", sub_id)
         if existing: return
@@ -152,7 +166,7 @@ class SallaWebhookHandler:
         await db.execute(query, user_id, sub_id, start_date, end_date)
         
         await send_notification(user_id, f"✅ تم تفعيل اشتراكك رقم {sub_id}")
-        await SallaWebhookHandler.update_log_status(sub_id, 'success')
+        await SallaWebhookHandler.update_log_status(sub_id, 'success', log_id)
 
     @staticmethod
     async def process_subscription_updated(data: dict):
@@ -186,7 +200,11 @@ class SallaWebhookHandler:
         if sub: await send_notification(sub['telegram_user_id'], "❌ تم إلغاء اشتراكك.")
 
     @staticmethod
-    async def update_log_status(ref_id: str, status: str):
-        # Approximate matching for logs
-        await db.execute("UPDATE webhook_logs SET status = $1 WHERE payload::jsonb->'data'->>'id' = $2", status, ref_id)
+    async def update_log_status(ref_id: str, status: str, log_id: int = None):
+        if log_id is not None:
+            # The row inserted for this delivery
+            await db.execute("UPDATE webhook_logs SET status = $1 WHERE id = $2", status, log_id)
+        else:
+            # Every log of the order/subscription (indexed, see migrations/006_webhook_logs_ref_id.sql)
+            await db.execute("UPDATE webhook_logs SET status = $1 WHERE ref_id = $2", status, ref_id)
 
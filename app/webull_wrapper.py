@@ -2,6 +2,7 @@ import sys
 import os
 import asyncio
 import logging
+from app.db import db as app_db
 
 # Setup Logger
 logger = logging.getLogger(__name__)
@@ -18,6 +19,13 @@ try:
     from src.config import Config
     from src.bot_handlers import router
     from src.monitor import MonitorEngine
+    from src.render_service import render_service
+    from src.quote_client import quote_client
+    from src.webull_executor import webull_executor
+    from src import services
+    from src.pg_pool import pg_pool
+    from src.command_repository import command_repository
+    from src.metrics import registry as metrics_registry
     from aiogram import Bot, Dispatcher
     from aiogram.client.default import DefaultBotProperties
     from aiogram.enums import ParseMode
@@ -25,6 +33,13 @@ except ImportError as e:
     logger.error(f"Failed to import Webull Bot modules: {e}")
     # Handle case where dependencies aren't installed yet or path is wrong
     Config = None
+    metrics_registry = None
+
+def render_metrics():
+    """Webull monitor metrics in Prometheus text format (empty if the bot is not loaded)."""
+    if metrics_registry is None:
+        return ""
+    return metrics_registry.render()
 
 async def start_webull_bot():
     if not Config:
@@ -42,6 +57,7 @@ async def start_webull_bot():
     # bot_handlers.py uses: os.path.join(os.path.dirname(os.path.dirname(__file__)), "favorites.json")
     # This resolves relative to bot_handlers.py, so it SHOULD be fine (inside src, parent is webull_bot).
     
+    monitor = None
     try:
         # Validate Config (will raise if tokens missing)
         try:
@@ -50,6 +66,13 @@ async def start_webull_bot():
             logger.warning(f"Webull Bot Validation Failed (Secrets missing in .env?): {e}")
             return
 
+        # Database and Webull client, shared by the handlers and the monitor.
+        # Created here rather than at import; off the loop since they connect to PostgreSQL
+        await asyncio.to_thread(services.init)
+        # Command edits run on the app's asyncpg pool (connected in the FastAPI lifespan),
+        # sized by DB_POOL_MAX for webhooks, the admin panel and the bot handlers together
+        await command_repository.connect(app_db.pool)
+
         # Initialize Bot
         # Remove default parse_mode=HTML as the original bot expected plain text defaults
         # and some messages (like help text with <>) break in HTML mode.
@@ -69,3 +92,12 @@ async def start_webull_bot():
         
     except Exception as e:
         logger.error(f"Webull Bot Startup Error: {e}")
+    finally:
+        # Flush buffered monitor state (price tracking) on shutdown
+        if monitor:
+            await monitor.stop()
+        render_service.shutdown()
+        webull_executor.shutdown()
+        await quote_client.close()
+        await command_repository.close()
+        pg_pool.close()
@@ -0,0 +1,27 @@
+-- Migration Script: Publish monitoring_commands changes over LISTEN/NOTIFY
+-- The Webull monitor keeps the active command set in memory and applies
+-- these notifications instead of re-reading the whole table every cycle.
+-- Run this in your PostgreSQL database
+
+CREATE OR REPLACE FUNCTION notify_monitoring_commands_change() RETURNS trigger AS $$
+DECLARE
+    cmd_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        cmd_id := OLD.id;
+    ELSE
+        cmd_id := NEW.id;
+    END IF;
+    PERFORM pg_notify('monitoring_commands_changed', json_build_object('op', TG_OP, 'id', cmd_id)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Price tracking columns (last_notified_price, peak_price, first_message_id) are
+-- written by the monitor itself, so updates to them are not published.
+DROP TRIGGER IF EXISTS monitoring_commands_notify ON monitoring_commands;
+CREATE TRIGGER monitoring_commands_notify
+    AFTER INSERT OR DELETE OR UPDATE OF chat_id, symbol, strike, contract_type, expiration,
+        target_price, entry_price, status, notification_mode, contract_id, postgres_id
+    ON monitoring_commands
+    FOR EACH ROW EXECUTE PROCEDURE notify_monitoring_commands_change();
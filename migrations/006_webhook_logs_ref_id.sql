@@ -0,0 +1,15 @@
+-- Migration Script: Indexed reference id for webhook_logs
+-- SallaWebhookHandler.update_log_status used to match logs on
+-- payload::jsonb->'data'->>'id', a sequential scan with JSON extraction over
+-- the whole log table. The order/subscription id is now stored in ref_id at
+-- insert time, and status updates target the inserted row by id.
+-- Run this in your PostgreSQL database
+
+ALTER TABLE webhook_logs ADD COLUMN IF NOT EXISTS ref_id TEXT;
+
+-- Backfill existing logs
+UPDATE webhook_logs
+SET ref_id = payload::jsonb->'data'->>'id'
+WHERE ref_id IS NULL AND payload IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_ref_id ON webhook_logs(ref_id);
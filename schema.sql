@@ -27,8 +27,10 @@ CREATE TABLE IF NOT EXISTS webhook_logs (
     event_type TEXT,
     status TEXT, -- success, failed, ignored
     error_message TEXT,
+    ref_id TEXT, -- data.id of the payload (order / subscription id)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+CREATE INDEX IF NOT EXISTS idx_webhook_logs_ref_id ON webhook_logs(ref_id);
 
 -- Admin users (simple table for the example, usually you might want a hashed password)
 CREATE TABLE IF NOT EXISTS admins (
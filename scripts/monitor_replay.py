@@ -0,0 +1,292 @@
+"""
+Offline throughput benchmark for the Webull monitor (MonitorEngine.check_contracts).
+
+Record chains during market hours (or run the bot with MONITOR_RECORD_PATH set):
+    python scripts/monitor_replay.py record chains.jsonl.gz SPY:2026-01-16 QQQ:2026-01-16 --interval 10 --count 60
+
+Replay them with stubbed Telegram and DB layers at a synthetic scale:
+    python scripts/monitor_replay.py replay chains.jsonl.gz --commands 10000 --groups 200 --cycles 5
+
+Without a recording, `replay --synthetic` generates chains instead.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "webull_bot"))
+
+from src.config import Config
+from src.chain_snapshot import ChainSnapshot
+from src.snapshot_cache import ChainSnapshotCache
+from src.snapshot_recorder import SnapshotRecorder, load_recording
+from src.notifier import NotificationQueue
+from src.poll_scheduler import AdaptivePollScheduler
+from src.rate_limiter import TokenBucket
+from src import metrics
+
+MODES = ('always', 'peaks', 'wait', 'wait_down', 'enter')
+STAGES = ('fetch', 'parse', 'decision', 'render', 'send', 'db_write')
+
+
+# --- Recording ---
+
+def record(args):
+    from src.api_client import MassiveAPIClient
+    api = MassiveAPIClient()
+    recorder = SnapshotRecorder(args.output)
+    targets = [target.split(":", 1) for target in args.targets]
+    for i in range(args.count):
+        started = time.monotonic()
+        for symbol, expiration in targets:
+            snapshot = api.get_batch_option_data(symbol, expiration)
+            recorder.record(snapshot)
+            print(f"[{i + 1}/{args.count}] {symbol} {expiration}: {len(snapshot)} contracts")
+        if i + 1 < args.count:
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+
+
+# --- Replay stubs ---
+
+class ReplayAPI:
+    """Serves recorded frames per synthetic group, drifting prices by a per-group random walk."""
+
+    def __init__(self, frames_by_group, drift, fetch_latency, seed):
+        self.frames_by_group = frames_by_group
+        self.drift = drift
+        self.fetch_latency = fetch_latency
+        self._rng = random.Random(seed)
+        self._position = {key: 0 for key in frames_by_group}
+        self._factor = {key: 1.0 for key in frames_by_group}
+
+    async def get_batch_option_data_async(self, symbol, expiration):
+        if self.fetch_latency:
+            await asyncio.sleep(self.fetch_latency)
+        return self.get_batch_option_data(symbol, expiration)
+
+    async def get_quotes_for(self, symbol, expiration, wanted):
+        snapshot = await self.get_batch_option_data_async(symbol, expiration)
+        contracts = {(strike, type_char): snapshot.find(strike, type_char) for strike, type_char in wanted}
+        return ChainSnapshot(symbol, expiration, {k: v for k, v in contracts.items() if v})
+
+    def get_batch_option_data(self, symbol, expiration):
+        key = (symbol, str(expiration))
+        frames = self.frames_by_group[key]
+        frame = frames[self._position[key] % len(frames)]
+        self._position[key] += 1
+        if self.drift:
+            self._factor[key] *= 1 + self._rng.uniform(-self.drift, self.drift)
+        factor = self._factor[key]
+        contracts = {}
+        for contract_key, data in frame.items():
+            data = dict(data)
+            for field in ('last_price', 'bid', 'ask'):
+                data[field] = round((data.get(field) or 0) * factor, 2)
+            contracts[contract_key] = data
+        return ChainSnapshot(symbol, expiration, contracts)
+
+
+class StubDatabase:
+    def __init__(self, commands):
+        self.commands = commands
+        self.tracking_rows = 0
+
+    def listen(self, channel=None):
+        raise RuntimeError("no LISTEN in replay")
+
+    def get_active_commands(self):
+        return self.commands
+
+    def update_price_tracking_batch(self, rows):
+        self.tracking_rows += len(rows)
+        return True
+
+
+class StubRepository:
+    async def set_first_message_id(self, cmd_id, message_id):
+        pass
+
+    async def update_command_status(self, cmd_id, status):
+        return True
+
+
+class StubBot:
+    def __init__(self):
+        self.sent = 0
+
+    async def send_photo(self, **kwargs):
+        self.sent += 1
+        return SimpleNamespace(message_id=self.sent)
+
+
+class StubRenderer:
+    async def render_status(self, data):
+        return b""
+
+
+# --- Replay ---
+
+def synthetic_chain(symbol, expiration, rng, strikes=80):
+    underlying = rng.uniform(50, 500)
+    step = max(1, round(underlying / 100))
+    first = round(underlying) - step * (strikes // 2)
+    contracts = {}
+    for k in range(strikes):
+        strike = float(first + k * step)
+        for type_char in ('C', 'P'):
+            intrinsic = max(0.0, underlying - strike) if type_char == 'C' else max(0.0, strike - underlying)
+            mid = round(intrinsic + underlying * 0.02 * rng.uniform(0.5, 1.5), 2)
+            contracts[(strike, type_char)] = {
+                'last_price': mid, 'bid': round(mid * 0.97, 2), 'ask': round(mid * 1.03, 2),
+                'volume': rng.randint(0, 5000), 'openInterest': rng.randint(0, 20000),
+                'impliedVolatility': round(rng.uniform(0.1, 0.8), 4), 'change_abs': 0.0, 'change_pct': 0.0,
+                'underlying_price': underlying, 'contractSymbol': None,
+            }
+    return ChainSnapshot(symbol, expiration, contracts)
+
+
+def load_bases(args, rng):
+    """List of frame sequences (one per recorded symbol/expiration)."""
+    if args.synthetic:
+        return [[synthetic_chain(f"SYN{i}", "synthetic", rng)] for i in range(20)]
+    frames = {}
+    for snapshot in load_recording(args.recording):
+        if snapshot:
+            frames.setdefault((snapshot.symbol, str(snapshot.expiration)), []).append(snapshot)
+    if not frames:
+        sys.exit(f"No snapshots in {args.recording}")
+    return list(frames.values())
+
+
+def build_workload(bases, n_groups, n_commands, n_chats, rng):
+    """Spread `n_commands` over `n_groups` synthetic (symbol, expiration) groups cloned from the bases."""
+    expiration = date.today() + timedelta(days=30)
+    frames_by_group, group_keys = {}, []
+    for g in range(n_groups):
+        base = bases[g % len(bases)]
+        symbol = f"{base[0].symbol}{g}"
+        frames_by_group[(symbol, str(expiration))] = base
+        group_keys.append((symbol, base[0]))
+
+    commands = []
+    for i in range(n_commands):
+        symbol, first_frame = group_keys[i % n_groups]
+        (strike, type_char), data = rng.choice(list(first_frame.items()))
+        bid, ask = data.get('bid') or 0, data.get('ask') or 0
+        price = round((bid + ask) / 2 if bid and ask else (data.get('last_price') or 0), 2)
+        mode = rng.choice(MODES)
+        commands.append({
+            'id': i + 1, 'symbol': symbol, 'expiration': expiration, 'strike': strike,
+            'contract_type': 'CALL' if type_char == 'C' else 'PUT', 'notification_mode': mode,
+            'target_price': round(price * (0.95 if mode == 'wait_down' else 1.05), 2),
+            'entry_price': price, 'chat_id': 1000 + i % n_chats, 'first_message_id': None,
+            'last_notified_price': None, 'peak_price': None, 'status': 'active',
+        })
+    return frames_by_group, commands
+
+
+async def replay(args):
+    from src.monitor import MonitorEngine
+
+    rng = random.Random(args.seed)
+    bases = load_bases(args, rng)
+    frames_by_group, commands = build_workload(bases, args.groups, args.commands, args.chats, rng)
+
+    # Every cycle fetches every group: no cache reuse, no per-chat pacing, no recording
+    Config.TELEGRAM_GROUP_IDS = []
+    Config.CHAIN_CACHE_MONITOR_MAX_AGE = 0
+    Config.MONITOR_RECORD_PATH = ""
+
+    bot = StubBot()
+    db = StubDatabase(commands)
+    renderer = None if args.render else StubRenderer()
+    notifier = NotificationQueue(bot, global_rate=1e9, chat_interval=0, max_retries=0)
+    engine = MonitorEngine(
+        bot, api=ReplayAPI(frames_by_group, args.drift, args.fetch_latency, args.seed), db=db,
+        notifier=notifier, renderer=renderer, cache=ChainSnapshotCache(ttl=0, stale_ttl=0),
+        repository=StubRepository()
+    )
+    engine.fetch_slots = asyncio.Semaphore(args.concurrency)
+    if not args.rate_limit:
+        engine.rate_limiter = TokenBucket(1e9, 1e9)
+
+    cycle_times = []
+    # The monitor prints one line per command; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for cycle in range(args.warmup + args.cycles):
+            if cycle == args.warmup:
+                metrics.registry.reset()
+            engine.scheduler = AdaptivePollScheduler()
+            started = time.perf_counter()
+            await engine.check_contracts()
+            if cycle >= args.warmup:
+                cycle_times.append(time.perf_counter() - started)
+            sink.seek(0)
+            sink.truncate()
+        await notifier.stop(timeout=60)
+    if args.render:
+        engine.renderer.shutdown()
+
+    evaluated = metrics.MONITOR_COMMANDS_EVALUATED.value()
+    total = sum(cycle_times)
+    print(f"Replay: {len(commands)} commands, {len(frames_by_group)} groups, "
+          f"{args.cycles} cycles after {args.warmup} warm-up ({'synthetic' if args.synthetic else args.recording})")
+    print(f"cycle time: mean {total / len(cycle_times):.3f}s  min {min(cycle_times):.3f}s  max {max(cycle_times):.3f}s")
+    print(f"commands/sec: {evaluated / total:,.0f}  ({evaluated} evaluated)")
+    print(f"notifications sent: {bot.sent}  tracking rows written: {db.tracking_rows}")
+    print(f"\n{'stage':<10}{'count':>9}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for stage in STAGES:
+        s = metrics.MONITOR_STAGE_SECONDS.summary(stage=stage)
+        if s is None:
+            print(f"{stage:<10}{0:>9}{'-':>10}{'-':>9}{'-':>9}{'-':>9}")
+            continue
+        # Percentiles are histogram bucket upper bounds
+        print(f"{stage:<10}{s['count']:>9}{s['mean'] * 1000:>10.2f}"
+              f"{s['p50'] * 1000:>9g}{s['p95'] * 1000:>9g}{s['p99'] * 1000:>9g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="poll Webull and append chain snapshots to a recording")
+    rec.add_argument("output")
+    rec.add_argument("targets", nargs="+", help="SYMBOL:YYYY-MM-DD")
+    rec.add_argument("--interval", type=float, default=10, help="seconds between rounds")
+    rec.add_argument("--count", type=int, default=60, help="number of rounds")
+
+    rep = sub.add_parser("replay", help="run check_contracts over a recording with stubbed I/O")
+    rep.add_argument("recording", nargs="?")
+    rep.add_argument("--synthetic", action="store_true", help="generate chains instead of reading a recording")
+    rep.add_argument("--commands", type=int, default=10000)
+    rep.add_argument("--groups", type=int, default=200)
+    rep.add_argument("--chats", type=int, default=50)
+    rep.add_argument("--cycles", type=int, default=5)
+    rep.add_argument("--warmup", type=int, default=1)
+    rep.add_argument("--concurrency", type=int, default=Config.MONITOR_MAX_CONCURRENT_FETCHES)
+    rep.add_argument("--drift", type=float, default=0.02, help="max relative price move per group per cycle")
+    rep.add_argument("--fetch-latency", type=float, default=0.0, help="simulated seconds per chain fetch")
+    rep.add_argument("--render", action="store_true", help="render real status images (process pool)")
+    rep.add_argument("--rate-limit", action="store_true", help="keep the Webull anti-ban token bucket")
+    rep.add_argument("--seed", type=int, default=1)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    if args.command == "record":
+        record(args)
+    else:
+        if not args.synthetic and not args.recording:
+            parser.error("replay needs a recording file or --synthetic")
+        asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
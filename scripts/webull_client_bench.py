@@ -0,0 +1,184 @@
+"""
+Load benchmark for MassiveAPIClient against the local Webull gateway simulator
+(scripts/webull_gateway_sim.py), so transport and caching changes can be compared
+with numbers instead of against Webull.
+
+    python scripts/webull_client_bench.py --mode chain --symbols SPY QQQ IWM --concurrency 8 --duration 20
+    python scripts/webull_client_bench.py --mode targeted --wanted 4 --latency 80 --throttle-rate 0.02
+
+Starts the simulator on a free port (simulator options such as --latency, --jitter,
+--error-rate, --throttle-rate, --strikes are passed through), or uses --url.
+
+Modes:
+    chain         get_batch_option_data_async (chain skeleton + async batch quotes)
+    chain-sync    get_batch_option_data on the Webull executor (requests transport)
+    targeted      get_quotes_for with --wanted contracts near the money per refresh
+    option-chain  get_option_chain (the /g and favorites chain views)
+--cold drops the cached chain skeletons before every refresh (wb.get_options every time).
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "webull_bot"))
+sys.path.insert(0, ROOT)
+
+import webull_gateway_sim
+
+MODES = ('chain', 'chain-sync', 'targeted', 'option-chain')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_simulator(sim_args):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "webull_gateway_sim.py"), "--port", str(port)] + sim_args,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit("Gateway simulator did not start")
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _total(counter):
+    return sum(counter.values().values())
+
+
+async def run(args):
+    # Imported after the environment points Config at the simulator
+    from src.api_client import MassiveAPIClient
+    from src.chain_skeleton import chain_skeletons
+    from src.quote_client import quote_client
+    from src.webull_executor import webull_executor
+    from src import metrics
+
+    api = MassiveAPIClient()
+    loop = asyncio.get_running_loop()
+
+    # Warm-up: ticker ids and expirations (reference cache), one chain per key.
+    # Every expiration the simulator lists is refreshed
+    keys = []
+    for symbol in args.symbols:
+        dates = await api.get_expirations(symbol) or []
+        keys += [(symbol, d['date']) for d in dates[:args.expirations]]
+    if not keys:
+        raise SystemExit("No expirations returned by the gateway")
+    wanted = {}
+    for symbol, expiration in keys:
+        snapshot = await api.get_batch_option_data_async(symbol, expiration)
+        price = await api.get_current_price(symbol) or 0
+        strikes = sorted(snapshot.strikes('C'), key=lambda s: abs(s - price))[:max(1, args.wanted // 2)]
+        wanted[(symbol, expiration)] = {(s, t) for s in strikes for t in ('C', 'P')}
+
+    async def refresh(symbol, expiration):
+        if args.cold:
+            chain_skeletons.invalidate(api._search_symbol(symbol), expiration)
+        if args.mode == 'chain':
+            return await api.get_batch_option_data_async(symbol, expiration)
+        if args.mode == 'chain-sync':
+            return await webull_executor.run("bench", api.get_batch_option_data, symbol, expiration)
+        if args.mode == 'targeted':
+            return await api.get_quotes_for(symbol, expiration, wanted[(symbol, expiration)])
+        return await api.get_option_chain(symbol)
+
+    latencies, failures = [], 0
+    requests_before = _total(metrics.WEBULL_HTTP_REQUESTS)
+    connections_before = _total(metrics.WEBULL_HTTP_CONNECTIONS)
+    coalesced_before = sum(v for (call, result), v in metrics.WEBULL_SINGLE_FLIGHT.values().items() if result == "coalesced")
+    stop_at = loop.time() + args.duration
+
+    async def worker(index):
+        nonlocal failures
+        i = index
+        while loop.time() < stop_at:
+            symbol, expiration = keys[i % len(keys)]
+            i += args.concurrency
+            started = time.perf_counter()
+            try:
+                result = await refresh(symbol, expiration)
+            except Exception:
+                result = None
+            latencies.append(time.perf_counter() - started)
+            if not result:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    refreshes = len(latencies)
+    requests = _total(metrics.WEBULL_HTTP_REQUESTS) - requests_before
+    connections = _total(metrics.WEBULL_HTTP_CONNECTIONS) - connections_before
+    coalesced = sum(v for (call, result), v in metrics.WEBULL_SINGLE_FLIGHT.values().items() if result == "coalesced") - coalesced_before
+    latencies.sort()
+    print(f"mode={args.mode} cold={args.cold} keys={len(keys)} concurrency={args.concurrency} duration={elapsed:.1f}s")
+    print(f"refreshes        {refreshes}  ({refreshes / elapsed:.1f}/s), failed/empty {failures}, coalesced {coalesced}")
+    print(f"latency (ms)     p50 {_percentile(latencies, 0.50) * 1000:.1f}  p95 {_percentile(latencies, 0.95) * 1000:.1f}"
+          f"  p99 {_percentile(latencies, 0.99) * 1000:.1f}  max {(latencies[-1] if latencies else 0) * 1000:.1f}")
+    print(f"http requests    {requests}  ({requests / max(1, refreshes):.2f} per refresh), new connections {connections}")
+    calls = metrics.WEBULL_CALLS.values()
+    print("executor calls   " + ", ".join(f"{call}/{result}={count}" for (call, result), count in sorted(calls.items())))
+
+    await quote_client.close()
+    webull_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=MODES, default="chain")
+    parser.add_argument("--symbols", nargs="+", default=["SPY", "QQQ", "IWM"])
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent refresh loops")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of measurement")
+    parser.add_argument("--wanted", type=int, default=4, help="contracts per refresh in targeted mode")
+    parser.add_argument("--cold", action="store_true", help="drop chain skeletons before every refresh")
+    parser.add_argument("--url", help="use a running simulator instead of starting one")
+    sim = parser.add_argument_group("simulator (when started by this script)")
+    webull_gateway_sim.add_arguments(sim)
+    args = parser.parse_args()
+
+    sim_args = []
+    for name in ("strikes", "expirations", "latency", "jitter", "error_rate", "throttle_rate", "seed"):
+        value = getattr(args, name)
+        if value is not None:
+            sim_args += [f"--{name.replace('_', '-')}", str(value)]
+    process = None
+    url = args.url
+    if not url:
+        process, url = _start_simulator(sim_args)
+
+    # Config reads these at import; the reference cache must not touch the bot's real cache file
+    os.environ["WEBULL_GATEWAY_URL"] = url
+    os.environ["WEBULL_REFERENCE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "reference_cache.json")
+    try:
+        asyncio.run(run(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Local simulator of the Webull HTTP endpoints used by MassiveAPIClient, for load
+tests without Webull (see scripts/webull_client_bench.py).
+
+Endpoints (under /api, any host prefix the webull library uses):
+    GET  /search/pc/tickers?keyword=SPY                      ticker lookup
+    GET  /quotes/ticker/getTickerRealTime?tickerId=...       underlying quote
+    POST /quote/option/strategy/list                         expirations + option chains
+    GET  /quote/option/quotes/queryBatch?derivativeIds=...   batch option quotes
+    GET  /__stats                                            request counts per endpoint and status
+
+Chains are synthetic but stable: ids encode (underlying, expiration, strike, side),
+so quotes can be generated for any id. Latency, 500 errors and 429 throttling are injected.
+
+    python scripts/webull_gateway_sim.py --port 8765 --latency 40 --jitter 20 --error-rate 0.01 --throttle-rate 0.02
+
+Point the bot at it with WEBULL_GATEWAY_URL=http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import logging
+import math
+import random
+import time
+import zlib
+from collections import Counter
+from datetime import date, timedelta
+from aiohttp import web
+
+logger = logging.getLogger("webull_gateway_sim")
+
+# Derivative id layout: UNDERLYING * ID_UNDERLYING + expiration * ID_EXPIRATION + strike * 2 + side
+ID_UNDERLYING = 10 ** 7
+ID_EXPIRATION = 10 ** 5
+
+
+def underlying_id(symbol):
+    return 1000 + zlib.crc32(symbol.upper().encode()) % 90000
+
+
+def base_price(ticker_id):
+    return 50 + (ticker_id * 7919) % 450
+
+
+class GatewaySim:
+    def __init__(self, strikes, expirations, latency, jitter, error_rate, throttle_rate, seed=None):
+        self.strikes = strikes
+        self.expirations = expirations
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self.symbols = {}  # {tickerId: symbol}
+
+    # --- market model ---
+
+    def underlying_price(self, ticker_id):
+        # Slow deterministic drift so repeated quotes move
+        return round(base_price(ticker_id) * (1 + 0.01 * math.sin(time.time() / 60 + ticker_id)), 2)
+
+    def expiration_dates(self):
+        dates, day = [], date.today()
+        while len(dates) < self.expirations:
+            if day.weekday() < 5:
+                dates.append(day)
+            day += timedelta(days=1)
+        return dates
+
+    def strike_grid(self, ticker_id):
+        price = base_price(ticker_id)
+        step = 5 if price >= 200 else 1
+        first = round(price / step) * step - step * (self.strikes // 2)
+        return [first + step * i for i in range(self.strikes)]
+
+    def chain_payload(self, ticker_id):
+        symbol = self.symbols.get(ticker_id, f"T{ticker_id}")
+        expire_list = []
+        for exp_index, exp_date in enumerate(self.expiration_dates()):
+            entries = []
+            for strike_index, strike in enumerate(self.strike_grid(ticker_id)):
+                for side, direction in ((0, 'call'), (1, 'put')):
+                    derivative_id = ticker_id * ID_UNDERLYING + exp_index * ID_EXPIRATION + strike_index * 2 + side
+                    entries.append({
+                        'tickerId': derivative_id,
+                        'symbol': f"{symbol}{exp_date:%y%m%d}{'C' if side == 0 else 'P'}{int(strike * 1000):08d}",
+                        'strikePrice': f"{strike:g}",
+                        'direction': direction,
+                        'expireDate': exp_date.isoformat(),
+                        'unSymbol': symbol,
+                        'quoteMultiplier': 100,
+                        **self.option_quote(derivative_id),
+                    })
+            expire_list.append({
+                'from': {'date': exp_date.isoformat(), 'days': (exp_date - date.today()).days, 'weekly': 1, 'unSymbol': symbol},
+                'data': entries,
+            })
+        return {'expireDateList': expire_list}
+
+    def option_quote(self, derivative_id):
+        ticker_id = derivative_id // ID_UNDERLYING
+        rest = derivative_id % ID_UNDERLYING
+        exp_index, strike_index, side = rest // ID_EXPIRATION, (rest % ID_EXPIRATION) // 2, rest % 2
+        strikes = self.strike_grid(ticker_id)
+        strike = strikes[min(strike_index, len(strikes) - 1)]
+        spot = self.underlying_price(ticker_id)
+        intrinsic = max(0.0, spot - strike) if side == 0 else max(0.0, strike - spot)
+        extrinsic = spot * 0.01 * (1 + exp_index) * math.exp(-abs(spot - strike) / (spot * 0.03))
+        mid = max(0.05, round(intrinsic + extrinsic, 2))
+        spread = max(0.05, round(mid * 0.02, 2))
+        return {
+            'tickerId': derivative_id,
+            'close': f"{mid:.2f}",
+            'preClose': f"{mid:.2f}",
+            'change': "0.00",
+            'changeRatio': "0.0000",
+            'volume': str(self.random.randint(0, 5000)),
+            'openInterest': str(self.random.randint(0, 20000)),
+            'impVol': f"{0.15 + 0.05 * exp_index:.4f}",
+            'bidList': [{'price': f"{max(0.01, mid - spread / 2):.2f}", 'volume': "10"}],
+            'askList': [{'price': f"{mid + spread / 2:.2f}", 'volume': "10"}],
+        }
+
+    # --- HTTP ---
+
+    @web.middleware
+    async def faults(self, request, handler):
+        endpoint = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        if endpoint != '/__stats':
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            if delay:
+                await asyncio.sleep(delay)
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                self.stats[(endpoint, 429)] += 1
+                return web.json_response({'code': 'too_many_requests'}, status=429)
+            if roll < self.throttle_rate + self.error_rate:
+                self.stats[(endpoint, 500)] += 1
+                return web.json_response({'code': 'internal_error'}, status=500)
+        response = await handler(request)
+        if endpoint != '/__stats':
+            self.stats[(endpoint, response.status)] += 1
+        return response
+
+    async def search_tickers(self, request):
+        symbol = request.query.get('keyword', '').upper()
+        ticker_id = underlying_id(symbol)
+        self.symbols[ticker_id] = symbol
+        return web.json_response({'data': [{'tickerId': ticker_id, 'symbol': symbol, 'disSymbol': symbol}]})
+
+    async def ticker_quote(self, request):
+        ticker_id = int(request.query.get('tickerId', 0))
+        price = self.underlying_price(ticker_id)
+        return web.json_response({'tickerId': ticker_id, 'close': f"{price:.2f}", 'price': f"{price:.2f}"})
+
+    async def option_chains(self, request):
+        body = await request.json()
+        return web.json_response(self.chain_payload(int(body.get('tickerId', 0))))
+
+    async def quote_batch(self, request):
+        ids = [int(i) for i in request.query.get('derivativeIds', '').split(',') if i]
+        return web.json_response([self.option_quote(i) for i in ids])
+
+    async def stats_view(self, request):
+        return web.json_response([
+            {'endpoint': endpoint, 'status': status, 'count': count}
+            for (endpoint, status), count in sorted(self.stats.items())
+        ])
+
+    def app(self):
+        app = web.Application(middlewares=[self.faults])
+        app.router.add_get('/api/search/pc/tickers', self.search_tickers)
+        app.router.add_get('/api/quotes/ticker/getTickerRealTime', self.ticker_quote)
+        app.router.add_post('/api/quote/option/strategy/list', self.option_chains)
+        app.router.add_get('/api/quote/option/quotes/queryBatch', self.quote_batch)
+        app.router.add_get('/__stats', self.stats_view)
+        return app
+
+
+def add_arguments(parser):
+    parser.add_argument("--strikes", type=int, default=120, help="strikes per expiration")
+    parser.add_argument("--expirations", type=int, default=4, help="expirations per underlying")
+    parser.add_argument("--latency", type=float, default=30, help="mean response latency (ms)")
+    parser.add_argument("--jitter", type=float, default=10, help="latency std dev (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def build(args):
+    return GatewaySim(args.strikes, args.expirations, args.latency, args.jitter,
+                      args.error_rate, args.throttle_rate, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    web.run_app(build(args).app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
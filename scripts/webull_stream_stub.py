@@ -0,0 +1,196 @@
+"""
+Local stand-in for Webull's push quote server (wspush), for testing the
+monitor's streaming mode without Webull.
+
+Speaks the subset of MQTT 3.1.1 the quote stream uses (plain TCP, QoS 0) and
+Webull's subscription protocol: a client subscribes to JSON topics such as
+{"tickerIds":[123],"type":"104"} and receives pushes on {"tickerId":123,"type":104}
+with a random-walk bid/ask (104) and last trade (105) for every subscribed contract.
+
+    python scripts/webull_stream_stub.py --port 1883 --interval 0.5 --drop-every 60
+
+Point the bot at it:
+    WEBULL_STREAMING=true WEBULL_STREAM_HOST=127.0.0.1 WEBULL_STREAM_PORT=1883 \\
+    WEBULL_STREAM_TRANSPORT=tcp WEBULL_STREAM_TLS=false
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import struct
+import time
+
+logger = logging.getLogger("webull_stream_stub")
+
+CONNECT, CONNACK, PUBLISH, SUBSCRIBE, SUBACK = 1, 2, 3, 8, 9
+UNSUBSCRIBE, UNSUBACK, PINGREQ, PINGRESP, DISCONNECT = 10, 11, 12, 13, 14
+
+
+def _packet(packet_type, body=b"", flags=0):
+    header = bytes([(packet_type << 4) | flags])
+    length, encoded = len(body), bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        encoded.append(byte | (0x80 if length else 0))
+        if not length:
+            break
+    return header + bytes(encoded) + body
+
+
+def _string(data, pos):
+    length = struct.unpack_from("!H", data, pos)[0]
+    return data[pos + 2:pos + 2 + length].decode("utf-8"), pos + 2 + length
+
+
+async def _read_packet(reader):
+    first = (await reader.readexactly(1))[0]
+    multiplier, length = 1, 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length += (byte & 0x7F) * multiplier
+        if not byte & 0x80:
+            break
+        multiplier *= 128
+    return first >> 4, await reader.readexactly(length)
+
+
+class StubSession:
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.subscriptions = {}  # {tickerId: {type, ...}}
+
+    def publish(self, topic, payload):
+        body = struct.pack("!H", len(topic)) + topic.encode("utf-8") + json.dumps(payload).encode("utf-8")
+        self.writer.write(_packet(PUBLISH, body))
+
+    def _subscribe(self, topic):
+        try:
+            request = json.loads(topic)
+        except ValueError:
+            return
+        if not isinstance(request, dict) or "tickerIds" not in request:
+            return  # hello header
+        for ticker_id in request["tickerIds"]:
+            self.subscriptions.setdefault(int(ticker_id), set()).add(str(request.get("type", "105")))
+
+    def _unsubscribe(self, topic):
+        # Webull format: ["type=104&tid=123"]
+        try:
+            for item in json.loads(topic):
+                params = dict(part.split("=", 1) for part in item.split("&"))
+                types = self.subscriptions.get(int(params["tid"]), set())
+                types.discard(params["type"])
+                if not types:
+                    self.subscriptions.pop(int(params["tid"]), None)
+        except (ValueError, KeyError):
+            pass
+
+    async def run(self):
+        while True:
+            packet_type, body = await _read_packet(self.reader)
+            if packet_type == CONNECT:
+                self.writer.write(_packet(CONNACK, b"\x00\x00"))
+            elif packet_type in (SUBSCRIBE, UNSUBSCRIBE):
+                packet_id, pos, codes = body[:2], 2, b""
+                while pos < len(body):
+                    topic, pos = _string(body, pos)
+                    if packet_type == SUBSCRIBE:
+                        pos += 1  # requested QoS
+                        codes += b"\x00"
+                        self._subscribe(topic)
+                    else:
+                        self._unsubscribe(topic)
+                if packet_type == SUBSCRIBE:
+                    self.writer.write(_packet(SUBACK, packet_id + codes))
+                else:
+                    self.writer.write(_packet(UNSUBACK, packet_id))
+            elif packet_type == PINGREQ:
+                self.writer.write(_packet(PINGRESP))
+            elif packet_type == DISCONNECT:
+                return
+            await self.writer.drain()
+
+
+class StubServer:
+    def __init__(self, interval, volatility, drop_every):
+        self.interval = interval
+        self.volatility = volatility
+        self.drop_every = drop_every
+        self.sessions = set()
+        self.prices = {}  # {tickerId: last price}
+        self.pushes = 0
+
+    async def handle(self, reader, writer):
+        session = StubSession(self, reader, writer)
+        self.sessions.add(session)
+        logger.info(f"client connected from {writer.get_extra_info('peername')}")
+        try:
+            await session.run()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+            logger.info(f"client disconnected ({len(session.subscriptions)} contracts subscribed)")
+
+    def _quote_push(self, ticker_id, quote_type):
+        price = self.prices.get(ticker_id) or round(random.uniform(1, 10), 2)
+        price = max(0.05, round(price * (1 + random.gauss(0, self.volatility)), 2))
+        self.prices[ticker_id] = price
+        if quote_type == "104":
+            return {"tickerId": ticker_id, "status": "T",
+                    "bidList": [{"price": f"{price - 0.05:.2f}", "volume": "10"}],
+                    "askList": [{"price": f"{price + 0.05:.2f}", "volume": "10"}]}
+        return {"tickerId": ticker_id, "status": "T", "transId": self.pushes,
+                "deal": {"trdBs": "N", "volume": "1", "tradeTime": time.strftime("%H:%M:%S"), "price": f"{price:.2f}"}}
+
+    async def publish_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for session in list(self.sessions):
+                for ticker_id, types in list(session.subscriptions.items()):
+                    for quote_type in types:
+                        topic = json.dumps({"tickerId": ticker_id, "type": int(quote_type)})
+                        session.publish(topic, self._quote_push(ticker_id, quote_type))
+                        self.pushes += 1
+
+    async def drop_loop(self):
+        # Simulated stream outages: the bot must fall back to polling and resubscribe on reconnect
+        while True:
+            await asyncio.sleep(self.drop_every)
+            logger.info(f"dropping {len(self.sessions)} connection(s)")
+            for session in list(self.sessions):
+                session.writer.close()
+
+
+async def serve(args):
+    server = StubServer(args.interval, args.volatility, args.drop_every)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    logger.info(f"Webull push stand-in listening on {args.host}:{args.port}")
+    tasks = [asyncio.create_task(server.publish_loop())]
+    if args.drop_every:
+        tasks.append(asyncio.create_task(server.drop_loop()))
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between pushes per contract")
+    parser.add_argument("--volatility", type=float, default=0.02, help="std dev of each price step (fraction)")
+    parser.add_argument("--drop-every", type=float, default=0, help="close all connections every N seconds (0: never)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
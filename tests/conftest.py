@@ -0,0 +1,30 @@
+"""
+Tests run the bot's real Webull client against the local gateway simulator
+(scripts/webull_gateway_sim.py). Config reads the environment at import, so the
+simulator is started and the environment set before any `src` module is imported.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "webull_bot"))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from webull_client_bench import _start_simulator  # noqa: E402
+
+_simulator = None
+
+
+def pytest_configure(config):
+    global _simulator
+    _simulator, url = _start_simulator(["--latency", "0", "--jitter", "0", "--seed", "1"])
+    os.environ["WEBULL_GATEWAY_URL"] = url
+    # The reference cache must not touch the bot's real cache file
+    os.environ["WEBULL_REFERENCE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "reference_cache.json")
+
+
+def pytest_unconfigure(config):
+    if _simulator is not None:
+        _simulator.terminate()
+        _simulator.wait()
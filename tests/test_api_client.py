@@ -0,0 +1,40 @@
+"""MassiveAPIClient against the gateway simulator."""
+import asyncio
+from datetime import date
+
+from src.api_client import MassiveAPIClient
+from src.chain_skeleton import chain_skeletons
+
+
+async def _nearest_strike(api, symbol, expiration):
+    snapshot = await api.get_batch_option_data_async(symbol, expiration)
+    price = await api.get_current_price(symbol)
+    return min(snapshot.strikes('C'), key=lambda strike: abs(strike - price))
+
+
+def test_targeted_quotes_accept_date_expiration():
+    # Monitoring commands hold the expiration as a datetime.date (psycopg2 / asyncpg)
+    async def run():
+        api = MassiveAPIClient()
+        expiration = (await api.get_expirations("SPY"))[0]['date']
+        strike = await _nearest_strike(api, "SPY", expiration)
+        # No cached skeleton: the chain structure is fetched with the date expiration
+        chain_skeletons.invalidate(api._search_symbol("SPY"), expiration)
+        snapshot = await api.get_quotes_for("SPY", date.fromisoformat(expiration), {(strike, 'C')})
+        return snapshot, strike, expiration
+
+    snapshot, strike, expiration = asyncio.run(run())
+    assert not snapshot.degraded
+    assert snapshot.expiration == expiration
+    assert snapshot.find(strike, 'C') is not None
+
+
+def test_chain_accepts_date_expiration():
+    async def run():
+        api = MassiveAPIClient()
+        expiration = (await api.get_expirations("QQQ"))[0]['date']
+        chain_skeletons.invalidate(api._search_symbol("QQQ"), expiration)
+        return await api.get_batch_option_data_async("QQQ", date.fromisoformat(expiration))
+
+    snapshot = asyncio.run(run())
+    assert len(snapshot) > 0
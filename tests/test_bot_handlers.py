@@ -0,0 +1,29 @@
+"""Contract pricing used by the handlers for entry / exit P&L, against the gateway simulator."""
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+from src import bot_handlers
+from src.services import get_api
+from src.snapshot_cache import chain_cache
+
+
+def test_command_contract_data_with_date_expiration():
+    # A monitoring_commands row as asyncpg returns it: date expiration, Decimal strike
+    async def run():
+        api = get_api()
+        expiration = (await api.get_expirations("IWM"))[0]['date']
+        snapshot = await api.get_batch_option_data_async("IWM", expiration)
+        strike = snapshot.strikes('P')[len(snapshot.strikes('P')) // 2]
+        # Nothing cached for this expiration: the contract is quoted on demand
+        chain_cache._entries.clear()
+        chain_cache._contracts.clear()
+        cmd = {
+            'symbol': 'IWM', 'contract_type': 'PUT', 'strike': Decimal(str(strike)),
+            'expiration': date.fromisoformat(expiration),
+        }
+        return await bot_handlers.get_command_contract_data(cmd, allow_stale=False)
+
+    data = asyncio.run(run())
+    assert data is not None
+    assert data['bid'] > 0 and data['ask'] > 0
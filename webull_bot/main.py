@@ -4,11 +4,20 @@ from aiogram import Bot, Dispatcher
 from src.config import Config
 from src.bot_handlers import router
 from src.monitor import MonitorEngine
+from src.render_service import render_service
+from src.quote_client import quote_client
+from src.webull_executor import webull_executor
+from src import services
+from src.pg_pool import pg_pool
+from src.command_repository import command_repository
 
 logging.basicConfig(level=logging.INFO)
 
 async def main():
     Config.validate()
+    # Database and Webull client, shared by the handlers and the monitor
+    await asyncio.to_thread(services.init)
+    await command_repository.connect()
     
     bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
     dp = Dispatcher()
@@ -21,6 +30,11 @@ async def main():
         await dp.start_polling(bot)
     finally:
         await monitor.stop()
+        render_service.shutdown()
+        webull_executor.shutdown()
+        await quote_client.close()
+        await command_repository.close()
+        pg_pool.close()
         await bot.session.close()
 
 if __name__ == "__main__":
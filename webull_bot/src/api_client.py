@@ -1,37 +1,46 @@
-import aiohttp
 import logging
 import asyncio
-import requests
-import urllib3
 import os
 import shutil
 import tempfile
+import time
 import certifi
 from .config import Config
+from .chain_snapshot import ChainSnapshot, expiration_str, normalize_type
+from .metrics import MONITOR_STAGE_SECONDS, WEBULL_SINGLE_FLIGHT
+from .quote_client import quote_client, QUOTES_BATCH_URL, QUOTE_BATCH_SIZE
+from . import http_transport
+from .reference_cache import reference_cache
+from .chain_skeleton import chain_skeletons, skeleton_index
+from .chain_table import ChainTable
+from .webull_executor import webull_executor, CircuitOpenError
+from .quote_stream import QuoteStream
 from webull import webull # Import webull
-import certifi
-import os
 
-os.environ['SSL_CERT_FILE'] = certifi.where()
-os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
-
-# --- FIX FOR ARABIC PATHS ("مستقل") CAUSING SSL ERRORS ---
-try:
-    # 1. Create a safe temp directory (ASCII path)
-    safe_temp_dir = tempfile.gettempdir()
-    safe_cert_path = os.path.join(safe_temp_dir, "cacert.pem")
-    
-    # 2. Copy the certificate file from the problematic path to the safe path
-    current_cert_path = certifi.where()
-    shutil.copy2(current_cert_path, safe_cert_path)
-    
-    # 3. Force requests/curl/openssl to use the safe path
-    os.environ['REQUESTS_CA_BUNDLE'] = safe_cert_path
-    os.environ['CURL_CA_BUNDLE'] = safe_cert_path
-    os.environ['SSL_CERT_FILE'] = safe_cert_path
-    
-except Exception as e:
-    logging.warning(f"Failed to apply SSL fix: {e}")
+_ca_bundle_installed = False
+
+
+def install_ca_bundle():
+    """
+    Point requests/curl/openssl at a copy of the certifi bundle in the temp
+    directory. Fixes SSL errors when the install path is not ASCII (Arabic
+    folder names such as "مستقل"). Runs once, on the first MassiveAPIClient.
+    """
+    global _ca_bundle_installed
+    if _ca_bundle_installed:
+        return
+    _ca_bundle_installed = True
+    os.environ['SSL_CERT_FILE'] = certifi.where()
+    os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
+    try:
+        # Copy the certificate file from the problematic path to a safe (ASCII) path
+        safe_cert_path = os.path.join(tempfile.gettempdir(), "cacert.pem")
+        shutil.copy2(certifi.where(), safe_cert_path)
+        os.environ['REQUESTS_CA_BUNDLE'] = safe_cert_path
+        os.environ['CURL_CA_BUNDLE'] = safe_cert_path
+        os.environ['SSL_CERT_FILE'] = safe_cert_path
+    except Exception as e:
+        logging.warning(f"Failed to apply SSL fix: {e}")
 
 # # Disable SSL Warnings as a backup
 # urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -48,15 +57,89 @@ except Exception as e:
 
 logger = logging.getLogger(__name__)
 
+# Min seconds between skeleton rebuilds caused by strikes missing from it (get_quotes_for)
+SKELETON_REBUILD_INTERVAL = 60
+
 class MassiveAPIClient:
     def __init__(self):
+        install_ca_bundle()
         # Initialize Webull client
+        # All library calls (get_options, get_ticker, get_quote, ...) go through one pooled Session
+        self.transport = http_transport.webull_transport
+        http_transport.install(self.transport)
         self.wb = webull()
         self.wb._access_token = Config.WEBULL_ACCESS_TOKEN
         self.wb.logged_in = True
+        self.wb.timeout = self.transport.timeout
+        if Config.WEBULL_GATEWAY_URL:
+            # Every library endpoint (ticker search, quotes, option chains) on the simulator
+            for name in vars(self.wb._urls):
+                if name.startswith('base_'):
+                    setattr(self.wb._urls, name, f"{Config.WEBULL_GATEWAY_URL}/api")
         
-        # Cache for ticker IDs to reduce API calls
-        self.ticker_cache = {}
+        # Cache for ticker IDs (and expiration lists) to reduce API calls.
+        # Installed on the client instance so the library's internal lookups
+        # (get_options -> get_ticker) hit the cache too.
+        self.ticker_cache = reference_cache
+        self._fetch_ticker_id = self.wb.get_ticker
+        self._fetch_expiration_dates = self.wb.get_options_expiration_dates
+        self.wb.get_ticker = self._cached_ticker_id
+        self.wb.get_options_expiration_dates = self._cached_expiration_dates
+        # {(symbol, expiration): monotonic time of the last skeleton rebuild forced by get_quotes_for}
+        self._skeleton_rebuilds = {}
+        # {(call, *key): asyncio.Task} of requests currently in flight (see _single_flight)
+        self._in_flight = {}
+        # {(kind, symbol, expiration): last non-empty ChainSnapshot}, served while Webull is unavailable
+        self._last_snapshots = {}
+        # Push quote stream, started by the monitor when WEBULL_STREAMING is on
+        self.stream = None
+        self._stream_groups = {}
+        self._stream_listener = None
+
+    async def _single_flight(self, call, key, factory):
+        """
+        Run `factory()` once for concurrent identical requests: callers arriving while
+        the same (call, key) is in flight await that task instead of starting their own.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (call,) + tuple(key)
+        task = self._in_flight.get(flight_key)
+        if task is not None and task.get_loop() is loop:
+            WEBULL_SINGLE_FLIGHT.inc(call=call, result="coalesced")
+        else:
+            WEBULL_SINGLE_FLIGHT.inc(call=call, result="leader")
+            # factory() returns a coroutine or an executor future
+            task = asyncio.ensure_future(factory())
+            self._in_flight[flight_key] = task
+
+            def done(finished):
+                if self._in_flight.get(flight_key) is finished:
+                    del self._in_flight[flight_key]
+            task.add_done_callback(done)
+        # Shielded: a caller that gets cancelled must not cancel the fetch others are waiting on
+        return await asyncio.shield(task)
+
+    def _cached_ticker_id(self, stock=''):
+        """wb.get_ticker backed by the persistent cache (ids rarely change)."""
+        if not stock or not isinstance(stock, str):
+            return self._fetch_ticker_id(stock)
+        ticker_id = self.ticker_cache.get_ticker_id(stock)
+        if ticker_id is None:
+            ticker_id = self._fetch_ticker_id(stock)
+            if ticker_id:
+                self.ticker_cache.set_ticker_id(stock, ticker_id)
+        return ticker_id
+
+    def _cached_expiration_dates(self, stock=None, count=-1):
+        """wb.get_options_expiration_dates, refreshed once per trading day."""
+        if not stock or not isinstance(stock, str) or count != -1:
+            return self._fetch_expiration_dates(stock, count)
+        dates = self.ticker_cache.get_expirations(stock)
+        if dates is None:
+            dates = self._fetch_expiration_dates(stock, count)
+            if dates:
+                self.ticker_cache.set_expirations(stock, dates)
+        return dates
 
     def _get_occ_symbol(self, symbol, expiration, contract_type, strike, use_original_symbol=False):
         """Format parameters into OCC Option Symbol."""
@@ -90,166 +173,287 @@ class MassiveAPIClient:
 
         return f"{root}{exp_str}{type_str}{strike_str}"
 
-    def _get_webull_data(self, symbol, contract_type, expiration, strike):
-        """Fetch real-time data using Webull options chain."""
+    def get_batch_option_data(self, symbol, expiration):
+        """
+        Fetch entire option chain for a symbol and expiration to support batch lookups.
+        Returns a ChainSnapshot keyed by (strike, type_char) with a sorted strike index.
+        Blocking; async callers should use get_batch_option_data_async.
+        """
+        expiration = expiration_str(expiration)
         try:
-            # Normalize inputs
-            target_strike = float(strike)
-            is_call = contract_type.upper().startswith('C')
-            
-            # Map symbol (SPXW -> SPX)
-            search_symbol = symbol.upper()
-            if search_symbol in ['SPXW', 'SPXP']:
-                search_symbol = 'SPX'
-            elif search_symbol in ['NDXW', 'NDXP']:
-                 search_symbol = 'NDX'
-
-            # Use get_options to find the chain and specific contract
-            # This seems more reliable than guessing OCC symbols
-            try:
-                # wb.get_options handles 'tickerId' lookup internally if we pass symbol string
-                chain = self.wb.get_options(stock=search_symbol, expireDate=expiration)
-                
-                if chain and isinstance(chain, list):
-                    # Find closest strike
-                    target_row = None
-                    for row in chain:
-                        row_strike = float(row.get('strikePrice', 0))
-                        if abs(row_strike - target_strike) < 0.01:
-                            target_row = row
-                            break
-                    
-                    if target_row:
-                        type_key = 'call' if is_call else 'put'
-                        if type_key in target_row:
-                            data = target_row[type_key]
-                            
-                            # --- NEW LOGIC: Fetch Real-Time Quote for this specific contract ---
-                            ticker_id = data.get('tickerId')
-                            if ticker_id:
-                                # Fetch single quote
-                                quotes_map = self._fetch_option_quotes_batch([ticker_id])
-                                if ticker_id in quotes_map:
-                                    data.update(quotes_map[ticker_id])
-                            # -------------------------------------------------------------------
-                            
-                            # Extract Data - Try multiple sources
-                            last = float(data.get('close') or data.get('price') or data.get('preClose') or 0)
-                            
-                            # Bid - Try multiple sources
-                            bid = 0.0
-                            if 'bidList' in data and data['bidList'] and len(data['bidList']) > 0:
-                                bid = float(data['bidList'][0].get('price', 0) or 0)
-                            elif 'bid' in data:
-                                bid = float(data.get('bid', 0) or 0)
-                            
-                            # Ask - Try multiple sources
-                            ask = 0.0
-                            if 'askList' in data and data['askList'] and len(data['askList']) > 0:
-                                ask = float(data['askList'][0].get('price', 0) or 0)
-                            elif 'ask' in data:
-                                ask = float(data.get('ask', 0) or 0)
-                            
-                            # If no bid/ask but we have last price, estimate
-                            if bid == 0 and ask == 0 and last > 0:
-                                bid = last * 0.95
-                                ask = last * 1.05
-                                
-                            volume = int(data.get('volume') or 0)
-                            oi = int(data.get('openInterest') or 0)
-                            
-                            # Construct OCC symbol if possible or use what we have
-                            # SPXW260121C06805000 is inside 'symbol' key usually
-                            contract_symbol = data.get('symbol')
-
-                            return {
-                                'last_price': last,
-                                'bid': bid,
-                                'ask': ask,
-                                'volume': volume,
-                                'openInterest': oi,
-                                'impliedVolatility': float(data.get('impVol') or 0),
-                                'change_abs': float(data.get('change') or 0),
-                                'change_pct': float(data.get('changeRatio') or 0),
-                                'underlying_price': 0, # Webull options response might not have underlying real-time
-                                'contractSymbol': contract_symbol
-                            }
-
-            except Exception as e:
-                logger.warning(f"Failed to fetch option chain via Webull: {e}")
-
-            logger.warning(f"No data found in Webull chain for {symbol} {expiration} {strike}")
-            return None
-
+            chain, fresh = self._get_chain_rows(symbol, expiration)
+            quotes_map = self._fetch_option_quotes_batch(self._chain_derivative_ids(chain))
+            return self._build_snapshot(symbol, expiration, chain, quotes_map, fresh)
         except Exception as e:
-            logger.error(f"Webull Fetch Error for {symbol}: {e}")
-            return None
-
+            logger.error(f"Batch fetch error for {symbol} {expiration}: {e}")
+            return ChainSnapshot(symbol, expiration)
+
+    async def get_batch_option_data_async(self, symbol, expiration):
+        """
+        Same as get_batch_option_data, but the real-time quotes are fetched on the
+        event loop through the shared keep-alive session, all batches at once.
+        """
+        expiration = expiration_str(expiration)
+        return await self._single_flight(
+            "chain", (symbol.upper(), str(expiration)),
+            lambda: self._get_batch_option_data_async(symbol, expiration)
+        )
+
+    async def _get_batch_option_data_async(self, symbol, expiration):
+        try:
+            # Steady state: skeleton from cache, one round of quote requests
+            search_symbol = self._search_symbol(symbol)
+            chain = chain_skeletons.get(search_symbol, expiration)
+            fresh = False
+            if chain is None:
+                chain = await self._fetch_chain_rows_async(search_symbol, expiration)
+                fresh = True
+            quotes_map = await webull_executor.call(
+                "quotes", quote_client.fetch, self._chain_derivative_ids(chain), headers=self._quote_headers()
+            )
+            if self.stream is not None:
+                self.stream.seed(quotes_map)
+            snapshot = self._build_snapshot(symbol, expiration, chain, quotes_map, fresh)
+            return self._remember("chain", symbol, expiration, snapshot)
+        except CircuitOpenError:
+            return self._last_snapshot(symbol, expiration)
         except Exception as e:
-            logger.error(f"Webull Fetch Error for {symbol}: {e}")
-            return None
-
-    def get_batch_option_data(self, symbol, expiration):
-        """Fetch entire option chain for a symbol and expiration to support batch lookups."""
+            logger.error(f"Batch fetch error for {symbol} {expiration}: {e}")
+            return self._last_snapshot(symbol, expiration)
+
+    async def get_quotes_for(self, symbol, expiration, wanted):
+        """
+        Real-time data for only the `wanted` contracts {(strike, type), ...} of one expiration,
+        as a ChainSnapshot. Derivative ids are resolved from the chain skeleton (nearest
+        strike within tolerance), so a refresh queries a handful of ids instead of the chain.
+        """
+        expiration = expiration_str(expiration)
+        return await self._single_flight(
+            "quotes", (symbol.upper(), str(expiration), frozenset(wanted)),
+            lambda: self._get_quotes_for(symbol, expiration, wanted)
+        )
+
+    async def _get_quotes_for(self, symbol, expiration, wanted):
         try:
-            # Map symbol (SPXW -> SPX)
-            search_symbol = symbol.upper()
-            if search_symbol in ['SPXW', 'SPXP']:
-                search_symbol = 'SPX'
-            elif search_symbol in ['NDXW', 'NDXP']:
-                 search_symbol = 'NDX'
-
-            # Fetch Chain
-            chain = self.wb.get_options(stock=search_symbol, expireDate=expiration)
-            
-            # Dictionary for looking up contracts: Key is (strike, type_char)
-            # type_char: 'C' or 'P'
+            search_symbol = self._search_symbol(symbol)
+            index = chain_skeletons.get_index(search_symbol, expiration)
+            unresolved = index is not None and not all(index.find(s, t) for s, t in wanted)
+            if unresolved:
+                # A strike listed since the skeleton was built? Rebuild at most once a minute
+                # per expiration, so a strike that never exists does not cost a chain call each cycle
+                key = (search_symbol, str(expiration))
+                now = time.monotonic()
+                if now - self._skeleton_rebuilds.get(key, float('-inf')) < SKELETON_REBUILD_INTERVAL:
+                    unresolved = False
+                else:
+                    self._skeleton_rebuilds[key] = now
+            if index is None or unresolved:
+                rows = await self._fetch_chain_rows_async(search_symbol, expiration)
+                index = skeleton_index(search_symbol, expiration, rows)
+
+            targets = self._resolve_targets(index, wanted)
+            quotes_map = await webull_executor.call("quotes", quote_client.fetch, list(targets), headers=self._quote_headers())
+            if self.stream is not None:
+                self.stream.seed(quotes_map)
             lookup = {}
-
-            if chain and isinstance(chain, list):
-                # --- NEW LOGIC: Fetch Real-Time Quotes ---
-                derivative_ids = []
-                for row in chain:
-                    if 'call' in row and row['call'].get('tickerId'):
-                        derivative_ids.append(row['call']['tickerId'])
-                    if 'put' in row and row['put'].get('tickerId'):
-                        derivative_ids.append(row['put']['tickerId'])
-                
-                # Fetch real-time quotes
-                quotes_map = self._fetch_option_quotes_batch(derivative_ids)
-                
-                # Merge quotes back into chain
-                for row in chain:
-                    if 'call' in row:
-                        tid = row['call'].get('tickerId')
-                        if tid and tid in quotes_map:
-                            row['call'].update(quotes_map[tid])
-                    if 'put' in row:
-                        tid = row['put'].get('tickerId')
-                        if tid and tid in quotes_map:
-                            row['put'].update(quotes_map[tid])
-                # -----------------------------------------
-
-                for row in chain:
-                    row_strike = float(row.get('strikePrice', 0))
-                    
-                    # Parse Call
-                    if 'call' in row:
-                        data = row['call']
-                        processed = self._parse_webull_option_data(data)
-                        lookup[(row_strike, 'C')] = processed
-                    
-                    # Parse Put
-                    if 'put' in row:
-                        data = row['put']
-                        processed = self._parse_webull_option_data(data)
-                        lookup[(row_strike, 'P')] = processed
-            
-            return lookup
-            
+            parse_started = time.perf_counter()
+            for ticker_id, (key, static) in targets.items():
+                quote = quotes_map.get(ticker_id)
+                if quote is not None:
+                    lookup[key] = self._parse_webull_option_data({**static, **quote})
+            MONITOR_STAGE_SECONDS.observe(time.perf_counter() - parse_started, stage="parse")
+            return self._remember("quotes", symbol, expiration, ChainSnapshot(symbol, expiration, lookup))
+        except CircuitOpenError:
+            return self._last_snapshot(symbol, expiration)
         except Exception as e:
-            logger.error(f"Batch fetch error for {symbol} {expiration}: {e}")
-            return {}
+            logger.error(f"Targeted quote fetch error for {symbol} {expiration}: {e}")
+            return self._last_snapshot(symbol, expiration)
+
+    @staticmethod
+    def _resolve_targets(index, wanted):
+        """{tickerId: ((strike, type), static contract dict)} for the `wanted` contracts found in a skeleton index."""
+        targets = {}
+        for strike, contract_type in wanted:
+            static = index.find(strike, contract_type)
+            if static and static.get('tickerId'):
+                targets[static['tickerId']] = ((static['strikePrice'], normalize_type(contract_type)), static)
+        return targets
+
+    # --- Push quote stream (monitored contracts) ---
+
+    def start_streaming(self, on_update):
+        """
+        Start the push quote stream. `on_update((symbol, expiration))` is called on the
+        event loop for every subscribed group a push changed.
+        """
+        self._stream_listener = on_update
+        self.stream = QuoteStream(self.wb._did, Config.WEBULL_ACCESS_TOKEN, on_change=self._on_stream_change)
+        self.stream.start(asyncio.get_running_loop())
+
+    def stop_streaming(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+
+    def _on_stream_change(self, ticker_id):
+        for key in self._stream_groups.get(ticker_id, ()):
+            self._stream_listener(key)
+
+    def update_stream_subscriptions(self, groups):
+        """
+        Subscribe the stream to the contracts of `groups` ({(symbol, expiration): wanted}).
+        Contracts are resolved from cached chain skeletons; a group without one yet is
+        picked up after its first poll has built it.
+        """
+        if self.stream is None:
+            return
+        stream_groups = {}  # {tickerId: {group key, ...}}
+        for key, wanted in groups.items():
+            symbol, expiration = key
+            index = chain_skeletons.get_index(self._search_symbol(symbol), expiration_str(expiration), count=False)
+            if index is None:
+                continue
+            for ticker_id in self._resolve_targets(index, wanted):
+                stream_groups.setdefault(ticker_id, set()).add(key)
+        self._stream_groups = stream_groups
+        self.stream.set_subscriptions(stream_groups)
+
+    def stream_snapshot(self, symbol, expiration, wanted):
+        """
+        ChainSnapshot of the `wanted` contracts from live streamed quotes, without any request.
+        None if the stream is down or a contract has no quote re-seeded by a poll within
+        WEBULL_STREAM_RESYNC seconds; the caller polls instead.
+        """
+        if self.stream is None or not self.stream.connected:
+            return None
+        expiration = expiration_str(expiration)
+        index = chain_skeletons.get_index(self._search_symbol(symbol), expiration, count=False)
+        if index is None:
+            return None
+        targets = self._resolve_targets(index, wanted)
+        if len(targets) < len(wanted):
+            return None
+        lookup = {}
+        for ticker_id, (key, static) in targets.items():
+            quote = self.stream.quote(ticker_id, Config.WEBULL_STREAM_RESYNC)
+            if quote is None:
+                return None
+            lookup[key] = self._parse_webull_option_data({**static, **quote})
+        return ChainSnapshot(symbol, expiration, lookup)
+
+    def _remember(self, kind, symbol, expiration, snapshot):
+        """Keep `snapshot` as the last good one for (symbol, expiration); returns it."""
+        if snapshot:
+            key = (kind, symbol.upper(), str(expiration))
+            self._last_snapshots.pop(key, None)
+            self._last_snapshots[key] = snapshot
+            # Oldest first (insertion order); expired chains age out here
+            while len(self._last_snapshots) > Config.CHAIN_CACHE_MAX_ENTRIES:
+                del self._last_snapshots[next(iter(self._last_snapshots))]
+        return snapshot
+
+    def _last_snapshot(self, symbol, expiration):
+        """
+        Newest good snapshot for (symbol, expiration) while Webull is failing or the circuit
+        is open, marked degraded (its fetched_at shows the age). Empty if nothing was fetched yet.
+        """
+        candidates = [
+            snapshot for snapshot in (
+                self._last_snapshots.get((kind, symbol.upper(), str(expiration))) for kind in ("chain", "quotes")
+            ) if snapshot
+        ]
+        if not candidates:
+            return ChainSnapshot(symbol, expiration, degraded=True)
+        return max(candidates, key=lambda snapshot: snapshot.fetched_at).as_degraded()
+
+    @staticmethod
+    def _search_symbol(symbol):
+        # Map symbol (SPXW -> SPX)
+        search_symbol = symbol.upper()
+        if search_symbol in ['SPXW', 'SPXP']:
+            search_symbol = 'SPX'
+        elif search_symbol in ['NDXW', 'NDXP']:
+            search_symbol = 'NDX'
+        return search_symbol
+
+    def _quote_headers(self):
+        # Request headers (access token, device id) as the library builds them; copied
+        # because the library mutates one shared dict per call. Unset values (no token)
+        # are dropped, as requests does; aiohttp rejects them
+        return {key: value for key, value in self.wb.build_req_headers().items() if value is not None}
+
+    def _get_chain_rows(self, symbol, expiration):
+        """
+        Chain rows (strikePrice + call/put dicts) for one expiration, as (rows, fresh).
+        The structure comes from the skeleton cache when possible (fresh=False: no prices);
+        otherwise from wb.get_options (fresh=True: rows still carry that call's prices).
+        """
+        search_symbol = self._search_symbol(symbol)
+        skeleton = chain_skeletons.get(search_symbol, expiration)
+        if skeleton is not None:
+            return skeleton, False
+        return self._fetch_chain_rows(search_symbol, expiration), True
+
+    def _fetch_chain_rows(self, search_symbol, expiration):
+        """Full chain rows from wb.get_options; their structure is stored in the skeleton cache."""
+        # wb.get_options matches expireDate against the chain's 'YYYY-MM-DD' strings
+        expiration = expiration_str(expiration)
+        chain = self.wb.get_options(stock=search_symbol, expireDate=expiration)
+        chain = chain if chain and isinstance(chain, list) else []
+        if chain:
+            chain_skeletons.put(search_symbol, expiration, chain)
+        return chain
+
+    async def _fetch_chain_rows_async(self, search_symbol, expiration):
+        # The webull library is blocking; only the chain structure call uses the Webull executor.
+        # Shared by the full-chain and targeted paths, so they never rebuild the same chain twice at once.
+        expiration = expiration_str(expiration)
+        return await self._single_flight(
+            "chain_rows", (search_symbol, str(expiration)),
+            lambda: webull_executor.run("chain_rows", self._fetch_chain_rows, search_symbol, expiration)
+        )
+
+    @staticmethod
+    def _chain_derivative_ids(chain):
+        derivative_ids = []
+        for row in chain:
+            if 'call' in row and row['call'].get('tickerId'):
+                derivative_ids.append(row['call']['tickerId'])
+            if 'put' in row and row['put'].get('tickerId'):
+                derivative_ids.append(row['put']['tickerId'])
+        return derivative_ids
+
+    def _build_snapshot(self, symbol, expiration, chain, quotes_map, fresh=True):
+        """
+        Merge real-time quotes into the chain rows and parse them into a ChainSnapshot.
+        Contracts without a quote keep the chain's own prices only if the rows are
+        fresh; skeleton rows carry no prices, so those contracts are left out.
+        """
+        # Dictionary for looking up contracts: Key is (strike, type_char)
+        # type_char: 'C' or 'P'
+        lookup = {}
+
+        if not fresh and chain and not quotes_map:
+            # Nothing quoted: the skeleton may be outdated (contracts replaced), rebuild next time
+            chain_skeletons.invalidate(self._search_symbol(symbol), expiration)
+
+        parse_started = time.perf_counter()
+        for row in chain:
+            row_strike = float(row.get('strikePrice', 0))
+
+            for side, type_char in (('call', 'C'), ('put', 'P')):
+                if side not in row:
+                    continue
+                # Merge without touching the (possibly cached) row
+                quote = quotes_map.get(row[side].get('tickerId'))
+                if quote is None and not fresh:
+                    continue
+                data = {**row[side], **quote} if quote else row[side]
+                lookup[(row_strike, type_char)] = self._parse_webull_option_data(data)
+        if chain:
+            MONITOR_STAGE_SECONDS.observe(time.perf_counter() - parse_started, stage="parse")
+
+        return ChainSnapshot(symbol, expiration, lookup)
 
     def _parse_webull_option_data(self, data):
         """Helper to parse a single option data dict from Webull chain."""
@@ -290,50 +494,43 @@ class MassiveAPIClient:
             'contractSymbol': data.get('symbol')
         }
 
-    async def get_market_data(self, symbol, contract_type, expiration, strike):
-        """Fetch real-time data for a specific option contract using Webull."""
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self._get_webull_data, symbol, contract_type, expiration, strike)
-
     async def get_current_price(self, symbol):
         """Fetch current price for the underlying asset using Webull."""
+        return await self._single_flight("price", (symbol.upper(),), lambda: self._get_current_price(symbol))
+
+    async def _get_current_price(self, symbol):
         try:
-            loop = asyncio.get_running_loop()
-            
             def fetch():
-                # Get ticker ID
-                try:
-                    # Search for ticker
-                    # Note: get_ticker(symbol) returns info
-                    ticker_info = self.wb.get_ticker(symbol)
-                    
-                    if not ticker_info or 'tickerId' not in ticker_info:
-                        logger.warning(f"Webull ticker not found for {symbol}")
-                        return None
-                        
-                    ticker_id = ticker_info['tickerId']
-                    
-                    # Get Quote
-                    # Note: get_quote requires tId parameter if we pass an ID string/int
-                    quote = self.wb.get_quote(tId=str(ticker_id))
-                    # price is usually in 'close', 'price', 'pPrice'
-                    # quote usually contains: 'close', 'open', 'high', 'low', 'price', 'bid', 'ask' etc.
-                    current_price = float(quote.get('close') or quote.get('price') or quote.get('pPrice') or 0)
-                    return current_price
-                except Exception as e:
-                    logger.error(f"Webull get_current_price error: {e}")
+                # Search for ticker (cached)
+                # Note: get_ticker(symbol) returns the tickerId (int)
+                ticker_info = self.wb.get_ticker(symbol)
+                
+                if not ticker_info:
+                    logger.warning(f"Webull ticker not found for {symbol}")
                     return None
+                    
+                ticker_id = ticker_info['tickerId'] if isinstance(ticker_info, dict) else ticker_info
+                
+                # Get Quote
+                # Note: get_quote requires tId parameter if we pass an ID string/int
+                quote = self.wb.get_quote(tId=str(ticker_id))
+                # price is usually in 'close', 'price', 'pPrice'
+                # quote usually contains: 'close', 'open', 'high', 'low', 'price', 'bid', 'ask' etc.
+                current_price = float(quote.get('close') or quote.get('price') or quote.get('pPrice') or 0)
+                return current_price
             
-            price = await loop.run_in_executor(None, fetch)
-            return price
+            # Errors propagate to the executor so they count towards its circuit breaker
+            return await webull_executor.run("price", fetch)
         except Exception as e:
             logger.error(f"Error fetching price from Webull for {symbol}: {e}")
             return None
 
     async def get_expirations(self, symbol):
         """Fetch available expirations for a symbol."""
+        return await self._single_flight("expirations", (symbol.upper(),), lambda: self._get_expirations(symbol))
+
+    async def _get_expirations(self, symbol):
         try:
-            loop = asyncio.get_running_loop()
             def fetch():
                 search_symbol = symbol.upper()
                 if search_symbol in ['SPXW', 'SPXP']: search_symbol = 'SPX'
@@ -341,7 +538,7 @@ class MassiveAPIClient:
                 
                 return self.wb.get_options_expiration_dates(search_symbol)
             
-            return await loop.run_in_executor(None, fetch)
+            return await webull_executor.run("expirations", fetch)
         except Exception as e:
             logger.error(f"Error fetching expirations: {e}")
             return []
@@ -353,18 +550,18 @@ class MassiveAPIClient:
                 return {}
             
             # Use Webull's batch quote API
-            url = 'https://quotes-gw.webullfintech.com/api/quote/option/quotes/queryBatch'
-            headers = self.wb._headers
+            url = QUOTES_BATCH_URL
+            headers = self._quote_headers()
             
             # Split into batches of 50 to avoid API limits
-            batch_size = 50
+            batch_size = QUOTE_BATCH_SIZE
             all_quotes = {}
             
             for i in range(0, len(derivative_ids), batch_size):
                 batch_ids = derivative_ids[i:i+batch_size]
                 params = {'derivativeIds': ','.join(map(str, batch_ids))}
                 
-                response = requests.get(url, params=params, headers=headers, timeout=10)
+                response = self.transport.get(url, params=params, headers=headers)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -381,9 +578,13 @@ class MassiveAPIClient:
 
     async def get_option_chain(self, symbol, expiry_days_target=None):
         """Fetch option chain for a symbol using Webull."""
+        return await self._single_flight(
+            "option_chain", (symbol.upper(), expiry_days_target),
+            lambda: self._get_option_chain(symbol, expiry_days_target)
+        )
+
+    async def _get_option_chain(self, symbol, expiry_days_target=None):
         try:
-            loop = asyncio.get_running_loop()
-            
             def fetch_webull_chain():
                 # Map symbol (SPXW -> SPX)
                 search_symbol = symbol.upper()
@@ -444,205 +645,31 @@ class MassiveAPIClient:
                     if not target_date:
                          return None, current_price
 
-                    # Get Chain for this expiration (Explicitly)
-                    chain = self.wb.get_options(stock=search_symbol, expireDate=target_date)
-                    
-                    # Collect all derivative IDs to fetch real-time quotes
-                    derivative_ids = []
-                    for row in chain:
-                        if 'call' in row and row['call'].get('tickerId'):
-                            derivative_ids.append(row['call']['tickerId'])
-                        if 'put' in row and row['put'].get('tickerId'):
-                            derivative_ids.append(row['put']['tickerId'])
-                    
-                    # Fetch real-time quotes for all options in batch
-                    quotes_map = self._fetch_option_quotes_batch(derivative_ids)
-                    
-                    # Merge quotes back into chain data
-                    for row in chain:
-                        if 'call' in row:
-                            ticker_id = row['call'].get('tickerId')
-                            if ticker_id and ticker_id in quotes_map:
-                                # Update call data with real-time quote
-                                row['call'].update(quotes_map[ticker_id])
-                        if 'put' in row:
-                            ticker_id = row['put'].get('tickerId')
-                            if ticker_id and ticker_id in quotes_map:
-                                # Update put data with real-time quote
-                                row['put'].update(quotes_map[ticker_id])
-                    
-                    return chain, current_price
+                    # Chain structure (skeleton cache or wb.get_options) + real-time quotes
+                    chain, fresh = self._get_chain_rows(symbol, target_date)
+                    quotes_map = self._fetch_option_quotes_batch(self._chain_derivative_ids(chain))
+                    if not fresh and chain and not quotes_map:
+                        # Nothing quoted and skeleton rows carry no prices: use a priced
+                        # wb.get_options call instead (it also rebuilds a possibly outdated skeleton)
+                        chain, fresh = self._fetch_chain_rows(search_symbol, target_date), True
+                    return ChainTable.from_webull(chain, quotes_map, fresh), current_price
                 except Exception as e:
                     logger.error(f"Webull chain fetch error: {e}")
-                    return None, 0
+                    # Re-raised so the executor retries and counts it towards its circuit breaker
+                    raise
 
-            chain, current_price = await loop.run_in_executor(None, fetch_webull_chain)
+            table, current_price = await webull_executor.run("option_chain", fetch_webull_chain)
             
-            if chain is None:
+            if table is None:
                  return None
 
-            result = []
-            entry_call = 0
-            entry_put = 0
-            
-            # Chain is list of dicts: {'strikePrice': ..., 'call': {...}, 'put': {...}}
-            
-            # Helper to check proximity
-            def is_atm(strike):
-                return abs(float(strike) - current_price)
-
-            # --- Process Chain ---
-            # Sort by strike distance to current price for ATM filter
-            if current_price > 0:
-                chain.sort(key=lambda x: abs(float(x.get('strikePrice', 0)) - current_price))
-                # Take 14 closest
-                chain = chain[:14]
-                # Sort back by strike
-                chain.sort(key=lambda x: float(x.get('strikePrice', 0)))
-            else:
-                 chain = chain[:14]
-
-            # Find ATM strikes for Entry calculation
-            if current_price > 0 and len(chain) > 0:
-                 # Closest is roughly the middle of our filtered list
-                 # Just iterate to find best approximation
-                 best_atm_row = min(chain, key=lambda x: abs(float(x.get('strikePrice', 0)) - current_price))
-                 atm_strike = float(best_atm_row.get('strikePrice'))
-                 
-                 # Calculate entries
-                 if 'call' in best_atm_row:
-                     c_bid = 0
-                     c_ask = 0
-                     c_data = best_atm_row['call']
-                     
-                     # Try multiple sources for bid
-                     if 'bidList' in c_data and c_data['bidList'] and len(c_data['bidList']) > 0:
-                         c_bid = float(c_data['bidList'][0].get('price', 0) or 0)
-                     elif 'bid' in c_data:
-                         c_bid = float(c_data.get('bid', 0) or 0)
-                     
-                     # Try multiple sources for ask
-                     if 'askList' in c_data and c_data['askList'] and len(c_data['askList']) > 0:
-                         c_ask = float(c_data['askList'][0].get('price', 0) or 0)
-                     elif 'ask' in c_data:
-                         c_ask = float(c_data.get('ask', 0) or 0)
-                     
-                     # Fallback to close/price if no bid/ask
-                     if c_bid == 0 and c_ask == 0:
-                         c_last = float(c_data.get('close') or c_data.get('price') or c_data.get('preClose') or 0)
-                         if c_last > 0:
-                             c_bid = c_last
-                             c_ask = c_last
-                     
-                     mid = (c_bid + c_ask) / 2
-                     entry_call = atm_strike + mid
-                
-                 if 'put' in best_atm_row:
-                     p_bid = 0
-                     p_ask = 0
-                     p_data = best_atm_row['put']
-                     
-                     # Try multiple sources for bid
-                     if 'bidList' in p_data and p_data['bidList'] and len(p_data['bidList']) > 0:
-                         p_bid = float(p_data['bidList'][0].get('price', 0) or 0)
-                     elif 'bid' in p_data:
-                         p_bid = float(p_data.get('bid', 0) or 0)
-                     
-                     # Try multiple sources for ask
-                     if 'askList' in p_data and p_data['askList'] and len(p_data['askList']) > 0:
-                         p_ask = float(p_data['askList'][0].get('price', 0) or 0)
-                     elif 'ask' in p_data:
-                         p_ask = float(p_data.get('ask', 0) or 0)
-                     
-                     # Fallback to close/price if no bid/ask
-                     if p_bid == 0 and p_ask == 0:
-                         p_last = float(p_data.get('close') or p_data.get('price') or p_data.get('preClose') or 0)
-                         if p_last > 0:
-                             p_bid = p_last
-                             p_ask = p_last
-                     
-                     mid = (p_bid + p_ask) / 2
-                     entry_put = atm_strike - mid
-
-            for row in chain:
-                strike = float(row.get('strikePrice'))
-                
-                # Call
-                if 'call' in row:
-                    c_data = row['call']
-                    c_bid = 0
-                    c_ask = 0
-                    c_last = 0
-                    
-                    # Try multiple sources for bid
-                    if 'bidList' in c_data and c_data['bidList'] and len(c_data['bidList']) > 0:
-                        c_bid = float(c_data['bidList'][0].get('price', 0) or 0)
-                    elif 'bid' in c_data:
-                        c_bid = float(c_data.get('bid', 0) or 0)
-                    
-                    # Try multiple sources for ask
-                    if 'askList' in c_data and c_data['askList'] and len(c_data['askList']) > 0:
-                        c_ask = float(c_data['askList'][0].get('price', 0) or 0)
-                    elif 'ask' in c_data:
-                        c_ask = float(c_data.get('ask', 0) or 0)
-                    
-                    # Try multiple sources for last price
-                    c_last = float(c_data.get('close') or c_data.get('price') or c_data.get('preClose') or 0)
-                    
-                    # If no bid/ask but we have last price, estimate from last
-                    if c_bid == 0 and c_ask == 0 and c_last > 0:
-                        c_bid = c_last * 0.95  # Estimate bid at 95% of last
-                        c_ask = c_last * 1.05  # Estimate ask at 105% of last
-                    
-                    result.append({
-                        "contract_id": c_data.get('symbol'),
-                        "strike": strike,
-                        "type": 'C',
-                        "bid": c_bid,
-                        "ask": c_ask,
-                        "last": c_last,
-                        "volume": int(c_data.get('volume') or 0)
-                    })
-                
-                # Put
-                if 'put' in row:
-                    p_data = row['put']
-                    p_bid = 0
-                    p_ask = 0
-                    p_last = 0
-                    
-                    # Try multiple sources for bid
-                    if 'bidList' in p_data and p_data['bidList'] and len(p_data['bidList']) > 0:
-                        p_bid = float(p_data['bidList'][0].get('price', 0) or 0)
-                    elif 'bid' in p_data:
-                        p_bid = float(p_data.get('bid', 0) or 0)
-                    
-                    # Try multiple sources for ask
-                    if 'askList' in p_data and p_data['askList'] and len(p_data['askList']) > 0:
-                        p_ask = float(p_data['askList'][0].get('price', 0) or 0)
-                    elif 'ask' in p_data:
-                        p_ask = float(p_data.get('ask', 0) or 0)
-                    
-                    # Try multiple sources for last price
-                    p_last = float(p_data.get('close') or p_data.get('price') or p_data.get('preClose') or 0)
-                    
-                    # If no bid/ask but we have last price, estimate from last
-                    if p_bid == 0 and p_ask == 0 and p_last > 0:
-                        p_bid = p_last * 0.95  # Estimate bid at 95% of last
-                        p_ask = p_last * 1.05  # Estimate ask at 105% of last
-                    
-                    result.append({
-                        "contract_id": p_data.get('symbol'),
-                        "strike": strike,
-                        "type": 'P',
-                        "bid": p_bid,
-                        "ask": p_ask,
-                        "last": p_last,
-                        "volume": int(p_data.get('volume') or 0)
-                    })
-            
+            # 14 strikes closest to the current price, ATM entries from that window
+            table = table.nearest_strikes(current_price, 14)
+            entry_call, entry_put = table.atm_entries(current_price)
+
             return {
-                'contracts': result,
+                'contracts': table.to_records(),
+                'table': table,
                 'entry_call': entry_call,
                 'entry_put': entry_put
             }
@@ -1,15 +1,14 @@
 from aiogram import Router, types
 from aiogram.filters import Command
 from aiogram import F
-from .database import Database
-from .api_client import MassiveAPIClient
-from .image_gen import ImageGenerator
-from .contract_card_gen import ContractCardGenerator
-from .postgres_client import PostgresClient
+from .services import get_api
+from .command_repository import command_repository
+from .render_service import render_service
+from .snapshot_cache import chain_cache
+from .chain_snapshot import expiration_str, normalize_type
 from .config import Config
 from aiogram.types import FSInputFile, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 import json
-import asyncio
 import os
 from datetime import date
 import logging
@@ -17,11 +16,41 @@ import logging
 logger = logging.getLogger(__name__)
 
 router = Router()
-db = Database()
-api = MassiveAPIClient()
-image_gen = ImageGenerator()
-contract_card = ContractCardGenerator()
-pg_client = PostgresClient()
+
+async def get_contract_data(symbol, contract_type, expiration, strike, allow_stale=True):
+    """
+    Parsed data of one contract, or None. Read from the contracts the monitor
+    quoted, then from a cached chain snapshot; otherwise only this contract is
+    quoted. Pass allow_stale=False for a price saved as an entry or exit: it
+    accepts nothing older than CHAIN_CACHE_TTL and no last-known data served
+    while Webull is unavailable.
+    """
+    try:
+        strike = float(strike)
+    except (TypeError, ValueError):
+        return None
+    # Commands hold the expiration as a date; the caches and Webull use 'YYYY-MM-DD'
+    expiration = expiration_str(expiration)
+    max_age = None if allow_stale else chain_cache.ttl
+    contract = chain_cache.peek_contract(symbol, expiration, strike, contract_type, max_age=max_age)
+    if contract is not None:
+        return contract
+    chain_data = chain_cache.peek(symbol, expiration, max_age=max_age)
+    if chain_data is not None and (allow_stale or not chain_data.degraded):
+        # Exact strike first, then nearest strike within tolerance (bisect on the snapshot index)
+        contract = chain_data.find(strike, contract_type)
+        if contract is not None:
+            return contract
+    quotes = await get_api().get_quotes_for(symbol, expiration, {(strike, normalize_type(contract_type))})
+    if quotes.degraded and not allow_stale:
+        logger.warning(f"Webull unavailable, no price for {symbol} {strike} {contract_type} {expiration}")
+        return None
+    chain_cache.put_contracts(quotes)
+    return quotes.find(strike, contract_type)
+
+async def get_command_contract_data(cmd, allow_stale=True):
+    """Current data of a monitoring command's contract, or None."""
+    return await get_contract_data(cmd['symbol'], cmd['contract_type'], cmd['expiration'], cmd['strike'], allow_stale)
 
 # Helper to default date to today
 def validate_or_default_date(expiration_str):
@@ -120,7 +149,7 @@ async def handle_remove_callback(callback: types.CallbackQuery):
         cmd_id = int(callback.data.split("_")[1])
 
         # Postgres Logic: Close contract log
-        cmd = db.get_command(cmd_id)
+        cmd = await command_repository.get_command(cmd_id)
         if not cmd:
             await callback.answer("❌ لم يتم العثور على الأمر", show_alert=True)
             return
@@ -128,21 +157,7 @@ async def handle_remove_callback(callback: types.CallbackQuery):
         price = 0
         if cmd.get('postgres_id'):
              try:
-                 # Use get_batch_option_data like monitor does (more reliable)
-                 loop = asyncio.get_running_loop()
-                 chain_data = await loop.run_in_executor(None, api.get_batch_option_data, cmd['symbol'], str(cmd['expiration']))
-                 
-                 # Find our contract in the chain
-                 contract_type = 'C' if str(cmd['contract_type']).upper().startswith('C') else 'P'
-                 target_strike = float(cmd['strike'])
-                 
-                 data = chain_data.get((target_strike, contract_type))
-                 if not data:
-                     # Try fuzzy match
-                     for (s, t), d in chain_data.items():
-                         if t == contract_type and abs(s - target_strike) < 0.05:
-                             data = d
-                             break
+                 data = await get_command_contract_data(cmd, allow_stale=False)
                  
                  if data:
                      bid = data.get('bid', 0) or 0
@@ -151,11 +166,11 @@ async def handle_remove_callback(callback: types.CallbackQuery):
                      price = mid if mid > 0 else (data.get('last_price', 0) or 0)
                  else:
                      price = 0
-                 await asyncio.to_thread(pg_client.update_close_price, cmd['postgres_id'], price, data)
+                 await command_repository.update_close_price(cmd['postgres_id'], price, data)
              except Exception as e:
                  print(f"Postgres update error: {e}")
 
-        if db.remove_command(cmd_id):
+        if await command_repository.remove_command(cmd_id):
             await callback.answer("🗑 تم الحذف")
             await callback.message.edit_text(f"🗑 تم حذف المراقبة رقم {cmd_id}.")
         else:
@@ -170,7 +185,7 @@ async def handle_stop_callback(callback: types.CallbackQuery):
         return
     try:
         cmd_id = int(callback.data.split("_")[1])
-        if db.update_command_status(cmd_id, 'paused'):
+        if await command_repository.update_command_status(cmd_id, 'paused'):
             await callback.answer("⏸ تم الإيقاف المؤقت")
             await callback.message.answer(f"⏸ تم إيقاف العملية رقم {cmd_id} مؤقتاً.")
             # Refresh the list to show the new status
@@ -187,7 +202,7 @@ async def handle_run_callback(callback: types.CallbackQuery):
         return
     try:
         cmd_id = int(callback.data.split("_")[1])
-        if db.update_command_status(cmd_id, 'active'):
+        if await command_repository.update_command_status(cmd_id, 'active'):
             await callback.answer("▶ تم التشغيل")
             await callback.message.answer(f"▶ تم استئناف العملية رقم {cmd_id}.")
             # Refresh the list to show the new status
@@ -209,7 +224,7 @@ async def handle_delete_callback(callback: types.CallbackQuery):
         cmd_id = int(callback.data.split("_")[1])
         
         # Postgres Logic: Close contract log
-        cmd = db.get_command(cmd_id)
+        cmd = await command_repository.get_command(cmd_id)
         if not cmd:
             await callback.answer("❌ لم يتم العثور على الأمر", show_alert=True)
             return
@@ -217,21 +232,7 @@ async def handle_delete_callback(callback: types.CallbackQuery):
         price = 0
         if cmd.get('postgres_id'):
              try:
-                 # Use get_batch_option_data like monitor does (more reliable)
-                 loop = asyncio.get_running_loop()
-                 chain_data = await loop.run_in_executor(None, api.get_batch_option_data, cmd['symbol'], str(cmd['expiration']))
-                 
-                 # Find our contract in the chain
-                 contract_type = 'C' if str(cmd['contract_type']).upper().startswith('C') else 'P'
-                 target_strike = float(cmd['strike'])
-                 
-                 data = chain_data.get((target_strike, contract_type))
-                 if not data:
-                     # Try fuzzy match
-                     for (s, t), d in chain_data.items():
-                         if t == contract_type and abs(s - target_strike) < 0.05:
-                             data = d
-                             break
+                 data = await get_command_contract_data(cmd, allow_stale=False)
                  
                  if data:
                      bid = data.get('bid', 0) or 0
@@ -242,11 +243,11 @@ async def handle_delete_callback(callback: types.CallbackQuery):
                  else:
                      logger.warning(f"Delete Callback: No market data found for CMD {cmd_id}")
                      price = 0
-                 await asyncio.to_thread(pg_client.update_close_price, cmd['postgres_id'], price, data)
+                 await command_repository.update_close_price(cmd['postgres_id'], price, data)
              except Exception as e:
                  print(f"Postgres update error: {e}")
 
-        db.remove_command(cmd_id)
+        await command_repository.remove_command(cmd_id)
         await callback.answer("تم حذف المراقبة.")
         await callback.message.reply(f"🛑 تم إيقاف عملية المراقبة رقم {cmd_id} بنجاح.")
     except Exception as e:
@@ -277,10 +278,36 @@ async def handle_fav_callback(callback: types.CallbackQuery):
     except Exception as e:
         await callback.answer(f"حدث خطأ: {e}", show_alert=True)
 
+def _format_chain_side(title, contracts, index):
+    table = f"{title}\n"
+    table += "ID   Strike    Bid    Ask    Last   Vol\n"
+    table += "────────────────────────────────────\n"
+    for i in index:
+        c = contracts[i]
+        strike_str = f"{c['strike']:g}"
+        table += f"{c['simple_id']:<3}  {strike_str:<8} {c['bid']:<6.2f} {c['ask']:<6.2f} {c['last']:<6.2f} {c['volume']:,}\n"
+    return table
+
+def build_chain_tables(chain_result):
+    """
+    Replace last_gso_contracts with the chain's contracts (simple IDs 1, 2, 3...)
+    and return the (calls, puts) tables. Each side shows asks between 2 and 10
+    when it has more than 10 contracts (all of them if none match), by strike.
+    """
+    global last_gso_contracts
+    contracts = chain_result['contracts']
+    last_gso_contracts = {}
+    for simple_id, c in enumerate(contracts, start=1):
+        c['simple_id'] = simple_id
+        last_gso_contracts[simple_id] = c
+
+    table = chain_result['table']
+    call_table = _format_chain_side("عقود الكول:", contracts, table.display_index('C'))
+    put_table = _format_chain_side("عقود البوت:", contracts, table.display_index('P'))
+    return call_table, put_table
+
 @router.message(F.text.lower().startswith("gso") | F.text.lower().startswith("g "))
 async def handle_gso_command(message: types.Message):
-    global last_gso_contracts
-    
     # Check Admin
     if Config.ADMIN_USER_IDS and str(message.from_user.id) not in Config.ADMIN_USER_IDS:
         await message.reply("⛔ ليس لديك صلاحية لاستخدام هذا الأمر.")
@@ -299,64 +326,17 @@ async def handle_gso_command(message: types.Message):
         await message.answer("⌛ جاري جلب البيانات...")
         
         # 2. Fetch Option Chain
-        chain_result = await api.get_option_chain(symbol)
+        chain_result = await get_api().get_option_chain(symbol)
         
         if not chain_result:
              await message.answer("لم يتم العثور على بيانات لهذا الرمز.")
              return
 
-        chain_data = chain_result['contracts']
         entry_call = chain_result['entry_call']
         entry_put = chain_result['entry_put']
 
-        # 3. Clear previous list and assign new simple IDs (1, 2, 3...)
-        last_gso_contracts = {}
-        simple_id = 1
-        for c in chain_data:
-            c['simple_id'] = simple_id
-            last_gso_contracts[simple_id] = c
-            simple_id += 1
-
-        # Get all calls and puts first
-        all_calls = [c for c in chain_data if c['type'] == 'C']
-        all_puts = [c for c in chain_data if c['type'] == 'P']
-        
-        # Apply filter only if list has more than 10 items
-        if len(all_calls) > 10:
-            # Filter: Ask between 2 and 10
-            filtered_calls = [c for c in all_calls if 2 <= c.get('ask', 0) <= 10]
-            # Fallback: if filter returns empty, show all
-            calls = filtered_calls if filtered_calls else all_calls
-        else:
-            calls = all_calls
-            
-        if len(all_puts) > 10:
-            # Filter: Ask between 2 and 10
-            filtered_puts = [c for c in all_puts if 2 <= c.get('ask', 0) <= 10]
-            # Fallback: if filter returns empty, show all
-            puts = filtered_puts if filtered_puts else all_puts
-        else:
-            puts = all_puts
-        
-        # Sort by strike
-        calls.sort(key=lambda x: x['strike'])
-        puts.sort(key=lambda x: x['strike'])
-        
-        # Format Call Table with simple 3-digit ID
-        call_table = "عقود الكول:\n"
-        call_table += "ID   Strike    Bid    Ask    Last   Vol\n"
-        call_table += "────────────────────────────────────\n"
-        for c in calls:
-             strike_str = f"{c['strike']:g}"
-             call_table += f"{c['simple_id']:<3}  {strike_str:<8} {c['bid']:<6.2f} {c['ask']:<6.2f} {c['last']:<6.2f} {c['volume']:,}\n"
-
-        # Format Put Table with simple 3-digit ID
-        put_table = "عقود البوت:\n"
-        put_table += "ID   Strike    Bid    Ask    Last   Vol\n"
-        put_table += "────────────────────────────────────\n"
-        for c in puts:
-             strike_str = f"{c['strike']:g}"
-             put_table += f"{c['simple_id']:<3}  {strike_str:<8} {c['bid']:<6.2f} {c['ask']:<6.2f} {c['last']:<6.2f} {c['volume']:,}\n"
+        # 3. Assign simple IDs (1, 2, 3...) and build the tables
+        call_table, put_table = build_chain_tables(chain_result)
 
         entry_msg = f"🟢 دخول الكول : {entry_call:.2f}\n🔴 دخول البوت : {entry_put:.2f}"
         summary_msg = f"📊 *{symbol}* - استخدم `/x <ID>` للمراقبة"
@@ -442,7 +422,7 @@ async def cmd_monitor(message: types.Message):
         expiration = parts[3] if len(parts) > 3 else date.today().strftime("%Y-%m-%d")
 
         # Fetch fresh data for Postgres log and Image
-        data = await api.get_market_data(symbol.upper(), c_type.upper(), expiration, strike)
+        data = await get_contract_data(symbol.upper(), c_type.upper(), expiration, strike, allow_stale=False)
         if not data:
             data = {'last_price': 0, 'bid': 0, 'ask': 0}
 
@@ -452,13 +432,12 @@ async def cmd_monitor(message: types.Message):
         current_price = (bid + ask) / 2 if (bid and ask) else (data.get('last_price', 0) or 0)
 
         # Log to Postgres with entry market data
-        pg_id = await asyncio.to_thread(
-            pg_client.add_contract_log, 
+        pg_id = await command_repository.add_contract_log(
             symbol.upper(), c_type.upper(), float(strike), expiration, current_price,
-            None, data  # auction_day=None, market_data=data
+            market_data=data
         )
 
-        cmd_id = db.add_command(message.chat.id, symbol.upper(), float(strike), c_type.upper(), expiration, postgres_id=pg_id)
+        cmd_id = await command_repository.add_command(message.chat.id, symbol.upper(), float(strike), c_type.upper(), expiration, postgres_id=pg_id)
         await message.answer(f"✅ بدأت المراقبة لـ {symbol} {strike} {c_type} {expiration}.\nرقم: {cmd_id}")
 
         # Notify Group using template (Same as /x command)
@@ -468,7 +447,6 @@ async def cmd_monitor(message: types.Message):
                 type_ar = "🟢 كول 🟢" if c_type.upper().startswith('C') else "🔴 بوت 🔴"
                 
                 # Fetch fresh data for image (Already fetched above)
-                # data = await api.get_market_data(...) - Removed duplicate call
 
                 # Prepare Image Data
                 img_data = {
@@ -488,12 +466,11 @@ async def cmd_monitor(message: types.Message):
                     'impliedVolatility': data.get('impliedVolatility', 0)
                 }
 
-                # Generate Image
-                image_buf = image_gen.generate_status_image(img_data)
+                # Generate Image (rendered in the process pool, off the event loop)
+                image_bytes = await render_service.render_status(img_data)
                 
                 from aiogram.types import BufferedInputFile
                 fname = f"{symbol}_{cmd_id}.png"
-                photo = BufferedInputFile(image_buf.read(), filename=fname)
 
                 # Prepare Caption using Template
                 template_vars = {
@@ -510,8 +487,7 @@ async def cmd_monitor(message: types.Message):
                 
                 for chat_id in Config.TELEGRAM_GROUP_IDS:
                     try:
-                        image_buf.seek(0)
-                        photo_reuse = BufferedInputFile(image_buf.read(), filename=fname)
+                        photo_reuse = BufferedInputFile(image_bytes, filename=fname)
                         
                         await message.bot.send_photo(
                             chat_id=chat_id,
@@ -536,7 +512,7 @@ async def cmd_list(message: types.Message, from_callback: bool = False):
             await message.reply("⛔ ليس لديك صلاحية لاستخدام هذا الأمر.")
             return
 
-    my_commands = db.get_chat_commands(message.chat.id)
+    my_commands = await command_repository.get_chat_commands(message.chat.id)
     
     if not my_commands:
         kb = get_user_keyboard(message.from_user.id)
@@ -575,7 +551,6 @@ async def cmd_list(message: types.Message, from_callback: bool = False):
 
 @router.message(Command("select", "x"))
 async def cmd_select(message: types.Message):
-    global last_gso_contracts
     
     # Check Admin
     if Config.ADMIN_USER_IDS and str(message.from_user.id) not in Config.ADMIN_USER_IDS:
@@ -623,7 +598,7 @@ async def cmd_select(message: types.Message):
         contract_type = "🟢 Call 🟢" if type_char == 'C' else "🔴 Put 🔴"
         
         # Fetch fresh data for Postgres log
-        data = await api.get_market_data(root.upper(), type_char.upper(), expiration, str(strike))
+        data = await get_contract_data(root.upper(), type_char.upper(), expiration, str(strike), allow_stale=False)
         if not data:
              data = {'last_price': 0, 'bid': 0, 'ask': 0}
         
@@ -632,14 +607,13 @@ async def cmd_select(message: types.Message):
         current_price = (bid + ask) / 2 if (bid and ask) else (data.get('last_price', 0) or 0)
         
         # Log to Postgres with entry market data
-        pg_id = await asyncio.to_thread(
-            pg_client.add_contract_log, 
+        pg_id = await command_repository.add_contract_log(
             root.upper(), type_char.upper(), float(strike), expiration, current_price,
-            None, data  # auction_day=None, market_data=data
+            market_data=data
         )
         
         # Add to DB
-        cmd_id = db.add_command(
+        cmd_id = await command_repository.add_command(
             chat_id=message.chat.id, 
             symbol=root, 
             strike=strike, 
@@ -666,7 +640,6 @@ async def cmd_select(message: types.Message):
                 type_ar = "🟢 كول 🟢" if type_char == 'C' else "🔴 بوت 🔴"
                 
                 # Fetch fresh data for image (Already fetched above)
-                # data = await api.get_market_data(...) - Removed duplicate
                 
                 # Calculate mid price (Already calculated)
                 # bid = ...
@@ -693,12 +666,11 @@ async def cmd_select(message: types.Message):
                     'impliedVolatility': data.get('impliedVolatility', 0)
                 }
 
-                # Generate Image
-                image_buf = image_gen.generate_status_image(img_data)
+                # Generate Image (rendered in the process pool, off the event loop)
+                image_bytes = await render_service.render_status(img_data)
                 
                 from aiogram.types import BufferedInputFile
                 fname = f"{root}_{contract_id}.png"
-                photo = BufferedInputFile(image_buf.read(), filename=fname)
 
                 # Prepare Caption using Template
                 template_vars = {
@@ -715,11 +687,8 @@ async def cmd_select(message: types.Message):
                 
                 for chat_id in Config.TELEGRAM_GROUP_IDS:
                     try:
-                        # Reset buffer position for each send if needed (BufferedInputFile handles read usually, but good practice if reused)
-                        # Actually aiogram BufferedInputFile consumes the stream. For multiple sends, we might need multiple instances or byte bytes.
-                        # It's safer to use the bytes directly.
-                        image_buf.seek(0)
-                        photo_reuse = BufferedInputFile(image_buf.read(), filename=fname)
+                        # A fresh BufferedInputFile per send, built from the same rendered bytes
+                        photo_reuse = BufferedInputFile(image_bytes, filename=fname)
                         
                         await message.bot.send_photo(
                             chat_id=chat_id,
@@ -747,7 +716,7 @@ async def cmd_remove(message: types.Message):
         cmd_id = int(message.text.split()[1])
 
         # Postgres Logic: Close contract log
-        cmd = db.get_command(cmd_id)
+        cmd = await command_repository.get_command(cmd_id)
         if not cmd:
             await message.answer(f"❌ لا توجد عملية بهذا الرقم: {cmd_id}")
             return
@@ -755,21 +724,7 @@ async def cmd_remove(message: types.Message):
         price = 0
         if cmd.get('postgres_id'):
              try:
-                 # Use get_batch_option_data like monitor does (more reliable)
-                 loop = asyncio.get_running_loop()
-                 chain_data = await loop.run_in_executor(None, api.get_batch_option_data, cmd['symbol'], str(cmd['expiration']))
-                 
-                 # Find our contract in the chain
-                 contract_type = 'C' if str(cmd['contract_type']).upper().startswith('C') else 'P'
-                 target_strike = float(cmd['strike'])
-                 
-                 data = chain_data.get((target_strike, contract_type))
-                 if not data:
-                     # Try fuzzy match
-                     for (s, t), d in chain_data.items():
-                         if t == contract_type and abs(s - target_strike) < 0.05:
-                             data = d
-                             break
+                 data = await get_command_contract_data(cmd, allow_stale=False)
                  
                  if data:
                      bid = data.get('bid', 0) or 0
@@ -780,11 +735,11 @@ async def cmd_remove(message: types.Message):
                  else:
                      logger.warning(f"Remove CMD: No market data found for CMD {cmd_id}")
                      price = 0
-                 await asyncio.to_thread(pg_client.update_close_price, cmd['postgres_id'], price, data)
+                 await command_repository.update_close_price(cmd['postgres_id'], price, data)
              except Exception as e:
                  print(f"Postgres update error: {e}")
 
-        if db.remove_command(cmd_id):
+        if await command_repository.remove_command(cmd_id):
             await message.answer(f"🗑 تم حذف العملية رقم {cmd_id}.")
         else:
             await message.answer(f"❌ لا توجد عملية بهذا الرقم: {cmd_id}")
@@ -800,7 +755,7 @@ async def cmd_stop(message: types.Message):
 
     try:
         cmd_id = int(message.text.split()[1])
-        if db.update_command_status(cmd_id, 'paused'):
+        if await command_repository.update_command_status(cmd_id, 'paused'):
             await message.answer(f"⏸ تم إيقاف العملية رقم {cmd_id} مؤقتاً.")
         else:
             await message.answer(f"❌ لا توجد عملية بهذا الرقم: {cmd_id}")
@@ -816,7 +771,7 @@ async def cmd_run(message: types.Message):
 
     try:
         cmd_id = int(message.text.split()[1])
-        if db.update_command_status(cmd_id, 'active'):
+        if await command_repository.update_command_status(cmd_id, 'active'):
             await message.answer(f"▶ تم استئناف العملية رقم {cmd_id}.")
         else:
             await message.answer(f"❌ لا توجد عملية بهذا الرقم: {cmd_id}")
@@ -845,7 +800,7 @@ async def cmd_peaks(message: types.Message):
         # Fetch current price for logging
         current_price_val = 0.0
         try:
-             data = await api.get_market_data(symbol.upper(), c_type.upper(), expiration, strike)
+             data = await get_contract_data(symbol.upper(), c_type.upper(), expiration, strike, allow_stale=False)
              if data:
                  bid = data.get('bid', 0) or 0
                  ask = data.get('ask', 0) or 0
@@ -854,13 +809,12 @@ async def cmd_peaks(message: types.Message):
              print(f"Error fetching price for peaks log: {e}")
 
         # Log to Postgres with entry market data
-        pg_id = await asyncio.to_thread(
-            pg_client.add_contract_log, 
+        pg_id = await command_repository.add_contract_log(
             symbol.upper(), c_type.upper(), float(strike), expiration, current_price_val,
-            None, data if 'data' in dir() else None  # auction_day=None, market_data=data
+            market_data=data if 'data' in dir() else None
         )
 
-        cmd_id = db.add_command(
+        cmd_id = await command_repository.add_command(
             message.chat.id, symbol.upper(), float(strike), c_type.upper(), expiration, 
             notification_mode='peaks',
             postgres_id=pg_id
@@ -917,7 +871,7 @@ async def cmd_wait(message: types.Message):
 
         # Fetch current price first
         try:
-            data_cache = await api.get_market_data(symbol.upper(), c_type.upper(), expiration, strike)
+            data_cache = await get_contract_data(symbol.upper(), c_type.upper(), expiration, strike, allow_stale=False)
             if data_cache:
                 bid = data_cache.get('bid', 0) or 0
                 ask = data_cache.get('ask', 0) or 0
@@ -930,13 +884,12 @@ async def cmd_wait(message: types.Message):
             print(f"Price fetch in wait error: {e}")
 
         # Log to Postgres with entry market data
-        pg_id = await asyncio.to_thread(
-            pg_client.add_contract_log, 
+        pg_id = await command_repository.add_contract_log(
             symbol.upper(), c_type.upper(), float(strike), expiration, current_price_val,
-            None, data_cache if 'data_cache' in dir() else None  # auction_day=None, market_data
+            market_data=data_cache if 'data_cache' in dir() else None
         )
 
-        cmd_id = db.add_command(
+        cmd_id = await command_repository.add_command(
             message.chat.id, symbol.upper(), float(strike), c_type.upper(), expiration, 
             target_price=target_price,
             notification_mode=mode,
@@ -1023,7 +976,7 @@ async def cmd_enter(message: types.Message):
         # Fetch current price for logging
         current_price_val = 0.0
         try:
-             data = await api.get_market_data(symbol.upper(), c_type.upper(), expiration, strike)
+             data = await get_contract_data(symbol.upper(), c_type.upper(), expiration, strike, allow_stale=False)
              if data:
                  bid = data.get('bid', 0) or 0
                  ask = data.get('ask', 0) or 0
@@ -1032,13 +985,12 @@ async def cmd_enter(message: types.Message):
              print(f"Error fetching price for enter log: {e}")
 
         # Log to Postgres with entry market data
-        pg_id = await asyncio.to_thread(
-            pg_client.add_contract_log, 
+        pg_id = await command_repository.add_contract_log(
             symbol.upper(), c_type.upper(), float(strike), expiration, current_price_val,
-            None, data if 'data' in dir() else None  # auction_day=None, market_data=data
+            market_data=data if 'data' in dir() else None
         )
 
-        cmd_id = db.add_command(
+        cmd_id = await command_repository.add_command(
             message.chat.id, symbol.upper(), float(strike), c_type.upper(), expiration, 
             entry_price=entry_price,
             notification_mode='enter',
@@ -1179,7 +1131,7 @@ async def prompt_fav_expirations(callback_or_message, symbol):
         await message.answer("⌛ جلب التواريخ...")
 
     # Fetch expirations
-    dates = await api.get_expirations(symbol)
+    dates = await get_api().get_expirations(symbol)
     if not dates:
          if is_callback: await message.answer(f"❌ لا توجد تواريخ لـ {symbol}")
          else: await message.answer(f"❌ لا توجد تواريخ لـ {symbol}")
@@ -1238,62 +1190,16 @@ async def show_chain_view(callback, symbol, expiry_days=None):
         
         # Create a fake message object to reuse gso logic
         # We'll call the API directly instead
-        chain_result = await api.get_option_chain(symbol, expiry_days_target=expiry_days)
+        chain_result = await get_api().get_option_chain(symbol, expiry_days_target=expiry_days)
         
         if not chain_result:
             await callback.message.answer(f"❌ لم يتم العثور على بيانات لـ {symbol}")
             return
         
-        chain_data = chain_result['contracts']
         entry_call = chain_result['entry_call']
         entry_put = chain_result['entry_put']
         
-        # Clear previous list and assign new simple IDs
-        global last_gso_contracts
-        last_gso_contracts = {}
-        simple_id = 1
-        for c in chain_data:
-            c['simple_id'] = simple_id
-            last_gso_contracts[simple_id] = c
-            simple_id += 1
-
-        # Get all calls and puts first
-        all_calls = [c for c in chain_data if c['type'] == 'C']
-        all_puts = [c for c in chain_data if c['type'] == 'P']
-        
-        # Apply filter only if list has more than 10 items
-        if len(all_calls) > 10:
-            # Filter: Ask between 2 and 10
-            filtered_calls = [c for c in all_calls if 2 <= c.get('ask', 0) <= 10]
-            # Fallback: if filter returns empty, show all
-            calls = filtered_calls if filtered_calls else all_calls
-        else:
-            calls = all_calls
-            
-        if len(all_puts) > 10:
-            # Filter: Ask between 2 and 10
-            filtered_puts = [c for c in all_puts if 2 <= c.get('ask', 0) <= 10]
-            # Fallback: if filter returns empty, show all
-            puts = filtered_puts if filtered_puts else all_puts
-        else:
-            puts = all_puts
-        
-        calls.sort(key=lambda x: x['strike'])
-        puts.sort(key=lambda x: x['strike'])
-        
-        call_table = "عقود الكول:\n"
-        call_table += "ID   Strike    Bid    Ask    Last   Vol\n"
-        call_table += "────────────────────────────────────\n"
-        for c in calls:
-             strike_str = f"{c['strike']:g}"
-             call_table += f"{c['simple_id']:<3}  {strike_str:<8} {c['bid']:<6.2f} {c['ask']:<6.2f} {c['last']:<6.2f} {c['volume']:,}\n"
-
-        put_table = "عقود البوت:\n"
-        put_table += "ID   Strike    Bid    Ask    Last   Vol\n"
-        put_table += "────────────────────────────────────\n"
-        for c in puts:
-             strike_str = f"{c['strike']:g}"
-             put_table += f"{c['simple_id']:<3}  {strike_str:<8} {c['bid']:<6.2f} {c['ask']:<6.2f} {c['last']:<6.2f} {c['volume']:,}\n"
+        call_table, put_table = build_chain_tables(chain_result)
 
         entry_msg = f"🟢 دخول الكول : {entry_call:.2f}\n🔴 دخول البوت : {entry_put:.2f}"
         summary_msg = f"📊 *{symbol}* {msg_extra} - استخدم `/x <ID>` للمراقبة"
@@ -0,0 +1,88 @@
+"""
+Cache of option chain skeletons: the static structure of a chain (strikes,
+derivative tickerIds, OCC symbols) per (symbol, expiration). The structure
+barely changes during a day, so steady-state refreshes only need the batch
+quote endpoint instead of rebuilding the chain with wb.get_options.
+"""
+import threading
+import time
+from .config import Config
+from .chain_snapshot import ChainSnapshot
+from .metrics import CHAIN_SKELETON_REQUESTS
+from . import market_calendar
+
+# Contract fields that do not change intraday; everything else comes from live quotes
+STATIC_FIELDS = ('tickerId', 'symbol', 'strikePrice', 'direction', 'expireDate', 'unSymbol', 'quoteMultiplier')
+
+
+def _strip_row(row):
+    skeleton = {'strikePrice': row.get('strikePrice')}
+    for side in ('call', 'put'):
+        if side in row:
+            skeleton[side] = {field: row[side][field] for field in STATIC_FIELDS if field in row[side]}
+    return skeleton
+
+
+def skeleton_index(symbol, expiration, rows):
+    """ChainSnapshot of the static contract dicts (with strikePrice), for nearest-strike id lookups."""
+    contracts = {}
+    for row in rows:
+        strike = float(row.get('strikePrice', 0))
+        for side, type_char in (('call', 'C'), ('put', 'P')):
+            if side in row:
+                contracts[(strike, type_char)] = {**row[side], 'strikePrice': strike}
+    return ChainSnapshot(symbol, expiration, contracts)
+
+
+class ChainSkeletonCache:
+    """Thread-safe (used from executor threads). Entries expire after `ttl` seconds or at the ET day boundary."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else Config.CHAIN_SKELETON_TTL
+        self._lock = threading.Lock()
+        self._entries = {}  # {(symbol, expiration): (monotonic stored_at, ET day, rows, index)}
+
+    @staticmethod
+    def _key(symbol, expiration):
+        return (str(symbol).upper(), str(expiration))
+
+    def _entry(self, symbol, expiration, count=True):
+        with self._lock:
+            entry = self._entries.get(self._key(symbol, expiration))
+        if entry is not None:
+            stored_at, day = entry[0], entry[1]
+            if time.monotonic() - stored_at <= self.ttl and day == market_calendar.now_et().date():
+                if count:
+                    CHAIN_SKELETON_REQUESTS.inc(result="hit")
+                return entry
+        if count:
+            CHAIN_SKELETON_REQUESTS.inc(result="miss")
+        return None
+
+    def get(self, symbol, expiration):
+        """Skeleton rows ({'strikePrice', 'call': {...}, 'put': {...}}) or None. Rows must not be mutated."""
+        entry = self._entry(symbol, expiration)
+        return entry[2] if entry else None
+
+    def get_index(self, symbol, expiration, count=True):
+        """
+        Skeleton as a ChainSnapshot of static contract dicts (see skeleton_index), or None.
+        count=False: lookup that replaces no Webull call (streaming), left out of the hit/miss metric.
+        """
+        entry = self._entry(symbol, expiration, count)
+        return entry[3] if entry else None
+
+    def put(self, symbol, expiration, chain_rows):
+        """Store the static part of full wb.get_options rows."""
+        rows = [_strip_row(row) for row in chain_rows]
+        index = skeleton_index(symbol, expiration, rows)
+        with self._lock:
+            self._entries[self._key(symbol, expiration)] = (time.monotonic(), market_calendar.now_et().date(), rows, index)
+
+    def invalidate(self, symbol, expiration):
+        with self._lock:
+            self._entries.pop(self._key(symbol, expiration), None)
+
+
+# Shared by every MassiveAPIClient in the process
+chain_skeletons = ChainSkeletonCache()
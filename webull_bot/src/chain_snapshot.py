@@ -0,0 +1,92 @@
+"""
+Option chain snapshot returned by MassiveAPIClient.get_batch_option_data.
+"""
+import time
+from datetime import datetime
+from bisect import bisect_left
+
+# Default strike matching tolerance (float precision of Webull strikes)
+STRIKE_TOLERANCE = 0.05
+
+
+def normalize_type(contract_type):
+    """Map 'C', 'CALL', 'call', 'P', 'PUT', ... to 'C' / 'P'."""
+    return 'C' if str(contract_type).upper().startswith('C') else 'P'
+
+
+def expiration_str(expiration):
+    """'YYYY-MM-DD' for an expiration given as a string, date or datetime (database rows hold dates)."""
+    if isinstance(expiration, datetime):
+        expiration = expiration.date()
+    return str(expiration)[:10]
+
+
+class ChainSnapshot:
+    """
+    Parsed contracts for one (symbol, expiration), keyed by (strike, type_char).
+    Keeps a sorted strike array per contract type so nearest-strike lookups
+    are O(log n) instead of a scan over the whole chain.
+    `degraded` marks last-known data served while Webull is failing or the circuit
+    is open: fine to display, never to alert on or to record P&L from.
+    """
+
+    def __init__(self, symbol, expiration, contracts=None, fetched_at=None, degraded=False):
+        self.symbol = symbol
+        self.expiration = expiration
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.degraded = degraded
+        self.contracts = contracts or {}
+        self._strikes = {'C': [], 'P': []}
+        for strike, type_char in self.contracts:
+            self._strikes.setdefault(type_char, []).append(strike)
+        for strikes in self._strikes.values():
+            strikes.sort()
+
+    def as_degraded(self):
+        """Copy of this snapshot marked degraded (same contracts and fetched_at)."""
+        return ChainSnapshot(self.symbol, self.expiration, self.contracts, self.fetched_at, degraded=True)
+
+    def find(self, strike, contract_type, tolerance=STRIKE_TOLERANCE):
+        """Return data for the contract nearest to `strike` within `tolerance`, or None."""
+        if strike is None:
+            return None
+        target = float(strike)
+        type_char = normalize_type(contract_type)
+
+        exact = self.contracts.get((target, type_char))
+        if exact is not None:
+            return exact
+
+        strikes = self._strikes.get(type_char, [])
+        i = bisect_left(strikes, target)
+        # Nearest strike is either the insertion point or the one before it
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(strikes):
+                diff = abs(strikes[j] - target)
+                if diff < tolerance and (best is None or diff < abs(best - target)):
+                    best = strikes[j]
+        return self.contracts[(best, type_char)] if best is not None else None
+
+    def strikes(self, contract_type):
+        """Sorted strikes available for a contract type."""
+        return list(self._strikes.get(normalize_type(contract_type), []))
+
+    # Mapping-style access, kept for callers that treat the chain as a dict
+    def get(self, key, default=None):
+        return self.contracts.get(key, default)
+
+    def items(self):
+        return self.contracts.items()
+
+    def __contains__(self, key):
+        return key in self.contracts
+
+    def __getitem__(self, key):
+        return self.contracts[key]
+
+    def __len__(self):
+        return len(self.contracts)
+
+    def __bool__(self):
+        return bool(self.contracts)
@@ -0,0 +1,135 @@
+"""
+Columnar option chain used by the chain views (/g and favorites).
+One parser turns Webull chain rows into NumPy columns; ATM selection,
+nearest-strike trimming and the ask-range filter are vectorized on them.
+"""
+import numpy as np
+
+
+def _first_level_price(data, list_key, flat_key):
+    """Price from the first order book level (bidList/askList), else the flat field."""
+    levels = data.get(list_key)
+    if levels:
+        return float(levels[0].get('price', 0) or 0)
+    return float(data.get(flat_key, 0) or 0)
+
+
+class ChainTable:
+    """
+    Contracts as parallel arrays, in chain order (by strike, call before put):
+    strike, is_call, bid, ask, last, volume, open_interest, iv, contract_id.
+    """
+
+    def __init__(self, strike, is_call, bid, ask, last, volume, open_interest, iv, contract_id):
+        self.strike = strike
+        self.is_call = is_call
+        self.bid = bid
+        self.ask = ask
+        self.last = last
+        self.volume = volume
+        self.open_interest = open_interest
+        self.iv = iv
+        self.contract_id = contract_id
+
+    @classmethod
+    def from_webull(cls, chain, quotes_map=None, fresh=True):
+        """
+        Parse wb.get_options rows, overlaying real-time quotes by tickerId (rows are not modified).
+        Skeleton rows (fresh=False) carry no prices, so their unquoted contracts are left out.
+        """
+        quotes_map = quotes_map or {}
+        strike, is_call, bid, ask, last, volume, oi, iv, contract_id = ([] for _ in range(9))
+        for row in chain:
+            row_strike = float(row.get('strikePrice', 0))
+            for side in ('call', 'put'):
+                if side not in row:
+                    continue
+                data = row[side]
+                quote = quotes_map.get(data.get('tickerId'))
+                if quote:
+                    data = {**data, **quote}
+                elif not fresh:
+                    continue
+                strike.append(row_strike)
+                is_call.append(side == 'call')
+                bid.append(_first_level_price(data, 'bidList', 'bid'))
+                ask.append(_first_level_price(data, 'askList', 'ask'))
+                last.append(float(data.get('close') or data.get('price') or data.get('preClose') or 0))
+                volume.append(int(data.get('volume') or 0))
+                oi.append(int(data.get('openInterest') or 0))
+                iv.append(float(data.get('impVol') or 0))
+                contract_id.append(data.get('symbol'))
+
+        table = cls(
+            np.array(strike, dtype=float), np.array(is_call, dtype=bool),
+            np.array(bid, dtype=float), np.array(ask, dtype=float), np.array(last, dtype=float),
+            np.array(volume, dtype=np.int64), np.array(oi, dtype=np.int64), np.array(iv, dtype=float),
+            np.array(contract_id, dtype=object),
+        )
+        # No bid/ask but a last price: estimate the spread around it
+        estimate = (table.bid == 0) & (table.ask == 0) & (table.last > 0)
+        table.bid[estimate] = table.last[estimate] * 0.95
+        table.ask[estimate] = table.last[estimate] * 1.05
+        return table
+
+    def __len__(self):
+        return len(self.strike)
+
+    def take(self, mask_or_index):
+        """New table with the selected rows."""
+        return ChainTable(*(column[mask_or_index] for column in (
+            self.strike, self.is_call, self.bid, self.ask, self.last,
+            self.volume, self.open_interest, self.iv, self.contract_id,
+        )))
+
+    def nearest_strikes(self, price, count=14):
+        """Rows of the `count` strikes closest to `price` (the first `count` strikes if no price)."""
+        strikes = np.unique(self.strike)
+        if price > 0:
+            strikes = strikes[np.argsort(np.abs(strikes - price), kind='stable')[:count]]
+        else:
+            strikes = strikes[:count]
+        return self.take(np.isin(self.strike, strikes))
+
+    def atm_entries(self, price):
+        """(entry_call, entry_put): ATM strike plus / minus the ATM call / put mid price; 0 if unavailable."""
+        if price <= 0 or len(self) == 0:
+            return 0, 0
+        atm_strike = self.strike[np.argmin(np.abs(self.strike - price))]
+        at_atm = self.strike == atm_strike
+        mid = (self.bid + self.ask) / 2
+        calls = np.flatnonzero(at_atm & self.is_call)
+        puts = np.flatnonzero(at_atm & ~self.is_call)
+        entry_call = float(atm_strike + mid[calls[0]]) if len(calls) else 0
+        entry_put = float(atm_strike - mid[puts[0]]) if len(puts) else 0
+        return entry_call, entry_put
+
+    def display_index(self, contract_type, ask_min=2, ask_max=10, min_rows=10):
+        """
+        Row indices of one side for display, sorted by strike. Sides with more than
+        `min_rows` contracts are narrowed to ask in [ask_min, ask_max] unless that leaves nothing.
+        """
+        side = self.is_call if contract_type == 'C' else ~self.is_call
+        index = np.flatnonzero(side)
+        if len(index) > min_rows:
+            in_range = index[(self.ask[index] >= ask_min) & (self.ask[index] <= ask_max)]
+            if len(in_range):
+                index = in_range
+        return index[np.argsort(self.strike[index], kind='stable')]
+
+    def to_records(self):
+        """Row dicts (contract_id, strike, type, bid, ask, last, volume), in table order."""
+        return [
+            {
+                "contract_id": contract_id,
+                "strike": float(strike),
+                "type": 'C' if is_call else 'P',
+                "bid": float(bid),
+                "ask": float(ask),
+                "last": float(last),
+                "volume": int(volume),
+            }
+            for contract_id, strike, is_call, bid, ask, last, volume in zip(
+                self.contract_id, self.strike, self.is_call, self.bid, self.ask, self.last, self.volume
+            )
+        ]
@@ -0,0 +1,108 @@
+"""
+In-memory registry of active monitoring commands.
+Loads the active set once and keeps it current through the
+`monitoring_commands` LISTEN/NOTIFY trigger, so idle monitor cycles
+do not touch the database.
+"""
+import json
+import logging
+import time
+import psycopg2
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CommandRegistry:
+    """
+    Holds active `monitoring_commands` rows keyed by id.
+    Changes made by handlers (/m, /s, /p, /r, ...) arrive as notifications and
+    are applied on the next call to active_commands().
+    active_commands() blocks on PostgreSQL; the monitor calls it in a worker thread.
+    """
+
+    def __init__(self, db, resync_interval=None):
+        self.db = db
+        self.resync_interval = resync_interval if resync_interval is not None else Config.MONITOR_REGISTRY_RESYNC_SECONDS
+        self._commands = {}  # {cmd_id: cmd dict}
+        self._listen_conn = None
+        self._last_reload = None
+
+    def active_commands(self):
+        """Return the active commands, applying any pending change notifications first."""
+        now = time.monotonic()
+        if (self._listen_conn is None or self._last_reload is None
+                or now - self._last_reload >= self.resync_interval):
+            self._reload()
+        else:
+            self._apply_notifications()
+        return list(self._commands.values())
+
+    def close(self):
+        if self._listen_conn is not None:
+            try:
+                self._listen_conn.close()
+            except Exception:
+                pass
+            self._listen_conn = None
+
+    def _reload(self):
+        """Full load of the active set. LISTEN first so no change is lost in between."""
+        if self._listen_conn is None:
+            try:
+                self._listen_conn = self.db.listen()
+            except Exception as e:
+                # Without a listener we fall back to a full reload every cycle
+                logger.warning(f"Command registry LISTEN failed, polling instead: {e}")
+                self._listen_conn = None
+        else:
+            self._drain()
+
+        self._commands = {cmd['id']: cmd for cmd in self.db.get_active_commands()}
+        self._last_reload = time.monotonic()
+
+    def _drain(self):
+        """Read and return pending notifications as {cmd_id: op}."""
+        try:
+            self._listen_conn.poll()
+        except psycopg2.Error as e:
+            logger.warning(f"Command registry listener lost: {e}")
+            self.close()
+            return None
+
+        changes = {}
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+                changes[int(payload['id'])] = payload.get('op')
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Ignoring malformed command notification: {notify.payload}")
+        return changes
+
+    def _apply_notifications(self):
+        changes = self._drain()
+        if changes is None:
+            # Listener dropped: reconnect and reload everything
+            self._reload()
+            return
+
+        changed = [cmd_id for cmd_id, op in changes.items() if op != 'DELETE']
+        for cmd_id, op in changes.items():
+            if op == 'DELETE':
+                self._commands.pop(cmd_id, None)
+        if not changed:
+            return
+        # One query for every command changed since the last cycle
+        rows = self.db.get_commands(changed)
+        if rows is None:
+            # Keep the current set; the next call reloads everything
+            self._last_reload = None
+            return
+        found = {cmd['id']: cmd for cmd in rows}
+        for cmd_id in changed:
+            cmd = found.get(cmd_id)
+            if cmd and cmd.get('status') == 'active':
+                self._commands[cmd_id] = cmd
+            else:
+                self._commands.pop(cmd_id, None)
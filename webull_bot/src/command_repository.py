@@ -0,0 +1,272 @@
+"""
+Async access to `monitoring_commands` and `option_contracts` for the bot
+handlers and the monitor, on an asyncpg pool, so command edits (/l, /s, /p,
+/r, ...) no longer block the event loop shared by both bots and the FastAPI app.
+
+Under the FastAPI app the pool is the app's own (app/db.py); the standalone
+bot opens one from the POSTGRES_* settings. The psycopg2 Database keeps the
+schema setup and the monitor's LISTEN-backed command registry.
+"""
+import logging
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+import asyncpg
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Process-wide {symbol: stocks.id}: preloaded when the repository connects, then
+# filled as symbols are added; stock ids never change once created
+_stock_ids = {}
+
+
+# asyncpg does not coerce parameters like psycopg2 does: handlers pass strikes
+# and prices as str/float and expirations as "YYYY-MM-DD"
+
+def _num(value):
+    if value is None or isinstance(value, Decimal):
+        return value
+    try:
+        # str() first: Decimal(0.1) would store the float's full binary expansion
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def _int(value):
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date) or value is None:
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _market_fields(market_data):
+    """(bid, ask, underlying, volume, open interest, iv) stored with a contract log entry or exit."""
+    if not market_data:
+        return None, None, None, None, None, None
+    return (
+        _num(market_data.get('bid')),
+        _num(market_data.get('ask')),
+        _num(market_data.get('underlying_price')),
+        _int(market_data.get('volume')),
+        _int(market_data.get('openInterest')),
+        _num(market_data.get('impliedVolatility')),
+    )
+
+
+def _type_char(contract_type):
+    """'C' or 'P' from C/P/CALL/PUT."""
+    type_str = str(contract_type).upper()
+    type_char = 'C' if 'C' in type_str else 'P'
+    if 'PUT' in type_str and 'C' in type_str:
+        type_char = 'P'
+    if type_str.startswith('C'): type_char = 'C'
+    if type_str.startswith('P'): type_char = 'P'
+    return type_char
+
+
+class CommandRepository:
+    def __init__(self):
+        self.pool = None
+        self._owns_pool = False
+
+    async def connect(self, pool=None):
+        """Use `pool` (e.g. the FastAPI app's), or open one from the POSTGRES_* settings."""
+        if self.pool is not None:
+            return
+        if pool is not None:
+            self.pool = pool
+        else:
+            self.pool = await asyncpg.create_pool(
+                database=Config.POSTGRES_DB,
+                user=Config.POSTGRES_USER,
+                password=Config.POSTGRES_PASSWORD,
+                host=Config.POSTGRES_HOST,
+                port=int(Config.POSTGRES_PORT),
+                min_size=Config.PG_POOL_MIN,
+                max_size=Config.PG_POOL_MAX,
+            )
+            self._owns_pool = True
+        await self.load_stock_ids()
+
+    async def close(self):
+        if self.pool is not None and self._owns_pool:
+            await self.pool.close()
+        self.pool = None
+        self._owns_pool = False
+
+    # --- stocks ---
+
+    async def load_stock_ids(self):
+        """Preload the symbol -> id map from the `stocks` table."""
+        try:
+            rows = await self.pool.fetch("SELECT symbol, id FROM stocks")
+            _stock_ids.update((row['symbol'].upper(), row['id']) for row in rows)
+            logger.info(f"Loaded {len(_stock_ids)} stock ids")
+        except Exception as e:
+            logger.error(f"Failed to load stock ids: {e}")
+
+    async def get_or_create_stock(self, symbol, company_name=None):
+        """
+        Ensures the stock exists in the `stocks` table.
+        Returns the stock ID, or None on error.
+        """
+        symbol = symbol.upper()
+        stock_id = _stock_ids.get(symbol)
+        if stock_id is not None:
+            return stock_id
+        try:
+            # One statement, safe against concurrent creators of the same symbol.
+            # The no-op DO UPDATE makes RETURNING yield the id of an existing row too
+            stock_id = await self.pool.fetchval("""
+                INSERT INTO stocks (symbol, company_name, market) VALUES ($1, $2, 'US')
+                ON CONFLICT (symbol) DO UPDATE SET symbol = EXCLUDED.symbol
+                RETURNING id
+            """, symbol, company_name or symbol)
+        except Exception as e:
+            logger.error(f"Error in get_or_create_stock: {e}")
+            return None
+        _stock_ids[symbol] = stock_id
+        return stock_id
+
+    # --- monitoring_commands ---
+
+    async def add_command(self, chat_id, symbol, strike, contract_type, expiration,
+                          target_price=None, entry_price=None, contract_id=None,
+                          notification_mode='always', postgres_id=None):
+        """Add a new monitoring command. Returns its id, or None on error."""
+        # Every monitored symbol is listed in `stocks` (no query once its id is known)
+        await self.get_or_create_stock(symbol)
+        try:
+            return await self.pool.fetchval('''
+                INSERT INTO monitoring_commands
+                (chat_id, symbol, strike, contract_type, expiration,
+                 target_price, entry_price, contract_id, notification_mode, postgres_id)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                RETURNING id
+            ''', chat_id, symbol, _num(strike), contract_type, _date(expiration),
+                _num(target_price), _num(entry_price), contract_id, notification_mode, postgres_id)
+        except Exception as e:
+            logger.error(f"Error adding command: {e}")
+            return None
+
+    async def get_chat_commands(self, chat_id):
+        """Get all commands for a specific chat."""
+        try:
+            rows = await self.pool.fetch("SELECT * FROM monitoring_commands WHERE chat_id = $1", chat_id)
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting chat commands: {e}")
+            return []
+
+    async def get_command(self, cmd_id):
+        """Get a specific command by ID."""
+        try:
+            row = await self.pool.fetchrow("SELECT * FROM monitoring_commands WHERE id = $1", cmd_id)
+            return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error getting command {cmd_id}: {e}")
+            return None
+
+    async def update_command_status(self, cmd_id, status):
+        """Update the status of a command. True if it exists."""
+        try:
+            result = await self.pool.execute(
+                "UPDATE monitoring_commands SET status = $1 WHERE id = $2", status, cmd_id)
+            return result != "UPDATE 0"
+        except Exception as e:
+            logger.error(f"Error updating command status: {e}")
+            return False
+
+    async def remove_command(self, cmd_id):
+        """Remove a command by ID. True if it existed."""
+        try:
+            result = await self.pool.execute("DELETE FROM monitoring_commands WHERE id = $1", cmd_id)
+            return result != "DELETE 0"
+        except Exception as e:
+            logger.error(f"Error removing command {cmd_id}: {e}")
+            return False
+
+    async def set_first_message_id(self, cmd_id, message_id):
+        """Store the Telegram message id of a command's first notification."""
+        try:
+            await self.pool.execute(
+                "UPDATE monitoring_commands SET first_message_id = $1 WHERE id = $2", message_id, cmd_id)
+        except Exception as e:
+            logger.error(f"Failed to save first_message_id for cmd {cmd_id}: {e}")
+
+    # --- option_contracts (website reports) ---
+
+    async def add_contract_log(self, symbol, contract_type, strike, expiration, start_price, market_data=None):
+        """
+        Log a new monitored contract into `option_contracts` with its entry market data.
+        Returns the row id (stored as the command's postgres_id), or None on error.
+        """
+        try:
+            strike_val = round(float(strike), 2)
+            start_price = round(float(start_price), 2)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not round contract log values: {e}")
+            strike_val = strike
+        # e.g. CRWD 477.5 P
+        formatted_strike = f"{symbol} {strike_val} {_type_char(contract_type)}"
+        try:
+            # Initial insert: All start at 0 for Profit/Loss/Net
+            return await self.pool.fetchval("""
+                INSERT INTO option_contracts
+                (contract_date, strike, contract_price, profit, loss, net_profit,
+                 entry_bid, entry_ask, entry_underlying, entry_volume, entry_oi, entry_iv, entry_timestamp,
+                 created_at)
+                VALUES ($1, $2, $3, 0, 0, 0, $4, $5, $6, $7, $8, $9, NOW(), NOW())
+                RETURNING id
+            """, _date(expiration), formatted_strike, _num(start_price), *_market_fields(market_data))
+        except Exception as e:
+            logger.error(f"Error logging contract to Postgres: {e}")
+            return None
+
+    async def update_close_price(self, pg_id, close_price, market_data=None):
+        """Record the result (profit/loss/net) and exit market data of a contract log."""
+        try:
+            close_price = round(float(close_price), 2)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not round close_price: {e}")
+            return
+        # Skip update if close_price is 0 (no data from API) - keep initial values
+        if close_price == 0:
+            logger.debug(f"Skipping result update for PG_ID={pg_id}: no close price")
+            return
+        try:
+            # If close >= contract (profit): profit = close_price, loss = 0.
+            # If close < contract (loss): profit = 0, loss = close_price.
+            # Net Profit = (Close - Contract) ALWAYS.
+            await self.pool.execute("""
+                UPDATE option_contracts
+                SET
+                    profit = CASE WHEN $1 >= contract_price THEN $1 ELSE 0 END,
+                    loss = CASE WHEN $1 < contract_price THEN $1 ELSE 0 END,
+                    net_profit = ROUND(($1 - contract_price)::numeric, 2),
+                    exit_bid = $2,
+                    exit_ask = $3,
+                    exit_underlying = $4,
+                    exit_volume = $5,
+                    exit_oi = $6,
+                    exit_iv = $7,
+                    exit_timestamp = NOW()
+                WHERE id = $8
+            """, _num(close_price), *_market_fields(market_data), pg_id)
+        except Exception as e:
+            logger.error(f"Error updating result in Postgres: {e}")
+
+
+# Shared by the bot handlers and the monitor; connected at bot startup
+command_repository = CommandRepository()
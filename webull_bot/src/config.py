@@ -32,6 +32,89 @@ class Config:
     POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "password")
     POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
     POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
+    # Shared psycopg2 pool: idle connections kept open, max open connections,
+    # seconds to wait for a free one, and idle seconds after which a connection is pinged before use
+    PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "2"))
+    PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+    PG_POOL_TIMEOUT = float(os.getenv("PG_POOL_TIMEOUT", "10"))
+    PG_POOL_CHECK_IDLE = float(os.getenv("PG_POOL_CHECK_IDLE", "30"))
+
+    # Monitor scheduling
+    MONITOR_POLL_INTERVAL = float(os.getenv("MONITOR_POLL_INTERVAL", "8"))
+    # Adaptive polling bounds per group (seconds); see poll_scheduler.py
+    MONITOR_MIN_INTERVAL = float(os.getenv("MONITOR_MIN_INTERVAL", "3"))
+    MONITOR_MAX_INTERVAL = float(os.getenv("MONITOR_MAX_INTERVAL", "60"))
+    # Distance to target/entry price (fraction) and mean move per poll (fraction) that map to the base interval
+    MONITOR_NEAR_THRESHOLD_PCT = float(os.getenv("MONITOR_NEAR_THRESHOLD_PCT", "0.10"))
+    MONITOR_VOLATILITY_REF_PCT = float(os.getenv("MONITOR_VOLATILITY_REF_PCT", "0.01"))
+    # Market hours: also poll pre-market / after-hours (slower by this factor; off by default,
+    # options quote in the regular session only), or ignore the calendar entirely
+    MONITOR_EXTENDED_HOURS = os.getenv("MONITOR_EXTENDED_HOURS", "false").lower() in ("1", "true", "yes")
+    MONITOR_EXTENDED_HOURS_FACTOR = float(os.getenv("MONITOR_EXTENDED_HOURS_FACTOR", "4"))
+    MONITOR_IGNORE_MARKET_HOURS = os.getenv("MONITOR_IGNORE_MARKET_HOURS", "false").lower() in ("1", "true", "yes")
+    # Refresh only the strikes the monitor's commands need instead of quoting the whole chain
+    MONITOR_TARGETED_QUOTES = os.getenv("MONITOR_TARGETED_QUOTES", "true").lower() in ("1", "true", "yes")
+    # Max number of (symbol, expiration) groups fetched at the same time
+    MONITOR_MAX_CONCURRENT_FETCHES = int(os.getenv("MONITOR_MAX_CONCURRENT_FETCHES", "4"))
+    # Safety net: full reload of the in-memory command registry every N seconds
+    MONITOR_REGISTRY_RESYNC_SECONDS = float(os.getenv("MONITOR_REGISTRY_RESYNC_SECONDS", "600"))
+    # Anti-ban pacing for group fetches: average fetches/second, burst size and random jitter (seconds).
+    # The default keeps the old serial pacing (a 1-3s random sleep per group, ~0.5 groups/s)
+    WEBULL_RATE_PER_SECOND = float(os.getenv("WEBULL_RATE_PER_SECOND", "0.5"))
+    WEBULL_RATE_BURST = int(os.getenv("WEBULL_RATE_BURST", "2"))
+    WEBULL_RATE_JITTER = float(os.getenv("WEBULL_RATE_JITTER", "0.3"))
+    # Send all Webull HTTP calls to this base URL instead (local simulator: scripts/webull_gateway_sim.py)
+    WEBULL_GATEWAY_URL = os.getenv("WEBULL_GATEWAY_URL", "").rstrip("/")
+    # Pooled HTTP transport for the webull library: connections kept per host, timeout (s), connect retries
+    WEBULL_HTTP_POOL_SIZE = int(os.getenv("WEBULL_HTTP_POOL_SIZE", "10"))
+    WEBULL_HTTP_TIMEOUT = float(os.getenv("WEBULL_HTTP_TIMEOUT", "10"))
+    WEBULL_HTTP_RETRIES = int(os.getenv("WEBULL_HTTP_RETRIES", "2"))
+    # Persistent symbol -> tickerId / expirations cache (default: webull_bot/webull_reference_cache.json)
+    WEBULL_REFERENCE_CACHE_PATH = os.getenv("WEBULL_REFERENCE_CACHE_PATH", "")
+    TICKER_ID_TTL_DAYS = float(os.getenv("TICKER_ID_TTL_DAYS", "30"))
+    # Chain structure (strikes, derivative ids, OCC symbols) is rebuilt with wb.get_options after this many seconds
+    CHAIN_SKELETON_TTL = float(os.getenv("CHAIN_SKELETON_TTL", "1800"))
+    # Batch quote requests (50 contracts each) in flight at once on the shared aiohttp session
+    WEBULL_QUOTE_CONCURRENCY = int(os.getenv("WEBULL_QUOTE_CONCURRENCY", "8"))
+    # Dedicated pool for blocking Webull calls: workers, deadline per attempt (s, includes queueing),
+    # retries with jittered exponential backoff (base / max seconds)
+    WEBULL_EXECUTOR_WORKERS = int(os.getenv("WEBULL_EXECUTOR_WORKERS", "8"))
+    WEBULL_CALL_TIMEOUT = float(os.getenv("WEBULL_CALL_TIMEOUT", "20"))
+    WEBULL_CALL_RETRIES = int(os.getenv("WEBULL_CALL_RETRIES", "2"))
+    WEBULL_RETRY_BACKOFF = float(os.getenv("WEBULL_RETRY_BACKOFF", "0.5"))
+    WEBULL_RETRY_BACKOFF_MAX = float(os.getenv("WEBULL_RETRY_BACKOFF_MAX", "5"))
+    # Circuit breaker: consecutive failed calls before failing fast, seconds before a trial call
+    WEBULL_BREAKER_THRESHOLD = int(os.getenv("WEBULL_BREAKER_THRESHOLD", "5"))
+    WEBULL_BREAKER_RESET = float(os.getenv("WEBULL_BREAKER_RESET", "30"))
+    # Push quote stream for monitored contracts (polling stays the fallback while it is down).
+    # A streamed quote is trusted until its contract was last polled over HTTP RESYNC seconds ago.
+    WEBULL_STREAMING = os.getenv("WEBULL_STREAMING", "false").lower() in ("1", "true", "yes")
+    WEBULL_STREAM_HOST = os.getenv("WEBULL_STREAM_HOST", "wspush.webullbroker.com")
+    WEBULL_STREAM_PORT = int(os.getenv("WEBULL_STREAM_PORT", "443"))
+    # "websockets" for Webull, "tcp" for a local broker stand-in (scripts/webull_stream_stub.py)
+    WEBULL_STREAM_TRANSPORT = os.getenv("WEBULL_STREAM_TRANSPORT", "websockets")
+    WEBULL_STREAM_TLS = os.getenv("WEBULL_STREAM_TLS", "true").lower() in ("1", "true", "yes")
+    # Push message types subscribed per contract (104: bid/ask, 105: price and trades)
+    WEBULL_STREAM_TYPES = [t.strip() for t in os.getenv("WEBULL_STREAM_TYPES", "104,105").split(",") if t.strip()]
+    WEBULL_STREAM_RESYNC = float(os.getenv("WEBULL_STREAM_RESYNC", "300"))
+
+    # Outbound Telegram alerts: send retries, global msgs/sec, min seconds between messages to one chat
+    NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "3"))
+    TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+    TELEGRAM_CHAT_INTERVAL = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "3"))
+
+    # Status image rendering: pool processes and how long to gather renders into one batch (seconds)
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+    RENDER_BATCH_WINDOW = float(os.getenv("RENDER_BATCH_WINDOW", "0.02"))
+
+    # Shared chain snapshot cache: fresh for TTL seconds, then served stale (and refreshed) until STALE_TTL
+    CHAIN_CACHE_TTL = float(os.getenv("CHAIN_CACHE_TTL", "10"))
+    CHAIN_CACHE_STALE_TTL = float(os.getenv("CHAIN_CACHE_STALE_TTL", "60"))
+    CHAIN_CACHE_MAX_ENTRIES = int(os.getenv("CHAIN_CACHE_MAX_ENTRIES", "256"))
+    # The monitor only reuses snapshots younger than this (its own polls are never served stale)
+    CHAIN_CACHE_MONITOR_MAX_AGE = float(os.getenv("CHAIN_CACHE_MONITOR_MAX_AGE", "2"))
+    # If set, every chain the monitor fetches is appended to this file (see snapshot_recorder.py)
+    MONITOR_RECORD_PATH = os.getenv("MONITOR_RECORD_PATH", "")
 
     @classmethod
     def validate(cls):
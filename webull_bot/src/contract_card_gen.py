@@ -35,14 +35,22 @@ class ContractCardGenerator:
     COLOR_TEAL = (0, 200, 180)             # Accent color
     
     def __init__(self):
-        self.logo = None
-        self._load_logo()
+        self._logo = None
+        self._logo_loaded = False
+
+    @property
+    def logo(self):
+        """The logo image, loaded on first use (None if missing)."""
+        if not self._logo_loaded:
+            self._logo_loaded = True
+            self._load_logo()
+        return self._logo
     
     def _load_logo(self):
         """Load the logo image."""
         try:
             if os.path.exists(LOGO_PATH):
-                self.logo = Image.open(LOGO_PATH).convert("RGBA")
+                self._logo = Image.open(LOGO_PATH).convert("RGBA")
             else:
                 print(f"Warning: Logo not found at {LOGO_PATH}")
         except Exception as e:
@@ -0,0 +1,128 @@
+"""
+Pooled HTTP transport for every Webull request made by this process.
+The webull library calls the module-level `requests.get/post`, which opens a
+new connection (DNS + TCP + TLS) per call; `install()` points the library at
+a shared, tuned requests.Session instead.
+"""
+import importlib
+import logging
+import re
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from .config import Config
+from .metrics import WEBULL_HTTP_REQUESTS, WEBULL_HTTP_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Endpoint of the request running in the current thread, for connection accounting
+_current = threading.local()
+
+
+def endpoint_name(url):
+    """host + path with numeric ids collapsed, e.g. quotes-gw.webullfintech.com/api/quotes/ticker/{id}."""
+    parts = urlsplit(url)
+    return parts.netloc + re.sub(r"/\d+(?=/|$)", "/{id}", parts.path)
+
+
+def _record_new_connection():
+    endpoint = getattr(_current, "endpoint", None)
+    WEBULL_HTTP_CONNECTIONS.inc(endpoint=endpoint or "unknown")
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        _record_new_connection()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _record_new_connection()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class WebullTransport:
+    """
+    Stand-in for the `requests` module inside the webull library: same get/post/session
+    interface, backed by one keep-alive Session with a sized connection pool,
+    a default timeout and connect retries.
+    """
+
+    def __init__(self, pool_size=None, timeout=None, retries=None):
+        self.timeout = timeout or Config.WEBULL_HTTP_TIMEOUT
+        pool_size = pool_size or Config.WEBULL_HTTP_POOL_SIZE
+        retries = Config.WEBULL_HTTP_RETRIES if retries is None else retries
+
+        self._session = requests.Session()
+        # Retry only failed connects: a read retry could repeat a non-idempotent POST
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.2)
+        )
+        adapter.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def session(self):
+        # The webull client creates (and never uses) its own session at init
+        return self._session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = endpoint_name(url)
+        WEBULL_HTTP_REQUESTS.inc(endpoint=endpoint, client="requests")
+        _current.endpoint = endpoint
+        try:
+            return self._session.request(method, url, **kwargs)
+        finally:
+            _current.endpoint = None
+
+    def get(self, url, params=None, **kwargs):
+        return self.request('GET', url, params=params, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.request('POST', url, data=data, json=json, **kwargs)
+
+    def close(self):
+        self._session.close()
+
+
+def install(transport):
+    """Route the webull library's HTTP calls through `transport` (process-wide)."""
+    module = importlib.import_module("webull.webull")
+    if module.requests is not transport:
+        module.requests = transport
+
+
+def connection_stats():
+    """{endpoint: {'requests', 'new_connections', 'reused'}} across both HTTP clients."""
+    stats = {}
+    for (endpoint, _client), count in WEBULL_HTTP_REQUESTS.values().items():
+        entry = stats.setdefault(endpoint, {'requests': 0, 'new_connections': 0})
+        entry['requests'] += count
+    for (endpoint,), count in WEBULL_HTTP_CONNECTIONS.values().items():
+        stats.setdefault(endpoint, {'requests': 0, 'new_connections': 0})['new_connections'] += count
+    for entry in stats.values():
+        entry['reused'] = max(0, entry['requests'] - entry['new_connections'])
+    return stats
+
+
+# Shared by every MassiveAPIClient; the webull library module itself is process-global
+webull_transport = WebullTransport()
@@ -1,6 +1,36 @@
 from PIL import Image, ImageDraw, ImageFont
 import io
 import datetime
+from functools import lru_cache
+
+# === Font Loader ===
+@lru_cache(maxsize=None)
+def _get_font(size):
+    """Load a TrueType font once per size (cached for the life of the process)."""
+    # List of potential font paths (Windows, Linux, misc)
+    # Re-ordered to prioritize Arial-like metrics (LiberationSans) over DejaVu
+    font_candidates = [
+        "arial.ttf",      # Windows/Generic
+        "Arial.ttf",      # Linux Case-sensitive
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf", # Generic Arial alternative
+        "/usr/share/fonts/truetype/msttcorefonts/Arial.ttf", # Ubuntu mscorefonts
+        "/usr/share/fonts/TTF/Arial.ttf",        # Arch Linux
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", # Fallback 1 (Regular)
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", # Fallback 2 (Bold)
+        "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+        "C:\\Windows\\Fonts\\arial.ttf"
+    ]
+    
+    for path in font_candidates:
+        try:
+            return ImageFont.truetype(path, size)
+        except IOError:
+            continue
+    
+    # Fallback if no TTF found (Will result in small default font)
+    print("WARNING: No TrueType font found. Using default bitmap font.")
+    return ImageFont.load_default()
+
 
 class ImageGenerator:
     def generate_status_image(self, data):
@@ -22,41 +52,15 @@ class ImageGenerator:
         image = Image.new('RGB', (width, height), color=COLOR_BG)
         draw = ImageDraw.Draw(image)
 
-        # === Font Loader ===
-        def get_font(size):
-            # List of potential font paths (Windows, Linux, misc)
-            # Re-ordered to prioritize Arial-like metrics (LiberationSans) over DejaVu
-            font_candidates = [
-                "arial.ttf",      # Windows/Generic
-                "Arial.ttf",      # Linux Case-sensitive
-                "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf", # Generic Arial alternative
-                "/usr/share/fonts/truetype/msttcorefonts/Arial.ttf", # Ubuntu mscorefonts
-                "/usr/share/fonts/TTF/Arial.ttf",        # Arch Linux
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", # Fallback 1 (Regular)
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", # Fallback 2 (Bold)
-                "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
-                "C:\\Windows\\Fonts\\arial.ttf"
-            ]
-            
-            for path in font_candidates:
-                try:
-                    return ImageFont.truetype(path, size)
-                except IOError:
-                    continue
-            
-            # Fallback if no TTF found (Will result in small default font)
-            print("WARNING: No TrueType font found. Using default bitmap font.")
-            return ImageFont.load_default()
-
         # Fonts - UPSCALED sizes (~1.5x)
-        font_symbol = get_font(54)
-        font_sub = get_font(32)
-        font_price_big = get_font(120)
-        font_price_label = get_font(27)
-        font_change = get_font(42)
-        font_detail_label = get_font(27)
-        font_detail_value = get_font(36)
-        font_footer = get_font(24)
+        font_symbol = _get_font(54)
+        font_sub = _get_font(32)
+        font_price_big = _get_font(120)
+        font_price_label = _get_font(27)
+        font_change = _get_font(42)
+        font_detail_label = _get_font(27)
+        font_detail_value = _get_font(36)
+        font_footer = _get_font(24)
 
         # === Data Extraction ===
         bid = data.get('bid', 0) or 0
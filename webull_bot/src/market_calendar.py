@@ -0,0 +1,135 @@
+"""
+US equity/options market calendar: trading sessions, exchange holidays
+and early closes, all in US/Eastern time.
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+import pytz
+
+ET = pytz.timezone("America/New_York")
+
+SESSION_CLOSED = 'closed'
+SESSION_PRE = 'pre'
+SESSION_REGULAR = 'regular'
+SESSION_AFTER = 'after'
+
+PRE_MARKET_OPEN = time(4, 0)
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+AFTER_HOURS_CLOSE = time(20, 0)
+EARLY_AFTER_HOURS_CLOSE = time(17, 0)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th `weekday` (Mon=0) of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(d):
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=8)
+def market_holidays(year):
+    """NYSE full-day holidays for a year."""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),             # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),             # Washington's Birthday
+        _easter(year) - timedelta(days=2),       # Good Friday
+        _nth_weekday(year, 5, 0, -1),            # Memorial Day
+        _observed(date(year, 7, 4)),             # Independence Day
+        _nth_weekday(year, 9, 0, 1),             # Labor Day
+        _nth_weekday(year, 11, 3, 4),            # Thanksgiving
+        _observed(date(year, 12, 25)),           # Christmas
+    }
+    # New Year's Day: a Saturday Jan 1 is not observed on the previous Friday (Dec 31)
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(holidays)
+
+
+@lru_cache(maxsize=8)
+def early_closes(year):
+    """Days the regular session ends at 13:00 ET."""
+    candidates = [
+        date(year, 7, 3),                                   # Day before Independence Day
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),   # Day after Thanksgiving
+        date(year, 12, 24),                                 # Christmas Eve
+    ]
+    return frozenset(d for d in candidates if is_trading_day(d))
+
+
+def is_trading_day(d):
+    return d.weekday() < 5 and d not in market_holidays(d.year)
+
+
+def _session_bounds(d):
+    """[(session, start, end)] for a trading day, as aware ET datetimes."""
+    early = d in early_closes(d.year)
+    regular_close = EARLY_CLOSE if early else REGULAR_CLOSE
+    after_close = EARLY_AFTER_HOURS_CLOSE if early else AFTER_HOURS_CLOSE
+
+    def at(t):
+        return ET.localize(datetime.combine(d, t))
+
+    return [
+        (SESSION_PRE, at(PRE_MARKET_OPEN), at(REGULAR_OPEN)),
+        (SESSION_REGULAR, at(REGULAR_OPEN), at(regular_close)),
+        (SESSION_AFTER, at(regular_close), at(after_close)),
+    ]
+
+
+def now_et():
+    return datetime.now(ET)
+
+
+def current_session(now=None):
+    """Return (session, session_end) for `now` (aware datetime, default: current time)."""
+    now = (now or now_et()).astimezone(ET)
+    if is_trading_day(now.date()):
+        for session, start, end in _session_bounds(now.date()):
+            if start <= now < end:
+                return session, end
+    return SESSION_CLOSED, None
+
+
+def next_session_start(now=None, sessions=(SESSION_PRE, SESSION_REGULAR, SESSION_AFTER)):
+    """Start of the next session (of the given kinds) strictly after `now`."""
+    now = (now or now_et()).astimezone(ET)
+    d = now.date()
+    # Holidays never span more than a few days; two weeks is a safe bound
+    for _ in range(15):
+        if is_trading_day(d):
+            for session, start, _end in _session_bounds(d):
+                if session in sessions and start > now:
+                    return start
+        d += timedelta(days=1)
+    return None
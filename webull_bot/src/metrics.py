@@ -0,0 +1,234 @@
+"""
+Minimal in-process metrics (counters, gauges, histograms) rendered in the
+Prometheus text exposition format. Used to instrument the monitor cycle.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers fast in-memory stages up to multi-second Webull fetches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 8, 15, 30, 60)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = dict(self._series)
+        for key, value in sorted(series.items()):
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def value(self, **labels):
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def values(self):
+        """{label values tuple: count} for every series."""
+        with self._lock:
+            return dict(self._series)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self, **labels):
+        """Count, mean and bucket-resolution p50/p95/p99 of one series (None if empty)."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if not series or not series['count']:
+                return None
+            counts, total, count = list(series['counts']), series['sum'], series['count']
+        result = {'count': count, 'mean': total / count}
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                if cumulative >= q * count:
+                    result[name] = bound
+                    break
+        return result
+
+    def _render_series(self, key, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value['counts']):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {value['sum']!r}")
+        lines.append(f"{self.name}_count{labels} {value['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self):
+        """Clear all recorded values (e.g. after a benchmark warm-up)."""
+        for metric in self._metrics.values():
+            with metric._lock:
+                metric._series.clear()
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Monitor metrics ---
+MONITOR_CYCLE_SECONDS = registry.histogram(
+    "webull_monitor_cycle_seconds", "Duration of a full monitor cycle")
+MONITOR_STAGE_SECONDS = registry.histogram(
+    "webull_monitor_stage_seconds",
+    "Time spent per monitor stage (fetch, parse, decision, render, send, db_write)", ("stage",),
+    # Per-command stages (decision) run in microseconds
+    buckets=(0.0001, 0.00025, 0.0005) + DEFAULT_BUCKETS)
+MONITOR_GROUP_FETCH_SECONDS = registry.histogram(
+    "webull_monitor_group_fetch_seconds", "Chain fetch latency per (symbol) group", ("symbol",))
+MONITOR_CYCLE_OVER_BUDGET = registry.counter(
+    "webull_monitor_cycle_over_budget_total", "Cycles that took longer than MONITOR_POLL_INTERVAL")
+MONITOR_COMMANDS_EVALUATED = registry.counter(
+    "webull_monitor_commands_evaluated_total", "Commands evaluated against fresh chain data")
+MONITOR_COMMANDS_PER_SECOND = registry.gauge(
+    "webull_monitor_commands_per_second", "Commands evaluated per second in the last cycle")
+MONITOR_GROUPS_POLLED = registry.gauge(
+    "webull_monitor_groups_polled", "Groups fetched in the last cycle")
+NOTIFY_QUEUE_DEPTH = registry.gauge(
+    "webull_notify_queue_depth", "Alerts waiting in the outbound notification queue")
+
+# --- Webull HTTP transport ---
+WEBULL_HTTP_REQUESTS = registry.counter(
+    "webull_http_requests_total", "Webull HTTP requests per endpoint and client (requests, aiohttp)", ("endpoint", "client"))
+WEBULL_HTTP_CONNECTIONS = registry.counter(
+    "webull_http_connections_opened_total", "New TCP/TLS connections per endpoint; requests minus this were served on reused connections", ("endpoint",))
+
+# --- Chain skeleton cache ---
+CHAIN_SKELETON_REQUESTS = registry.counter(
+    "webull_chain_skeleton_requests_total", "Chain structure lookups by result (hit: quotes only, miss: wb.get_options)", ("result",))
+
+# --- Chain snapshot cache ---
+CHAIN_CACHE_REQUESTS = registry.counter(
+    "webull_chain_cache_requests_total", "Chain snapshot cache reads by result (hit, stale, miss)", ("result",))
+
+# --- Request coalescing ---
+WEBULL_SINGLE_FLIGHT = registry.counter(
+    "webull_single_flight_requests_total", "MassiveAPIClient calls by result (leader: fetched, coalesced: joined an identical in-flight call)", ("call", "result"))
+
+# --- Webull executor ---
+WEBULL_CALLS = registry.counter(
+    "webull_calls_total", "Webull executor calls by result (ok, retry, failed, rejected: circuit open)", ("call", "result"))
+WEBULL_CIRCUIT_STATE = registry.gauge(
+    "webull_circuit_state", "Webull circuit breaker state (0 closed, 1 half-open, 2 open)")
+
+# --- Push quote stream ---
+WEBULL_STREAM_MESSAGES = registry.counter(
+    "webull_stream_messages_total", "Quote stream pushes by result (applied, ignored: contract not seeded, invalid)", ("result",))
+WEBULL_STREAM_CONNECTED = registry.gauge(
+    "webull_stream_connected", "1 while the push quote stream is connected")
+
+# --- PostgreSQL connection pool ---
+PG_POOL_WAIT_SECONDS = registry.histogram(
+    "webull_pg_pool_wait_seconds", "Time to check out a pooled PostgreSQL connection (waiting, health check, connecting)",
+    buckets=(0.0001, 0.0005) + DEFAULT_BUCKETS)
+PG_POOL_CHECKOUTS = registry.counter(
+    "webull_pg_pool_checkouts_total", "PostgreSQL connection checkouts by result (ok, timeout: pool exhausted, error: could not connect)", ("result",))
+PG_POOL_DISCARDED = registry.counter(
+    "webull_pg_pool_discarded_total", "Pooled PostgreSQL connections dropped at checkout (closed, failed_check)", ("reason",))
+PG_POOL_IN_USE = registry.gauge(
+    "webull_pg_pool_in_use", "PostgreSQL connections currently checked out of the pool")
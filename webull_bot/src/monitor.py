@@ -1,45 +1,136 @@
 import asyncio
+import dataclasses
 import logging
+import time
 from datetime import datetime, date
-from .api_client import MassiveAPIClient
-from .database import Database
-from .image_gen import ImageGenerator
+from .services import get_api, get_db
+from .command_repository import command_repository
+from .command_registry import CommandRegistry
+from .price_tracking_buffer import PriceTrackingBuffer
+from .notifier import NotificationQueue, NotificationJob
+from .poll_scheduler import AdaptivePollScheduler
+from . import market_calendar
+from .render_service import render_service
+from .snapshot_cache import chain_cache
+from .snapshot_recorder import SnapshotRecorder
+from .http_transport import connection_stats
 from .config import Config
+from .rate_limiter import TokenBucket
+from .chain_snapshot import normalize_type
+from . import metrics
 from .bot_handlers import get_template
 from aiogram import Bot
 # from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
 
 logger = logging.getLogger(__name__)
 
+# After a stream push wakes the loop, wait this long so a burst of pushes is evaluated in one cycle
+STREAM_BATCH_WINDOW = 0.25
+
 class MonitorEngine:
-    def __init__(self, bot: Bot):
+    def __init__(self, bot: Bot, api=None, db=None, notifier=None, renderer=None, cache=None, repository=None):
+        # Collaborators can be injected (e.g. stubs for the offline replay benchmark);
+        # by default the monitor shares the bot handlers' database and API client
         self.bot = bot
-        self.api = MassiveAPIClient()
-        self.db = Database()
-        self.image_gen = ImageGenerator()
+        self.api = api or get_api()
+        self.db = db or get_db()
+        # Command status changes and first message ids go through the async repository
+        self.repository = repository or command_repository
+        self.registry = CommandRegistry(self.db)
+        # Peak / last-notified changes are written once per cycle
+        self.tracking = PriceTrackingBuffer(self.db)
+        # Alerts are delivered by the queue's workers, never awaited inline
+        self.notifier = notifier or NotificationQueue(bot)
+        self.renderer = renderer or render_service
+        # Chains fetched here are reused by the bot handlers and vice versa
+        self.chain_cache = cache or chain_cache
+        self.recorder = SnapshotRecorder(Config.MONITOR_RECORD_PATH) if Config.MONITOR_RECORD_PATH else None
         self.running = False
+        # Concurrency cap and anti-ban pacing for chain fetches
+        self.fetch_slots = asyncio.Semaphore(Config.MONITOR_MAX_CONCURRENT_FETCHES)
+        self.rate_limiter = TokenBucket(Config.WEBULL_RATE_PER_SECOND, Config.WEBULL_RATE_BURST, jitter=Config.WEBULL_RATE_JITTER)
+        # Per-group poll intervals (proximity to trigger prices + recent volatility)
+        self.scheduler = AdaptivePollScheduler()
+        self._wakeup = asyncio.Event()
+        # Groups with streamed quote changes since the last cycle
+        self._stream_dirty = set()
         # Memory
         self.last_notified = {}
         self.peak_prices = {} # {cmd_id: max_price}
 
     async def start(self):
         self.running = True
+        self._wakeup.clear()
+        if Config.WEBULL_STREAMING:
+            self.api.start_streaming(self._on_stream_update)
         logger.info("Monitoring engine started.")
         while self.running:
-            await self.check_contracts()
-            await asyncio.sleep(8)
+            session = self._polled_session()
+            if session is None:
+                # Quotes cannot change: sleep until the next polled session opens
+                resume_at = market_calendar.next_session_start(sessions=self._polled_sessions())
+                if resume_at:
+                    logger.info(f"Market closed, monitor sleeping until {resume_at:%Y-%m-%d %H:%M %Z}")
+                    wait = (resume_at - market_calendar.now_et()).total_seconds()
+                else:
+                    wait = Config.MONITOR_MAX_INTERVAL
+                await self._sleep(wait)
+                continue
+
+            await self.check_contracts(session)
+            # Wake up when the next group is due, at least once per base interval
+            # so new commands are picked up quickly, or as soon as a stream push arrives
+            await self._sleep(min(max(1.0, self.scheduler.seconds_until_next()), Config.MONITOR_POLL_INTERVAL))
+            if self._stream_dirty and self.running:
+                await asyncio.sleep(STREAM_BATCH_WINDOW)
+
+    def _polled_sessions(self):
+        if Config.MONITOR_EXTENDED_HOURS:
+            return (market_calendar.SESSION_PRE, market_calendar.SESSION_REGULAR, market_calendar.SESSION_AFTER)
+        return (market_calendar.SESSION_REGULAR,)
+
+    def _polled_session(self):
+        """Current market session if the monitor should poll now, else None."""
+        if Config.MONITOR_IGNORE_MARKET_HOURS:
+            return market_calendar.SESSION_REGULAR
+        session, _ = market_calendar.current_session()
+        return session if session in self._polled_sessions() else None
+
+    async def _sleep(self, seconds):
+        """Sleep that returns early when stop() is called or a stream push arrives."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
+        if self.running:
+            self._wakeup.clear()
+
+    def _on_stream_update(self, key):
+        # Called on the event loop by the API client's quote stream
+        self._stream_dirty.add(key)
+        self._wakeup.set()
 
     async def stop(self):
         self.running = False
+        self._wakeup.set()
+        if Config.WEBULL_STREAMING:
+            self.api.stop_streaming()
+        # Persist any tracking changes still buffered
+        await self.tracking.flush()
+        await self.notifier.stop()
+        self.registry.close()
+        logger.info(f"Webull HTTP connection reuse: {connection_stats()}")
         logger.info("Monitoring engine stopped.")
 
-    async def check_contracts(self):
-        commands = self.db.get_active_commands()
+    async def check_contracts(self, session=market_calendar.SESSION_REGULAR):
+        # Active set is kept in memory and updated from NOTIFY events (blocking I/O, off the event loop)
+        commands = await asyncio.to_thread(self.registry.active_commands)
         if not commands:
             return
 
+        cycle_started = time.perf_counter()
+
         today = date.today()
-        import random # Jitter import
 
         # Group commands by Symbol + Expiration to use batch API calls
         # Anti-Ban Strategy: Fetch once per group instead of once per command
@@ -58,7 +149,7 @@ class MonitorEngine:
                 
                 if exp_date < today:
                     logger.info(f"Command {cmd['id']} expired ({cmd['expiration']}). Stopping.")
-                    self.db.update_command_status(cmd['id'], 'expired')
+                    await self.repository.update_command_status(cmd['id'], 'expired')
                     # Notify user... (Simplified for brevity, full logic below if needed or kept)
                     continue
             except ValueError:
@@ -69,228 +160,323 @@ class MonitorEngine:
             if key not in groups: groups[key] = []
             groups[key].append(cmd)
 
-        # Process Groups
-        for key, group_cmds in groups.items():
-            symbol, expiration = key
+        # Only groups whose adaptive poll interval has elapsed (or with streamed changes) are evaluated this tick
+        self.scheduler.retain(groups.keys(), [cmd['id'] for cmd in commands])
+        pushed, self._stream_dirty = self._stream_dirty, set()
+        due_groups = {key: cmds for key, cmds in groups.items() if key in pushed or self.scheduler.is_due(key)}
+        if Config.WEBULL_STREAMING:
+            self.api.update_stream_subscriptions({key: self._wanted(cmds) for key, cmds in groups.items()})
+
+        # Process Groups concurrently. The semaphore caps in-flight fetches and the
+        # token bucket keeps the overall request rate within the anti-ban budget,
+        # so the cycle takes about as long as the slowest fetch.
+        evaluated = await asyncio.gather(*(
+            self._process_group(symbol, expiration, group_cmds, session)
+            for (symbol, expiration), group_cmds in due_groups.items()
+        ))
+
+        # Write-behind: one batched UPDATE for all peak / last-notified changes of this cycle
+        await self.tracking.flush()
+
+        elapsed = time.perf_counter() - cycle_started
+        metrics.MONITOR_CYCLE_SECONDS.observe(elapsed)
+        metrics.MONITOR_GROUPS_POLLED.set(len(due_groups))
+        metrics.MONITOR_COMMANDS_PER_SECOND.set(sum(evaluated) / elapsed if elapsed > 0 else 0)
+        metrics.NOTIFY_QUEUE_DEPTH.set(self.notifier.qsize())
+        if elapsed > Config.MONITOR_POLL_INTERVAL:
+            metrics.MONITOR_CYCLE_OVER_BUDGET.inc()
+            logger.warning(f"Monitor cycle took {elapsed:.1f}s for {len(due_groups)} groups (budget {Config.MONITOR_POLL_INTERVAL:.0f}s)")
+
+    async def _process_group(self, symbol, expiration, group_cmds, session=market_calendar.SESSION_REGULAR):
+        """
+        Fetch the chain for one (symbol, expiration) group, evaluate its commands and schedule its next poll.
+        Returns the number of commands evaluated.
+        """
+        # Live streamed quotes need no request; otherwise poll
+        chain_data = self.api.stream_snapshot(symbol, expiration, self._wanted(group_cmds)) if Config.WEBULL_STREAMING else None
+        if chain_data is not None:
+            self.chain_cache.put_contracts(chain_data)
+        else:
+            async with self.fetch_slots:
+                await self.rate_limiter.acquire()
+
+                # Batch Fetch
+                try:
+                    loop = asyncio.get_running_loop()
+                    fetch_started = time.perf_counter()
+                    chain_data = await self._fetch_group_data(symbol, expiration, group_cmds)
+                    fetch_elapsed = time.perf_counter() - fetch_started
+                    metrics.MONITOR_STAGE_SECONDS.observe(fetch_elapsed, stage="fetch")
+                    metrics.MONITOR_GROUP_FETCH_SECONDS.observe(fetch_elapsed, symbol=symbol)
+                    if self.recorder:
+                        await loop.run_in_executor(None, self.recorder.record, chain_data)
+                except Exception as e:
+                    logger.error(f"Batch fetch failed for {symbol}: {e}")
+                    self.scheduler.record((symbol, expiration), [], session)
+                    return 0
+
+        if chain_data.degraded:
+            # Last-known data while Webull is unavailable: no alerts, peaks or poll history from it
+            logger.warning(f"Webull unavailable, skipping checks for {symbol} {expiration}")
+            self.scheduler.record((symbol, expiration), [], session)
+            return 0
+
+        # Process individual commands from cached data
+        observations = []
+        alerts = []
+        for cmd in group_cmds:
+            price, alert = self._process_command(symbol, cmd, chain_data)
+            if price is not None:
+                observations.append((cmd, price))
+            if alert is not None:
+                alerts.append(alert)
+        if alerts:
+            await self._send_alerts(alerts)
+        self.scheduler.record((symbol, expiration), observations, session)
+        metrics.MONITOR_COMMANDS_EVALUATED.inc(len(observations))
+        return len(observations)
+
+    async def _fetch_group_data(self, symbol, expiration, group_cmds):
+        """
+        Chain data for one group. A full chain a handler fetched moments ago is reused
+        (the monitor never evaluates stale data); otherwise only the strikes of this
+        group's commands are quoted, or the whole chain if targeted quotes are disabled.
+        """
+        if not Config.MONITOR_TARGETED_QUOTES:
+            return await self.chain_cache.get(
+                symbol, expiration, self.api.get_batch_option_data_async,
+                max_age=Config.CHAIN_CACHE_MONITOR_MAX_AGE, allow_stale=False
+            )
+        cached = self.chain_cache.peek(symbol, expiration, max_age=Config.CHAIN_CACHE_MONITOR_MAX_AGE)
+        if cached is not None:
+            return cached
+        # Partial snapshots are cached per contract only; full chain entries stay complete
+        chain_data = await self.api.get_quotes_for(symbol, expiration, self._wanted(group_cmds))
+        self.chain_cache.put_contracts(chain_data)
+        return chain_data
+
+    @staticmethod
+    def _wanted(group_cmds):
+        """{(strike, type)} contracts the group's commands watch."""
+        return {
+            (float(cmd['strike']), normalize_type(cmd['contract_type']))
+            for cmd in group_cmds if cmd['strike'] is not None
+        }
+
+    async def _send_alerts(self, alerts):
+        """
+        Render a group's alert images concurrently (the render service batches them
+        into its process pool), then queue each image for its chats.
+        alerts: [(cmd, img_data, [NotificationJob without image])]
+        """
+        images = await asyncio.gather(
+            *(self._render(img_data) for _, img_data, _ in alerts), return_exceptions=True
+        )
+        for (cmd, _, jobs), image_bytes in zip(alerts, images):
+            if isinstance(image_bytes, Exception):
+                logger.error(f"Error rendering alert for cmd {cmd['id']}: {image_bytes}")
+                continue
+            for job in jobs:
+                self.notifier.enqueue(dataclasses.replace(job, image=image_bytes))
+
+    async def _render(self, img_data):
+        with metrics.MONITOR_STAGE_SECONDS.time(stage="render"):
+            return await self.renderer.render_status(img_data)
+
+    def _process_command(self, symbol, cmd, chain_data):
+        """
+        Evaluate a single command against its group's chain data.
+        Returns (current price, alert): the price is None if the command could not be
+        priced; the alert (cmd, image data, notification jobs) is None if none is due.
+        """
+        try:
+            decision_started = time.perf_counter()
+            # Handle Decimal type from PostgreSQL
+            strike_val = cmd['strike']
+            target_strike = float(strike_val) if strike_val is not None else 0.0
+            contract_type = 'C' if str(cmd['contract_type']).upper().startswith('C') else 'P'
+            
+            # Load persisted price tracking from DB if not in memory
+            cmd_id = cmd['id']
+            if cmd_id not in self.last_notified:
+                db_last = float(cmd.get('last_notified_price', 0) or 0)
+                db_peak = float(cmd.get('peak_price', 0) or 0)
+                if db_last > 0:
+                    self.last_notified[cmd_id] = db_last
+                if db_peak > 0:
+                    self.peak_prices[cmd_id] = db_peak
             
-            # Anti-ban delay (Jitter)
-            # Random delay 1-3s between underlying stats to look more human
-            await asyncio.sleep(random.uniform(1.0, 3.0)) 
+            # Fuzzy match for strike (float precision issue)
+            # chain_data is a ChainSnapshot: exact key first, then bisect for the
+            # nearest strike of this type within tolerance
+            found_data = chain_data.find(target_strike, contract_type)
+            
+            if not found_data:
+                logger.warning(f"No data for cmd {cmd['id']} in batch")
+                return None, None
 
-            # Batch Fetch
+            data = found_data
+            
+            # Round to 2 decimal places for comparison
+            last_price = data.get('last_price', 0)
+            bid = data.get('bid', 0)
+            ask = data.get('ask', 0)
+            mid_price = (bid + ask) / 2 if (bid and ask) else last_price
+            current_price = round(mid_price, 2)
+            
+            # --- Terminal Output ---
+            now_str = datetime.now().strftime("%H:%M:%S")
+            ch_pct = data.get('change_pct', 0)
+            direction = "🟢" if ch_pct >= 0 else "🔴"
             try:
-                # This runs synch request in executor to avoid blocking
-                loop = asyncio.get_running_loop()
-                chain_data = await loop.run_in_executor(None, self.api.get_batch_option_data, symbol, str(expiration))
-            except Exception as e:
-                logger.error(f"Batch fetch failed for {symbol}: {e}")
-                continue
+                print(f"[{now_str}] {symbol} {cmd['strike']} {contract_type}: ${current_price} | {ch_pct}% | {direction}")
+            except:
+                pass
+            # -----------------------
 
-            # Process individual commands from cached data
-            for cmd in group_cmds:
-                try:
-                    # Handle Decimal type from PostgreSQL
-                    strike_val = cmd['strike']
-                    target_strike = float(strike_val) if strike_val is not None else 0.0
-                    contract_type = 'C' if str(cmd['contract_type']).upper().startswith('C') else 'P'
-                    
-                    # Load persisted price tracking from DB if not in memory
-                    cmd_id = cmd['id']
+            mode = cmd.get('notification_mode', 'always')
+            
+            notification_needed = False
+            
+            # Update Peaks
+            initial_check = False
+            if cmd_id not in self.peak_prices:
+                self.peak_prices[cmd_id] = current_price
+                initial_check = True # Flag to notify on start
+            
+            is_new_peak = current_price > self.peak_prices[cmd_id]
+            if is_new_peak:
+                self.peak_prices[cmd_id] = current_price
+                # Persist peak to DB (buffered, flushed at the end of the cycle)
+                self.tracking.record(
+                    cmd_id, 
+                    self.last_notified.get(cmd_id, 0), 
+                    self.peak_prices[cmd_id]
+                )
+
+            # --- Logic based on Mode ---
+            if mode == 'peaks':
+                if is_new_peak or initial_check:
+                    notification_needed = True
+            
+            elif mode == 'wait':
+                if cmd['target_price'] and current_price >= cmd['target_price']:
                     if cmd_id not in self.last_notified:
-                        db_last = float(cmd.get('last_notified_price', 0) or 0)
-                        db_peak = float(cmd.get('peak_price', 0) or 0)
-                        if db_last > 0:
-                            self.last_notified[cmd_id] = db_last
-                        if db_peak > 0:
-                            self.peak_prices[cmd_id] = db_peak
-                    
-                    # Fuzzy match for strike (float precision issue)
-                    # We look for closest strike in the chain data
-                    # chain_data keys are (strike_float, type_str)
-                    
-                    # Find exact or closest match
-                    match_key = None
-                    min_diff = 0.05 # Tolerance
-                    
-                    found_data = None
-                    
-                    # Check exact first
-                    if (target_strike, contract_type) in chain_data:
-                        found_data = chain_data[(target_strike, contract_type)]
-                    else:
-                        # Scan for closest
-                        for (s, t), d in chain_data.items():
-                            if t == contract_type and abs(s - target_strike) < min_diff:
-                                found_data = d
-                                break
-                    
-                    if not found_data:
-                        logger.warning(f"No data for cmd {cmd['id']} in batch")
-                        continue
+                        notification_needed = True
+                    elif current_price > self.last_notified[cmd_id]:
+                        notification_needed = True
 
-                    data = found_data
-                    
-                    # Round to 2 decimal places for comparison
-                    last_price = data.get('last_price', 0)
-                    bid = data.get('bid', 0)
-                    ask = data.get('ask', 0)
-                    mid_price = (bid + ask) / 2 if (bid and ask) else last_price
-                    current_price = round(mid_price, 2)
-                    
-                    # --- Terminal Output ---
-                    now_str = datetime.now().strftime("%H:%M:%S")
-                    ch_pct = data.get('change_pct', 0)
-                    direction = "🟢" if ch_pct >= 0 else "🔴"
-                    try:
-                        print(f"[{now_str}] {symbol} {cmd['strike']} {contract_type}: ${current_price} | {ch_pct}% | {direction}")
-                    except:
-                        pass
-                    # -----------------------
-
-                    mode = cmd.get('notification_mode', 'always')
+            elif mode == 'wait_down':
+                if cmd['target_price'] and current_price <= cmd['target_price']:
+                    if cmd_id not in self.last_notified:
+                        notification_needed = True
+                    elif current_price < self.last_notified[cmd_id]:
+                        notification_needed = True
                     
+            elif mode == 'enter':
+                if cmd['entry_price'] and current_price >= cmd['entry_price']:
+                    if cmd_id not in self.last_notified:
+                        notification_needed = True
+                    elif current_price > self.last_notified[cmd_id]:
+                        notification_needed = True
+
+            else: # Default 'always' - Only notify on price INCREASE
+                if cmd_id not in self.last_notified:
+                    # Initialize with current price but DO NOT notify
+                    self.last_notified[cmd_id] = current_price
+                    notification_needed = False
+                elif current_price > self.last_notified[cmd_id]:
+                    # Only notify if price is HIGHER than last notified price
+                    notification_needed = True
+                else:
+                    # Price is same or lower - do NOT notify
                     notification_needed = False
-                    
-                    # Update Peaks
-                    initial_check = False
-                    if cmd_id not in self.peak_prices:
-                        self.peak_prices[cmd_id] = current_price
-                        initial_check = True # Flag to notify on start
-                    
-                    is_new_peak = current_price > self.peak_prices[cmd_id]
-                    if is_new_peak:
-                        self.peak_prices[cmd_id] = current_price
-                        # Persist peak to DB
-                        self.db.update_price_tracking(
-                            cmd_id, 
-                            self.last_notified.get(cmd_id, 0), 
-                            self.peak_prices[cmd_id]
-                        )
-
-                    # --- Logic based on Mode ---
-                    if mode == 'peaks':
-                        if is_new_peak or initial_check:
-                            notification_needed = True
-                    
-                    elif mode == 'wait':
-                        if cmd['target_price'] and current_price >= cmd['target_price']:
-                            if cmd_id not in self.last_notified:
-                                notification_needed = True
-                            elif current_price > self.last_notified[cmd_id]:
-                                notification_needed = True
-
-                    elif mode == 'wait_down':
-                        if cmd['target_price'] and current_price <= cmd['target_price']:
-                            if cmd_id not in self.last_notified:
-                                notification_needed = True
-                            elif current_price < self.last_notified[cmd_id]:
-                                notification_needed = True
-                            
-                    elif mode == 'enter':
-                        if cmd['entry_price'] and current_price >= cmd['entry_price']:
-                            if cmd_id not in self.last_notified:
-                                notification_needed = True
-                            elif current_price > self.last_notified[cmd_id]:
-                                notification_needed = True
-
-                    else: # Default 'always' - Only notify on price INCREASE
-                        if cmd_id not in self.last_notified:
-                            # Initialize with current price but DO NOT notify
-                            self.last_notified[cmd_id] = current_price
-                            notification_needed = False
-                        elif current_price > self.last_notified[cmd_id]:
-                            # Only notify if price is HIGHER than last notified price
-                            notification_needed = True
-                        else:
-                            # Price is same or lower - do NOT notify
-                            notification_needed = False
-                    
 
-                    if notification_needed:
-                        is_first_notification = cmd_id not in self.last_notified
-                        self.last_notified[cmd_id] = current_price
-                        # Persist to DB after notification
-                        self.db.update_price_tracking(
-                            cmd_id,
-                            self.last_notified[cmd_id],
-                            self.peak_prices.get(cmd_id, current_price)
-                        )
-                        
-                        img_data = {
-                            'symbol': cmd['symbol'],
-                            'strike': cmd['strike'],
-                            'type': cmd['contract_type'],
-                            'last_price': current_price,
-                            'entry_price': cmd['entry_price'],
-                            'expiration': cmd['expiration'],
-                            'volume': data.get('volume'),
-                            'openInterest': data.get('openInterest', 0),
-                            'change_pct': data.get('change_pct', 0),
-                            'change_abs': data.get('change_abs', 0),
-                            'underlying_price': data.get('underlying_price', 0),
-                            'bid': data.get('bid', 0),
-                            'ask': data.get('ask', 0),
-                            'impliedVolatility': data.get('impliedVolatility', 0)
-                        }
-                        
-                        image_buf = self.image_gen.generate_status_image(img_data)
-                        
-                        from aiogram.types import BufferedInputFile
-                        fname = f"{cmd['symbol']}_{cmd_id}.png"
-                        photo = BufferedInputFile(image_buf.read(), filename=fname)
-                        
-                        target_chats = Config.TELEGRAM_GROUP_IDS if Config.TELEGRAM_GROUP_IDS else [cmd['chat_id']]
-                        
-                        bid = data.get('bid', 0) or 0
-                        ask = data.get('ask', 0) or 0
-                        mid_caption = (bid + ask) / 2 if (bid and ask) else current_price
-                        if mid_caption == 0: mid_caption = last_price
-
-                        type_ar = "🟢 كول 🟢" if cmd['contract_type'].upper().startswith('C') else "🔴 بوت 🔴"
-
-                        template_vars = {
-                            'symbol': cmd['symbol'],
-                            'strike': cmd['strike'],
-                            'expiration': cmd['expiration'],
-                            'type_ar': type_ar,
-                            'price': f"{mid_caption:.2f}",
-                            'target_price': f"{(cmd.get('target_price') or 0):.2f}",
-                            'entry_price': f"{(cmd.get('entry_price') or 0):.2f}"
-                        }
-
-                        caption = get_template('update').format(**template_vars)
-                        
-                        if mode == 'enter' and is_first_notification:
-                            caption = get_template('enter_first').format(**template_vars)
-                        elif (mode == 'wait' or mode == 'wait_down') and is_first_notification:
-                            caption = get_template('wait_first').format(**template_vars)
-                        elif (mode == 'always' or mode is None) and is_first_notification:
-                            caption = get_template('select_first').format(**template_vars)
-
-                        for chat_id in target_chats:
-                            try:
-                                image_buf.seek(0)
-                                photo_send = BufferedInputFile(image_buf.read(), filename=fname)
-                                first_msg_id = cmd.get("first_message_id")
-                                reply_to = first_msg_id if (first_msg_id and not is_first_notification) else None
-                                sent = await self.bot.send_photo(
-                                    chat_id=chat_id,
-                                    photo=photo_send,
-                                    caption=caption,
-                                    parse_mode="Markdown",
-                                    reply_to_message_id=reply_to
-                                )
-                                if is_first_notification and sent:
-                                    try:
-                                        conn = self.db._get_conn()
-                                        with conn.cursor() as cur:
-                                            cur.execute("UPDATE monitoring_commands SET first_message_id = %s WHERE id = %s", (sent.message_id, cmd_id))
-                                            conn.commit()
-                                        conn.close()
-                                        cmd["first_message_id"] = sent.message_id
-                                    except Exception as db_err:
-                                        logger.error(f"Failed to save first_message_id: {db_err}")
-                            except Exception as send_err:
-                                logger.error(f"Failed to send photo to {chat_id}: {send_err}")
-                except Exception as e:
-                    logger.error(f"Error processing cmd {cmd['id']} in batch: {e}")
+            metrics.MONITOR_STAGE_SECONDS.observe(time.perf_counter() - decision_started, stage="decision")
+
+            alert = None
+            if notification_needed:
+                is_first_notification = cmd_id not in self.last_notified
+                self.last_notified[cmd_id] = current_price
+                # Persist to DB after notification (buffered, flushed at the end of the cycle)
+                self.tracking.record(
+                    cmd_id,
+                    self.last_notified[cmd_id],
+                    self.peak_prices.get(cmd_id, current_price)
+                )
+                
+                img_data = {
+                    'symbol': cmd['symbol'],
+                    'strike': cmd['strike'],
+                    'type': cmd['contract_type'],
+                    'last_price': current_price,
+                    'entry_price': cmd['entry_price'],
+                    'expiration': cmd['expiration'],
+                    'volume': data.get('volume'),
+                    'openInterest': data.get('openInterest', 0),
+                    'change_pct': data.get('change_pct', 0),
+                    'change_abs': data.get('change_abs', 0),
+                    'underlying_price': data.get('underlying_price', 0),
+                    'bid': data.get('bid', 0),
+                    'ask': data.get('ask', 0),
+                    'impliedVolatility': data.get('impliedVolatility', 0)
+                }
+                
+                fname = f"{cmd['symbol']}_{cmd_id}.png"
+                
+                target_chats = Config.TELEGRAM_GROUP_IDS if Config.TELEGRAM_GROUP_IDS else [cmd['chat_id']]
+                
+                bid = data.get('bid', 0) or 0
+                ask = data.get('ask', 0) or 0
+                mid_caption = (bid + ask) / 2 if (bid and ask) else current_price
+                if mid_caption == 0: mid_caption = last_price
+
+                type_ar = "🟢 كول 🟢" if cmd['contract_type'].upper().startswith('C') else "🔴 بوت 🔴"
+
+                template_vars = {
+                    'symbol': cmd['symbol'],
+                    'strike': cmd['strike'],
+                    'expiration': cmd['expiration'],
+                    'type_ar': type_ar,
+                    'price': f"{mid_caption:.2f}",
+                    'target_price': f"{(cmd.get('target_price') or 0):.2f}",
+                    'entry_price': f"{(cmd.get('entry_price') or 0):.2f}"
+                }
+
+                caption = get_template('update').format(**template_vars)
+                
+                if mode == 'enter' and is_first_notification:
+                    caption = get_template('enter_first').format(**template_vars)
+                elif (mode == 'wait' or mode == 'wait_down') and is_first_notification:
+                    caption = get_template('wait_first').format(**template_vars)
+                elif (mode == 'always' or mode is None) and is_first_notification:
+                    caption = get_template('select_first').format(**template_vars)
+
+                first_msg_id = cmd.get("first_message_id")
+                reply_to = first_msg_id if (first_msg_id and not is_first_notification) else None
+                on_sent = self._first_message_recorder(cmd) if is_first_notification else None
+                # The image is rendered with the rest of the group's alerts
+                jobs = [
+                    NotificationJob(
+                        chat_id=chat_id,
+                        image=None,
+                        filename=fname,
+                        caption=caption,
+                        reply_to=reply_to,
+                        on_sent=on_sent
+                    )
+                    for chat_id in target_chats
+                ]
+                alert = (cmd, img_data, jobs)
+
+            return current_price, alert
+        except Exception as e:
+            logger.error(f"Error processing cmd {cmd['id']} in batch: {e}")
+            return None, None
+
+    def _first_message_recorder(self, cmd):
+        """Callback that stores the first alert's message id once the queue has sent it."""
+        async def record(sent):
+            cmd["first_message_id"] = sent.message_id
+            await self.repository.set_first_message_id(cmd['id'], sent.message_id)
+        return record
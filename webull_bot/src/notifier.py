@@ -0,0 +1,126 @@
+"""
+Outbound Telegram notification queue for monitor alerts.
+The monitor only enqueues jobs; worker tasks deliver them while respecting
+Telegram's global and per-chat rate limits and `retry_after` flood control.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError
+from aiogram.types import BufferedInputFile
+from .config import Config
+from .rate_limiter import TokenBucket
+from .metrics import MONITOR_STAGE_SECONDS, NOTIFY_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NotificationJob:
+    chat_id: Any
+    image: bytes
+    filename: str
+    caption: str
+    reply_to: Optional[int] = None
+    parse_mode: str = "Markdown"
+    # Awaited with the sent Message once delivery succeeds
+    on_sent: Optional[Callable[[Any], Awaitable[None]]] = None
+
+
+class NotificationQueue:
+    """
+    Per-chat queues of photo notifications, each drained by its own worker task,
+    so a slow upload or flood wait in one chat never delays the others.
+    - Global pacing through a token bucket (TELEGRAM_GLOBAL_RATE msgs/sec).
+    - Per-chat spacing of TELEGRAM_CHAT_INTERVAL seconds, in enqueue order.
+    - On 429 the chat is paused for `retry_after` and the job is retried.
+    """
+
+    def __init__(self, bot: Bot, global_rate=None, chat_interval=None, max_retries=None):
+        self.bot = bot
+        self.chat_interval = chat_interval if chat_interval is not None else Config.TELEGRAM_CHAT_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else Config.NOTIFY_MAX_RETRIES
+        rate = global_rate or Config.TELEGRAM_GLOBAL_RATE
+        self._global = TokenBucket(rate, rate)
+        self._queues = {}   # {chat_id: asyncio.Queue}
+        self._workers = {}  # {chat_id: worker task}
+        self._chat_ready_at = {}  # {chat_id: monotonic time of next allowed send}
+
+    async def stop(self, timeout=10):
+        """Give queued jobs up to `timeout` seconds to go out, then stop the workers."""
+        if self._queues:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(q.join() for q in self._queues.values())), timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Notification queue stopped with {self.qsize()} jobs pending")
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers = {}
+        self._queues = {}
+
+    def enqueue(self, job: NotificationJob):
+        queue = self._queues.get(job.chat_id)
+        if queue is None:
+            queue = self._queues[job.chat_id] = asyncio.Queue()
+        queue.put_nowait(job)
+        NOTIFY_QUEUE_DEPTH.set(self.qsize())
+        worker = self._workers.get(job.chat_id)
+        if worker is None or worker.done():
+            self._workers[job.chat_id] = asyncio.create_task(self._worker(queue))
+
+    def qsize(self):
+        return sum(q.qsize() for q in self._queues.values())
+
+    async def _worker(self, queue):
+        while True:
+            job = await queue.get()
+            NOTIFY_QUEUE_DEPTH.set(self.qsize())
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                logger.error(f"Failed to send photo to {job.chat_id}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, job: NotificationJob):
+        for attempt in range(self.max_retries + 1):
+            wait = self._chat_ready_at.get(job.chat_id, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._global.acquire()
+
+            send_started = time.perf_counter()
+            try:
+                sent = await self.bot.send_photo(
+                    chat_id=job.chat_id,
+                    photo=BufferedInputFile(job.image, filename=job.filename),
+                    caption=job.caption,
+                    parse_mode=job.parse_mode,
+                    reply_to_message_id=job.reply_to
+                )
+            except TelegramRetryAfter as e:
+                logger.warning(f"Flood control for chat {job.chat_id}, retrying in {e.retry_after}s")
+                self._chat_ready_at[job.chat_id] = time.monotonic() + e.retry_after
+                continue
+            except (TelegramNetworkError, TelegramServerError) as e:
+                backoff = min(2 ** attempt, 30)
+                logger.warning(f"Send to {job.chat_id} failed ({e}), retrying in {backoff}s")
+                self._chat_ready_at[job.chat_id] = time.monotonic() + backoff
+                continue
+
+            MONITOR_STAGE_SECONDS.observe(time.perf_counter() - send_started, stage="send")
+            self._chat_ready_at[job.chat_id] = time.monotonic() + self.chat_interval
+            if job.on_sent and sent:
+                try:
+                    await job.on_sent(sent)
+                except Exception as e:
+                    logger.error(f"Notification callback failed for chat {job.chat_id}: {e}")
+            return
+
+        logger.error(f"Giving up on notification to {job.chat_id} after {self.max_retries + 1} attempts")
@@ -0,0 +1,145 @@
+"""
+Shared psycopg2 connection pool for Database.
+Queries reuse pooled connections instead of paying a TCP handshake,
+authentication and backend fork each time. A checkout blocks for up to
+PG_POOL_TIMEOUT seconds while all PG_POOL_MAX connections are in use, and
+connections that sat idle longer than PG_POOL_CHECK_IDLE seconds are pinged
+before they are handed out (dropped server connections are replaced).
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+import psycopg2
+from psycopg2 import pool
+from .config import Config
+from .metrics import PG_POOL_WAIT_SECONDS, PG_POOL_CHECKOUTS, PG_POOL_DISCARDED, PG_POOL_IN_USE
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No pooled connection became free within the checkout timeout."""
+
+
+def connect_params():
+    return {
+        "dbname": Config.POSTGRES_DB,
+        "user": Config.POSTGRES_USER,
+        "password": Config.POSTGRES_PASSWORD,
+        "host": Config.POSTGRES_HOST,
+        "port": Config.POSTGRES_PORT,
+    }
+
+
+class PgPool:
+    def __init__(self, minconn=None, maxconn=None, timeout=None, check_idle=None, conn_params=None):
+        # psycopg2 keeps at most `minconn` idle connections; extra ones are closed when returned
+        self.minconn = Config.PG_POOL_MIN if minconn is None else minconn
+        self.maxconn = maxconn or Config.PG_POOL_MAX
+        self.timeout = Config.PG_POOL_TIMEOUT if timeout is None else timeout
+        self.check_idle = Config.PG_POOL_CHECK_IDLE if check_idle is None else check_idle
+        self.conn_params = conn_params
+        self._pool = None  # Opened on first checkout, so importing has no side effects
+        self._lock = threading.Lock()
+        # ThreadedConnectionPool raises when exhausted; callers wait on this instead
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._idle_since = {}  # {connection: time.monotonic() when returned}
+        self._in_use = 0
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = pool.ThreadedConnectionPool(self.minconn, self.maxconn, **(self.conn_params or connect_params()))
+            return self._pool
+
+    def connect(self):
+        """A dedicated connection outside the pool (e.g. a long-lived LISTEN connection)."""
+        return psycopg2.connect(**(self.conn_params or connect_params()))
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the `with` block. The block commits its own
+        work; an exception rolls the transaction back before the connection is returned.
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            PG_POOL_CHECKOUTS.inc(result="timeout")
+            raise PoolTimeout(f"No PostgreSQL connection free within {self.timeout}s ({self.maxconn} in use)")
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            PG_POOL_CHECKOUTS.inc(result="error")
+            raise
+        PG_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        PG_POOL_CHECKOUTS.inc(result="ok")
+        self._set_in_use(1)
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            raise
+        finally:
+            self._checkin(conn)
+            self._set_in_use(-1)
+            self._slots.release()
+
+    def _checkout(self):
+        pg_pool = self._get_pool()
+        # Every idle connection may turn out dead (e.g. after a server restart)
+        for _ in range(self.minconn + 1):
+            conn = pg_pool.getconn()
+            idle_since = self._idle_since.pop(conn, None)
+            if conn.closed:
+                PG_POOL_DISCARDED.inc(reason="closed")
+                pg_pool.putconn(conn, close=True)
+                continue
+            if idle_since is None or time.monotonic() - idle_since < self.check_idle:
+                return conn
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+                return conn
+            except psycopg2.Error as e:
+                logger.warning(f"Discarding broken PostgreSQL connection: {e}")
+                PG_POOL_DISCARDED.inc(reason="failed_check")
+                pg_pool.putconn(conn, close=True)
+        # Whatever getconn returns now is a new connection
+        return pg_pool.getconn()
+
+    def _checkin(self, conn):
+        self._idle_since[conn] = time.monotonic()
+        pg_pool = self._pool
+        try:
+            if pg_pool is None:
+                raise pool.PoolError("connection pool is closed")
+            # Rolls back an open transaction; closes the connection above minconn or if it is broken
+            pg_pool.putconn(conn, close=bool(conn.closed))
+        except pool.PoolError:
+            # The pool was closed (or replaced) while the connection was checked out
+            conn.close()
+        if conn.closed:
+            self._idle_since.pop(conn, None)
+
+    def _set_in_use(self, delta):
+        with self._lock:
+            self._in_use += delta
+            PG_POOL_IN_USE.set(self._in_use)
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+            self._idle_since.clear()
+
+
+# Shared by the Database instances of the process
+pg_pool = PgPool()
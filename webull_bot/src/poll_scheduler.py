@@ -0,0 +1,97 @@
+"""
+Adaptive per-group poll scheduling for the monitor.
+Each (symbol, expiration) group gets its own next-due time, based on how
+close its contracts are to their trigger prices and how fast they move.
+"""
+import time
+from collections import deque
+from .config import Config
+from .market_calendar import SESSION_REGULAR
+
+# Modes that alert on any uptick: distance to a threshold does not apply
+_THRESHOLD_FIELDS = {
+    'wait': 'target_price',
+    'wait_down': 'target_price',
+    'enter': 'entry_price',
+}
+
+
+class AdaptivePollScheduler:
+    """
+    interval = base * proximity_factor * volatility_factor (* session factor),
+    clamped to [min_interval, max_interval]. The fastest command in a group
+    decides the group's interval.
+    """
+
+    def __init__(self, base_interval=None, min_interval=None, max_interval=None,
+                 near_pct=None, volatility_ref_pct=None, extended_hours_factor=None, history=10):
+        self.base_interval = base_interval or Config.MONITOR_POLL_INTERVAL
+        self.min_interval = min_interval or Config.MONITOR_MIN_INTERVAL
+        self.max_interval = max_interval or Config.MONITOR_MAX_INTERVAL
+        # Distance to trigger (fraction of price) that maps to the base interval
+        self.near_pct = near_pct or Config.MONITOR_NEAR_THRESHOLD_PCT
+        # Mean absolute move per poll (fraction) that maps to the base interval
+        self.volatility_ref_pct = volatility_ref_pct or Config.MONITOR_VOLATILITY_REF_PCT
+        self.extended_hours_factor = extended_hours_factor or Config.MONITOR_EXTENDED_HOURS_FACTOR
+        self._next_due = {}  # {group_key: monotonic time}
+        self._prices = {}    # {cmd_id: deque of recent prices}
+        self._history = history
+
+    def is_due(self, key, now=None):
+        now = now if now is not None else time.monotonic()
+        return self._next_due.get(key, 0) <= now
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the earliest group is due (base interval if nothing is scheduled)."""
+        if not self._next_due:
+            return self.base_interval
+        now = now if now is not None else time.monotonic()
+        return max(0.0, min(self._next_due.values()) - now)
+
+    def retain(self, keys, cmd_ids):
+        """Drop state for groups / commands that are no longer active."""
+        keys, cmd_ids = set(keys), set(cmd_ids)
+        self._next_due = {k: v for k, v in self._next_due.items() if k in keys}
+        self._prices = {k: v for k, v in self._prices.items() if k in cmd_ids}
+
+    def record(self, key, observations, session=SESSION_REGULAR, now=None):
+        """
+        Schedule the next poll of a group.
+        observations: [(cmd, current_price)] for the commands evaluated this poll.
+        """
+        now = now if now is not None else time.monotonic()
+        factor = None
+        for cmd, price in observations:
+            history = self._prices.setdefault(cmd['id'], deque(maxlen=self._history))
+            history.append(price)
+            cmd_factor = self._proximity_factor(cmd, price) * self._volatility_factor(history)
+            factor = cmd_factor if factor is None else min(factor, cmd_factor)
+
+        interval = self.base_interval * (factor if factor is not None else 1.0)
+        if session != SESSION_REGULAR:
+            interval *= self.extended_hours_factor
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        self._next_due[key] = now + interval
+        return interval
+
+    def _proximity_factor(self, cmd, price):
+        field = _THRESHOLD_FIELDS.get(cmd.get('notification_mode'))
+        threshold = float(cmd.get(field) or 0) if field else 0
+        if not threshold or not price:
+            return 1.0
+        distance = abs(price - threshold) / threshold
+        # Near the trigger -> poll faster (down to 0.5x), far away -> slower (up to 3x)
+        return min(3.0, max(0.5, distance / self.near_pct))
+
+    def _volatility_factor(self, history):
+        if len(history) < 3:
+            return 1.0
+        prices = list(history)
+        moves = [abs(b - a) / a for a, b in zip(prices, prices[1:]) if a]
+        if not moves:
+            return 1.0
+        mean_move = sum(moves) / len(moves)
+        if mean_move == 0:
+            return 2.0
+        # Fast movers -> poll faster (down to 0.5x), flat quotes -> slower (up to 2x)
+        return min(2.0, max(0.5, self.volatility_ref_pct / mean_move))
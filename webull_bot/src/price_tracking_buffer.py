@@ -0,0 +1,42 @@
+"""
+Write-behind buffer for monitor price tracking (last notified / peak prices).
+"""
+import asyncio
+import logging
+from .metrics import MONITOR_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class PriceTrackingBuffer:
+    """
+    Collects price tracking changes during a monitor cycle and writes them
+    in one batched UPDATE. Several changes to the same command in a cycle
+    collapse into its latest values.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._pending = {}  # {cmd_id: (last_notified_price, peak_price)}
+        self._lock = asyncio.Lock()
+
+    def record(self, cmd_id, last_notified_price, peak_price):
+        """Queue the latest tracking values for a command (no I/O)."""
+        self._pending[cmd_id] = (last_notified_price, peak_price)
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def flush(self):
+        """Write all pending changes in a single round trip, off the event loop."""
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            rows = [(cmd_id, last, peak) for cmd_id, (last, peak) in batch.items()]
+            with MONITOR_STAGE_SECONDS.time(stage="db_write"):
+                ok = await asyncio.to_thread(self.db.update_price_tracking_batch, rows)
+            if not ok:
+                # Keep the values for the next flush; anything recorded meanwhile is newer
+                for cmd_id, values in batch.items():
+                    self._pending.setdefault(cmd_id, values)
@@ -0,0 +1,151 @@
+"""
+Async client for Webull's batch option quote endpoint.
+One keep-alive aiohttp session is shared by the whole process; the 50-id
+batches of a chain are requested concurrently and their JSON arrays are
+decoded item by item as the response streams in.
+"""
+import asyncio
+import codecs
+import json
+import logging
+import os
+import ssl
+import aiohttp
+import certifi
+from .config import Config
+from .metrics import WEBULL_HTTP_REQUESTS, WEBULL_HTTP_CONNECTIONS
+from .http_transport import endpoint_name
+
+logger = logging.getLogger(__name__)
+
+QUOTES_BATCH_URL = 'https://quotes-gw.webullfintech.com/api/quote/option/quotes/queryBatch'
+if Config.WEBULL_GATEWAY_URL:
+    QUOTES_BATCH_URL = f"{Config.WEBULL_GATEWAY_URL}/api/quote/option/quotes/queryBatch"
+# Max derivative ids per request accepted by the endpoint
+QUOTE_BATCH_SIZE = 50
+
+
+def _decode_items(buf, pos, decoder, on_item):
+    """
+    Decode complete array items from `buf` starting at `pos` and pass them to `on_item`.
+    Returns the position of the first byte not consumed (start of an incomplete item).
+    """
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buf) or buf[pos] == ']':
+            return pos
+        try:
+            item, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            return pos
+        on_item(item)
+
+
+class AsyncQuoteClient:
+    def __init__(self, concurrency=None, timeout=10, url=QUOTES_BATCH_URL):
+        self.url = url
+        self.endpoint = endpoint_name(url)
+        self.concurrency = concurrency or Config.WEBULL_QUOTE_CONCURRENCY
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+        self._slots = None
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # Sessions are bound to the loop that created them
+            # SSL_CERT_FILE points at the ASCII-path copy of the bundle (api_client.install_ca_bundle)
+            cafile = os.environ.get('SSL_CERT_FILE') or certifi.where()
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                keepalive_timeout=60,
+                ssl=ssl.create_default_context(cafile=cafile)
+            )
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_new_connection)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace]
+            )
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _on_new_connection(self, session, context, params):
+        WEBULL_HTTP_CONNECTIONS.inc(endpoint=self.endpoint)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def fetch(self, derivative_ids, headers=None):
+        """
+        Real-time quotes for `derivative_ids` as {tickerId: quote dict}. Failed batches are
+        skipped; if every batch failed the first error is raised.
+        """
+        if not derivative_ids:
+            return {}
+        session = self._get_session()
+        quotes = {}
+        batches = [derivative_ids[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(derivative_ids), QUOTE_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self._fetch_batch(session, batch, headers, quotes) for batch in batches),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error(f"Error fetching batch option quotes: {error}")
+        if errors and len(errors) == len(batches):
+            raise errors[0]
+        return quotes
+
+    async def _fetch_batch(self, session, batch_ids, headers, quotes):
+        params = {'derivativeIds': ','.join(map(str, batch_ids))}
+
+        def add(item):
+            if isinstance(item, dict) and item.get('tickerId'):
+                quotes[item['tickerId']] = item
+
+        async with self._slots:
+            WEBULL_HTTP_REQUESTS.inc(endpoint=self.endpoint, client="aiohttp")
+            async with session.get(self.url, params=params, headers=headers) as response:
+                if response.status == 429 or response.status >= 500:
+                    # Throttled or failing: raised so the Webull executor retries / opens its breaker
+                    response.raise_for_status()
+                if response.status != 200:
+                    logger.warning(f"Batch quote request returned HTTP {response.status}")
+                    return
+                await self._read_array(response, add)
+
+    async def _read_array(self, response, on_item):
+        """Stream a JSON array response, handing each item to `on_item` as soon as it is complete."""
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder('utf-8')()
+        buf, pos, in_array = "", 0, None
+        async for chunk in response.content.iter_chunked(16384):
+            buf += text.decode(chunk)
+            if in_array is None:
+                stripped = buf.lstrip()
+                if not stripped:
+                    continue
+                in_array = stripped[0] == '['
+                pos = len(buf) - len(stripped) + 1
+            if in_array:
+                pos = _decode_items(buf, pos, decoder, on_item)
+                # Drop consumed text so the buffer only holds the partial item
+                buf, pos = buf[pos:], 0
+        buf += text.decode(b"", final=True)
+        if in_array:
+            pos = _decode_items(buf, pos, decoder, on_item)
+            if buf[pos:].strip() not in ("", "]"):
+                logger.warning("Batch quote response ended with an incomplete item")
+        elif buf.strip():
+            # Error payloads are objects, not arrays
+            logger.warning(f"Unexpected batch quote response: {buf[:200]}")
+
+
+# Shared by every MassiveAPIClient in the process
+quote_client = AsyncQuoteClient()
@@ -0,0 +1,190 @@
+"""
+Push quote stream (Webull wspush MQTT) for the contracts the monitor watches.
+Keeps a live quote table per derivative tickerId: entries are seeded from
+HTTP quotes (pushes only carry the fields that changed) and patched by every
+push. The table is dropped when the connection drops, so callers fall back to
+polling until the next HTTP quote re-seeds it.
+
+Same protocol as webull.streamconn.StreamConn (hello header, JSON subscribe
+topics), which is not used directly: it predates paho-mqtt 2 and exits the
+process on a malformed message.
+"""
+import json
+import logging
+import threading
+import time
+import paho.mqtt.client as mqtt
+from .config import Config
+from .metrics import WEBULL_STREAM_MESSAGES, WEBULL_STREAM_CONNECTED
+
+logger = logging.getLogger(__name__)
+
+# Push message fields that are transport metadata, not quote data
+_META_FIELDS = ('transId', 'pubId', 'trdSeq', 'tickerId', 'deal', 'depth')
+# Max tickerIds per subscribe request
+SUBSCRIBE_CHUNK = 100
+
+
+def _new_client(client_id, transport):
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        # paho-mqtt 2.x
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id, transport=transport)
+    return mqtt.Client(client_id=client_id, transport=transport)
+
+
+def _failed(reason_code):
+    # paho 2 passes a ReasonCode, paho 1 an int
+    return getattr(reason_code, "is_failure", reason_code != 0)
+
+
+def push_fields(data):
+    """Quote dict fields carried by one push payload (trade price as `close`, like HTTP quotes)."""
+    fields = {key: value for key, value in data.items() if key not in _META_FIELDS}
+    deal = data.get('deal')
+    if isinstance(deal, dict) and deal.get('price') is not None:
+        fields['close'] = deal['price']
+    return fields
+
+
+class QuoteStream:
+    def __init__(self, did, access_token=None, on_change=None, host=None, port=None,
+                 transport=None, tls=None, quote_types=None):
+        self.did = did
+        self.access_token = access_token
+        # Called on the event loop with the tickerId of every quote a push changed
+        self.on_change = on_change
+        self.host = host or Config.WEBULL_STREAM_HOST
+        self.port = port or Config.WEBULL_STREAM_PORT
+        self.transport = transport or Config.WEBULL_STREAM_TRANSPORT
+        self.tls = Config.WEBULL_STREAM_TLS if tls is None else tls
+        self.quote_types = quote_types or Config.WEBULL_STREAM_TYPES
+        self.connected = False
+        self._lock = threading.Lock()
+        self._quotes = {}       # {tickerId: quote dict}
+        self._seeded_at = {}    # {tickerId: time.time() of the last HTTP quote}
+        self._subscribed = set()
+        self._client = None
+        self._loop = None
+
+    # --- lifecycle (event loop thread) ---
+
+    def start(self, loop):
+        """Connect in the background (paho network thread); reconnects automatically."""
+        self._loop = loop
+        client = _new_client(self.did, self.transport)
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        if self.tls:
+            client.tls_set_context()
+        # Fixed credentials used by the Webull app
+        client.username_pw_set('test', password='test')
+        client.reconnect_delay_set(min_delay=1, max_delay=30)
+        self._client = client
+        client.connect_async(self.host, self.port, keepalive=30)
+        client.loop_start()
+
+    def stop(self):
+        if self._client is not None:
+            self._client.disconnect()
+            self._client.loop_stop()
+            self._client = None
+        self._set_connected(False)
+
+    # --- subscriptions and quote table ---
+
+    def set_subscriptions(self, ticker_ids):
+        """Subscribe to exactly `ticker_ids` (diffed against the current subscriptions)."""
+        wanted = set(ticker_ids)
+        with self._lock:
+            added = wanted - self._subscribed
+            removed = self._subscribed - wanted
+            self._subscribed = wanted
+            for ticker_id in removed:
+                self._quotes.pop(ticker_id, None)
+                self._seeded_at.pop(ticker_id, None)
+        if self.connected:
+            self._subscribe(added)
+            self._unsubscribe(removed)
+
+    def seed(self, quotes_map):
+        """Store full HTTP quotes ({tickerId: quote}) of subscribed contracts as the base for pushes."""
+        now = time.time()
+        with self._lock:
+            if not self.connected:
+                return
+            for ticker_id, quote in quotes_map.items():
+                if ticker_id in self._subscribed:
+                    self._quotes[ticker_id] = dict(quote)
+                    self._seeded_at[ticker_id] = now
+
+    def quote(self, ticker_id, max_age):
+        """Live quote if the stream is up and it was re-seeded from HTTP within `max_age` seconds, else None."""
+        with self._lock:
+            quote = self._quotes.get(ticker_id)
+            if quote is None or not self.connected or time.time() - self._seeded_at[ticker_id] > max_age:
+                return None
+            return dict(quote)
+
+    def _subscribe(self, ticker_ids):
+        ticker_ids = sorted(ticker_ids)
+        for i in range(0, len(ticker_ids), SUBSCRIBE_CHUNK):
+            ids = ticker_ids[i:i + SUBSCRIBE_CHUNK]
+            for quote_type in self.quote_types:
+                self._client.subscribe(json.dumps({"tickerIds": ids, "type": str(quote_type)}))
+
+    def _unsubscribe(self, ticker_ids):
+        for ticker_id in ticker_ids:
+            for quote_type in self.quote_types:
+                self._client.unsubscribe(f'["type={quote_type}&tid={ticker_id}"]')
+
+    def _set_connected(self, connected):
+        with self._lock:
+            self.connected = connected
+            if not connected:
+                # Pushes missed while disconnected would leave the table silently stale
+                self._quotes.clear()
+                self._seeded_at.clear()
+        WEBULL_STREAM_CONNECTED.set(1 if connected else 0)
+
+    # --- paho callbacks (network thread) ---
+
+    def _on_connect(self, client, userdata, flags, reason_code, *args):
+        if _failed(reason_code):
+            logger.warning(f"Quote stream connection refused: {reason_code}")
+            return
+        header = {"did": self.did, "hl": "en", "app": "desktop", "os": "web", "osType": "windows"}
+        if self.access_token:
+            header["access_token"] = self.access_token
+        client.subscribe(json.dumps({"header": header}))
+        self._set_connected(True)
+        with self._lock:
+            subscribed = set(self._subscribed)
+        self._subscribe(subscribed)
+        logger.info(f"Quote stream connected to {self.host}:{self.port}, {len(subscribed)} contracts")
+
+    def _on_disconnect(self, client, userdata, *args):
+        if self.connected:
+            logger.warning("Quote stream disconnected, falling back to polling")
+        self._set_connected(False)
+
+    def _on_message(self, client, userdata, message):
+        try:
+            topic = json.loads(message.topic)
+            data = json.loads(message.payload)
+            ticker_id = int(topic.get('tickerId') or data.get('tickerId'))
+        except (ValueError, TypeError, AttributeError) as e:
+            WEBULL_STREAM_MESSAGES.inc(result="invalid")
+            logger.debug(f"Ignoring malformed stream message on {message.topic!r}: {e}")
+            return
+        with self._lock:
+            quote = self._quotes.get(ticker_id)
+            if quote is not None:
+                quote.update(push_fields(data))
+        if quote is None:
+            # Not seeded yet (or not ours): a partial push cannot be priced on its own
+            WEBULL_STREAM_MESSAGES.inc(result="ignored")
+            return
+        WEBULL_STREAM_MESSAGES.inc(result="applied")
+        if self.on_change is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self.on_change, ticker_id)
@@ -0,0 +1,43 @@
+"""
+Async token-bucket rate limiter used to pace outbound Webull requests.
+"""
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens are added per second, up to `capacity`.
+    Every acquire() consumes one token and waits when the bucket is empty,
+    so bursts up to `capacity` go out immediately and the long-run request
+    rate never exceeds `rate`.
+    """
+
+    def __init__(self, rate, capacity, jitter=0.0):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        # Extra random wait (seconds) added when throttled, to avoid a perfectly regular request pattern
+        self.jitter = jitter
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens=1):
+        """Wait until `tokens` are available and consume them."""
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+                if self.jitter:
+                    wait += random.uniform(0, self.jitter)
+                await asyncio.sleep(wait)
@@ -0,0 +1,88 @@
+"""
+Persistent cache of slow-changing Webull reference data:
+- symbol -> tickerId (kept for TICKER_ID_TTL_DAYS)
+- symbol -> option expiration list (refreshed once per trading day, US/Eastern)
+Stored as JSON next to favorites.json / templates.json.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from .config import Config
+from . import market_calendar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "webull_reference_cache.json")
+
+
+class ReferenceDataCache:
+    def __init__(self, path=None, ticker_ttl_days=None):
+        self.path = path or Config.WEBULL_REFERENCE_CACHE_PATH or DEFAULT_PATH
+        self.ticker_ttl = (ticker_ttl_days if ticker_ttl_days is not None else Config.TICKER_ID_TTL_DAYS) * 86400
+        self._lock = threading.Lock()
+        self._data = None  # loaded on first use
+
+    def _load(self):
+        if self._data is not None:
+            return
+        data = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable reference cache {self.path}: {e}")
+        self._data = {
+            'tickers': data.get('tickers', {}),
+            'expirations': data.get('expirations', {}),
+        }
+
+    def _save(self):
+        # Write to a temp file and rename so a crash never leaves a truncated cache
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save reference cache: {e}")
+
+    @staticmethod
+    def _today():
+        return market_calendar.now_et().date().isoformat()
+
+    def get_ticker_id(self, symbol):
+        with self._lock:
+            self._load()
+            entry = self._data['tickers'].get(symbol)
+        if entry and time.time() - entry['ts'] < self.ticker_ttl:
+            return entry['id']
+        return None
+
+    def set_ticker_id(self, symbol, ticker_id):
+        with self._lock:
+            self._load()
+            self._data['tickers'][symbol] = {'id': ticker_id, 'ts': time.time()}
+            self._save()
+
+    def get_expirations(self, symbol):
+        """Cached expiration list if it was fetched today (ET), else None."""
+        with self._lock:
+            self._load()
+            entry = self._data['expirations'].get(symbol)
+        if entry and entry['day'] == self._today():
+            return list(entry['dates'])
+        return None
+
+    def set_expirations(self, symbol, dates):
+        with self._lock:
+            self._load()
+            self._data['expirations'][symbol] = {'dates': dates, 'day': self._today()}
+            self._save()
+
+
+# Shared by every MassiveAPIClient in the process
+reference_cache = ReferenceDataCache()
@@ -0,0 +1,97 @@
+"""
+Off-loop rendering of status images.
+Pillow rendering is CPU-bound, so it runs in a process pool instead of on
+the event loop shared by both bots and the FastAPI app.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .config import Config
+from .image_gen import ImageGenerator
+
+logger = logging.getLogger(__name__)
+
+# One generator per pool process (fonts are cached per process)
+_worker_generator = None
+
+
+def _render_batch(items):
+    """Runs in a pool process: render status images and return their PNG bytes."""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = ImageGenerator()
+    return [_worker_generator.generate_status_image(data).getvalue() for data in items]
+
+
+class RenderService:
+    """
+    Async front-end to a process pool of status image renderers.
+    Renders requested within RENDER_BATCH_WINDOW seconds of each other
+    (e.g. all alerts of one monitor cycle) are sent to the pool as batches.
+    """
+
+    def __init__(self, workers=None, batch_window=None):
+        self.workers = workers or Config.RENDER_WORKERS
+        self.batch_window = batch_window if batch_window is not None else Config.RENDER_BATCH_WINDOW
+        self._pool = None  # Created on first render, so importing has no side effects
+        self._pending = []  # [(data, future)]
+        self._flush_handle = None
+
+    async def render_status(self, data) -> bytes:
+        """Render a status image for `data` and return the PNG bytes."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((data, future))
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: don't fork a process that holds the event loop, DB sockets and threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        # Spread the batch over the workers
+        size = max(1, math.ceil(len(pending) / self.workers))
+        for i in range(0, len(pending), size):
+            asyncio.create_task(self._run_batch(pending[i:i + size]))
+
+    async def _run_batch(self, batch):
+        items = [data for data, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                results = await loop.run_in_executor(self._get_pool(), _render_batch, items)
+            except (BrokenProcessPool, OSError) as e:
+                # Pool died or could not start: render in a thread so alerts still go out
+                logger.error(f"Render pool unavailable ({e}), rendering in a thread")
+                self._pool = None
+                results = await asyncio.to_thread(_render_batch, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), png in zip(batch, results):
+            if not future.done():
+                future.set_result(png)
+
+
+# Shared by the monitor and the bot handlers
+render_service = RenderService()
@@ -0,0 +1,40 @@
+"""
+Shared service instances of the bot: the monitoring commands database and the
+Webull API client.
+Each is created on first use (not at import), so importing the src modules
+connects to nothing. The bot's entry points call init() once at startup;
+the bot handlers and the monitor share the same instances.
+"""
+import logging
+import threading
+from .api_client import MassiveAPIClient
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_db = None
+_api = None
+
+
+def get_db():
+    global _db
+    with _lock:
+        if _db is None:
+            _db = Database()
+        return _db
+
+
+def get_api():
+    global _api
+    with _lock:
+        if _api is None:
+            _api = MassiveAPIClient()
+        return _api
+
+
+def init():
+    """Create every service up front (blocking: connects to PostgreSQL). Idempotent."""
+    get_db()
+    get_api()
+    logger.info("Webull bot services initialized")
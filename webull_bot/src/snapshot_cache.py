@@ -0,0 +1,157 @@
+"""
+Process-wide cache of option chain snapshots keyed by (symbol, expiration).
+Shared by the monitor and the bot handlers so a chain fetched by one is
+reused by the other instead of triggering another round of Webull calls.
+Single contracts the monitor quoted (targeted quotes, streamed quotes) are
+kept per contract, so a handler pricing a monitored contract fetches nothing.
+"""
+import asyncio
+import logging
+import time
+from .chain_snapshot import STRIKE_TOLERANCE, normalize_type
+from .config import Config
+from .metrics import CHAIN_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class ChainSnapshotCache:
+    """
+    TTL cache with stale-while-revalidate:
+    - age <= ttl: served from cache.
+    - ttl < age <= stale_ttl: served from cache, refreshed in the background.
+    - older or missing: fetched, and concurrent callers for the same key share that fetch.
+    Loaders are coroutine functions (MassiveAPIClient.get_batch_option_data_async) or
+    blocking callables, which run in the default executor.
+    """
+
+    def __init__(self, ttl=None, stale_ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else Config.CHAIN_CACHE_TTL
+        self.stale_ttl = max(self.ttl, stale_ttl if stale_ttl is not None else Config.CHAIN_CACHE_STALE_TTL)
+        self.max_entries = max_entries or Config.CHAIN_CACHE_MAX_ENTRIES
+        self._entries = {}   # {key: (monotonic stored_at, ChainSnapshot)}
+        self._inflight = {}  # {key: asyncio.Task}
+        self._contracts = {}  # {key: {(strike, type_char): (monotonic stored_at, contract data)}}
+
+    @staticmethod
+    def _key(symbol, expiration):
+        return (str(symbol).upper(), str(expiration))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def peek(self, symbol, expiration, max_age=None):
+        """Cached snapshot if younger than `max_age` (default: stale_ttl), without fetching."""
+        entry = self._entries.get(self._key(symbol, expiration))
+        if entry is None:
+            return None
+        stored_at, snapshot = entry
+        limit = self.stale_ttl if max_age is None else max_age
+        return snapshot if time.monotonic() - stored_at <= limit else None
+
+    def put_contracts(self, snapshot):
+        """Keep every contract of a (partial) snapshot, e.g. the monitor's targeted quotes. Degraded ones are ignored."""
+        if not snapshot or snapshot.degraded:
+            return
+        # Aged by when the data was fetched, like full chains
+        stored_at = time.monotonic() - max(0.0, time.time() - snapshot.fetched_at)
+        key = self._key(snapshot.symbol, snapshot.expiration)
+        contracts = self._contracts.pop(key, {})
+        for contract_key, data in snapshot.items():
+            contracts[contract_key] = (stored_at, data)
+        # Re-inserted last: the dict stays ordered from least to most recently updated
+        self._contracts[key] = {
+            contract_key: entry for contract_key, entry in contracts.items()
+            if stored_at - entry[0] <= self.stale_ttl
+        }
+        while len(self._contracts) > self.max_entries:
+            del self._contracts[next(iter(self._contracts))]
+
+    def peek_contract(self, symbol, expiration, strike, contract_type, max_age=None):
+        """
+        Cached data of one contract (nearest strike within tolerance) if younger than
+        `max_age` (default: stale_ttl), without fetching.
+        """
+        contracts = self._contracts.get(self._key(symbol, expiration))
+        if not contracts:
+            return None
+        target = float(strike)
+        type_char = normalize_type(contract_type)
+        limit = self.stale_ttl if max_age is None else max_age
+        now = time.monotonic()
+        best = None
+        for (contract_strike, contract_type_char), (stored_at, data) in contracts.items():
+            diff = abs(contract_strike - target)
+            if (contract_type_char == type_char and diff < STRIKE_TOLERANCE and now - stored_at <= limit
+                    and (best is None or diff < best[0])):
+                best = (diff, data)
+        return best[1] if best is not None else None
+
+    async def get(self, symbol, expiration, loader, max_age=None, allow_stale=True):
+        """
+        Return the snapshot for (symbol, expiration), calling `loader(symbol, expiration)` when needed.
+        `max_age` overrides the freshness TTL for this read; `allow_stale=False` disables
+        serving stale data (the caller waits for a fresh fetch instead).
+        """
+        key = self._key(symbol, expiration)
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, snapshot = entry
+            age = time.monotonic() - stored_at
+            if age <= (self.ttl if max_age is None else max_age):
+                CHAIN_CACHE_REQUESTS.inc(result="hit")
+                return snapshot
+            if allow_stale and age <= self.stale_ttl:
+                CHAIN_CACHE_REQUESTS.inc(result="stale")
+                self._revalidate(key, loader)
+                return snapshot
+
+        CHAIN_CACHE_REQUESTS.inc(result="miss")
+        # shield: a cancelled caller must not cancel the fetch other callers wait on
+        return await asyncio.shield(self._fetch_task(key, loader))
+
+    def _fetch_task(self, key, loader):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        return task
+
+    def _revalidate(self, key, loader):
+        if key in self._inflight:
+            return
+        task = self._fetch_task(key, loader)
+        task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background chain refresh failed: {task.exception()}")
+
+    async def _load(self, key, loader):
+        if asyncio.iscoroutinefunction(loader):
+            snapshot = await loader(key[0], key[1])
+        else:
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, loader, key[0], key[1])
+        if snapshot:
+            # Aged by when the data was fetched: a last-known snapshot served while
+            # Webull is down must not look fresh
+            data_age = max(0.0, time.time() - snapshot.fetched_at)
+            self._entries[key] = (time.monotonic() - data_age, snapshot)
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (stored_at, _) in self._entries.items() if now - stored_at > self.stale_ttl]:
+            del self._entries[key]
+        if len(self._entries) > self.max_entries:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k][0])
+            for key in oldest[:len(self._entries) - self.max_entries]:
+                del self._entries[key]
+
+
+# Shared by the monitor and the bot handlers
+chain_cache = ChainSnapshotCache()
@@ -0,0 +1,74 @@
+"""
+Record option chain snapshots to disk and load them back for offline replay.
+
+Format: gzip-compressed JSON lines, one snapshot per line:
+    {"s": symbol, "e": expiration, "t": fetched_at, "c": [[strike, type_char, <FIELDS>...], ...]}
+Each `record` call appends a gzip member, so a recording can be extended across runs.
+"""
+import gzip
+import json
+import logging
+import threading
+from .chain_snapshot import ChainSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Order of the per-contract values stored after (strike, type_char)
+FIELDS = (
+    'last_price', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility',
+    'change_abs', 'change_pct', 'underlying_price', 'contractSymbol',
+)
+
+
+def encode_snapshot(snapshot):
+    rows = [
+        [strike, type_char] + [data.get(field) for field in FIELDS]
+        for (strike, type_char), data in snapshot.items()
+    ]
+    return json.dumps(
+        {"s": snapshot.symbol, "e": str(snapshot.expiration), "t": round(snapshot.fetched_at, 3), "c": rows},
+        separators=(",", ":")
+    )
+
+
+def decode_snapshot(line):
+    raw = json.loads(line)
+    contracts = {
+        (float(row[0]), row[1]): dict(zip(FIELDS, row[2:]))
+        for row in raw["c"]
+    }
+    return ChainSnapshot(raw["s"], raw["e"], contracts, fetched_at=raw["t"])
+
+
+def load_recording(path):
+    """Yield the ChainSnapshots stored in `path`, in recording order."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield decode_snapshot(line)
+
+
+class SnapshotRecorder:
+    """Appends snapshots to a recording file. Safe to call from executor threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_recorded = {}  # {(symbol, expiration): fetched_at}
+
+    def record(self, snapshot):
+        """Append a snapshot unless it is empty or was already recorded."""
+        if not snapshot:
+            return
+        key = (snapshot.symbol, str(snapshot.expiration))
+        with self._lock:
+            # Snapshots reused from the chain cache keep their original fetch time
+            if self._last_recorded.get(key) == snapshot.fetched_at:
+                return
+            line = encode_snapshot(snapshot)
+            try:
+                with gzip.open(self.path, "at", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                self._last_recorded[key] = snapshot.fetched_at
+            except OSError as e:
+                logger.error(f"Failed to record snapshot for {key}: {e}")
@@ -0,0 +1,140 @@
+"""
+Dedicated executor for Webull calls.
+Blocking webull library calls run on their own bounded thread pool instead of
+the default executor (shared with asyncio.to_thread users such as the command registry).
+Every call gets a deadline and jittered exponential retries, and a circuit
+breaker fails calls fast while Webull keeps failing.
+"""
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import Config
+from .metrics import WEBULL_CALLS, WEBULL_CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+# Values of the webull_circuit_state gauge
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Webull while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls. After `reset_timeout`
+    seconds one trial call is let through (half-open): success closes the circuit,
+    failure opens it again. Used from the event loop thread only.
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = failure_threshold or Config.WEBULL_BREAKER_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else Config.WEBULL_BREAKER_RESET
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def _set_state(self, state):
+        if state != self.state:
+            logger.warning(f"Webull circuit breaker {self.state} -> {state}")
+            self.state = state
+        WEBULL_CIRCUIT_STATE.set(_STATE_VALUES[state])
+
+    def allow(self):
+        """True if a call may go out now."""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_running = False
+        self._set_state(CLOSED)
+
+    def record_abandoned(self):
+        # The caller was cancelled: frees the half-open trial slot without judging Webull
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+
+class WebullExecutor:
+    def __init__(self, workers=None, timeout=None, retries=None, backoff=None, backoff_max=None, breaker=None):
+        self.workers = workers or Config.WEBULL_EXECUTOR_WORKERS
+        self.timeout = timeout or Config.WEBULL_CALL_TIMEOUT
+        self.retries = Config.WEBULL_CALL_RETRIES if retries is None else retries
+        self.backoff = Config.WEBULL_RETRY_BACKOFF if backoff is None else backoff
+        self.backoff_max = Config.WEBULL_RETRY_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="webull")
+        return self._pool
+
+    @property
+    def degraded(self):
+        return self.breaker.state != CLOSED
+
+    async def run(self, call, func, *args):
+        """Run blocking `func(*args)` on the Webull pool. `call` names the operation in metrics."""
+        loop = asyncio.get_running_loop()
+        return await self._call(call, lambda: loop.run_in_executor(self._get_pool(), func, *args))
+
+    async def call(self, call, coro_func, *args, **kwargs):
+        """Await `coro_func(*args, **kwargs)` (e.g. the aiohttp quote fetch) with the same policy."""
+        return await self._call(call, lambda: coro_func(*args, **kwargs))
+
+    async def _call(self, call, start):
+        if not self.breaker.allow():
+            WEBULL_CALLS.inc(call=call, result="rejected")
+            raise CircuitOpenError(f"Webull circuit open, {call} not attempted")
+        attempt = 0
+        while True:
+            try:
+                # The deadline includes time queued for a free worker. A timed-out
+                # thread still finishes its request (bounded by the HTTP timeout)
+                result = await asyncio.wait_for(start(), self.timeout)
+            except asyncio.CancelledError:
+                self.breaker.record_abandoned()
+                raise
+            except Exception as e:
+                if attempt >= self.retries:
+                    WEBULL_CALLS.inc(call=call, result="failed")
+                    self.breaker.record_failure()
+                    raise
+                # Full jitter: spreads the retries of concurrent callers
+                delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+                WEBULL_CALLS.inc(call=call, result="retry")
+                logger.warning(f"Webull {call} failed ({type(e).__name__}: {e}), retry {attempt + 1} in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+            else:
+                WEBULL_CALLS.inc(call=call, result="ok")
+                self.breaker.record_success()
+                return result
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Shared by every MassiveAPIClient in the process
+webull_executor = WebullExecutor()